@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
-from .models import User, Categories, Reclamation
+from .models import User, Categories, Reclamation, EmailOutbox, Incident
 
 
 @admin.register(User)
@@ -17,7 +17,7 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         ('Informations Personnelles', {
-            'fields': ('nom', 'prenom', 'email', 'telephone', 'adresse', 'numero_compteur')
+            'fields': ('nom', 'prenom', 'email', 'telephone', 'adresse', 'zone', 'numero_compteur')
         }),
         ('Permissions', {
             'fields': ('role', 'is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions'),
@@ -61,14 +61,14 @@ class ReclamationAdmin(admin.ModelAdmin):
     list_filter = ['status', 'categories', 'date_created', 'dateReponse']
     search_fields = ['user__nom', 'user__prenom', 'user__email', 'description']
     ordering = ['-date_created']
-    raw_id_fields = ['user', 'technicien']
+    raw_id_fields = ['user', 'technicien', 'incident']
     
     fieldsets = (
         ('Informations de la Réclamation', {
             'fields': ('user', 'categories', 'description', 'image')
         }),
         ('Traitement', {
-            'fields': ('status', 'technicien', 'dateReponse')
+            'fields': ('status', 'technicien', 'dateReponse', 'incident')
         }),
         ('Métadonnées', {
             'fields': ('date_created', 'date_updated'),
@@ -86,6 +86,33 @@ class ReclamationAdmin(admin.ModelAdmin):
         return super().get_queryset(request).select_related('user', 'categories', 'technicien')
 
 
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """
+    Administration de l'outbox des emails
+    """
+    list_display = ['destinataire', 'sujet', 'status', 'tentatives', 'prochaine_tentative', 'date_envoi']
+    list_filter = ['status', 'date_created']
+    search_fields = ['destinataire', 'sujet']
+    ordering = ['-date_created']
+    raw_id_fields = ['user']
+    readonly_fields = ['date_created', 'date_envoi', 'derniere_erreur']
+
+
+
+@admin.register(Incident)
+class IncidentAdmin(admin.ModelAdmin):
+    """
+    Administration des incidents (pannes de zone)
+    """
+    list_display = ['zone', 'status', 'technicien', 'date_debut', 'date_resolution']
+    list_filter = ['status', 'date_debut']
+    search_fields = ['zone']
+    ordering = ['-date_created']
+    raw_id_fields = ['technicien']
+    readonly_fields = ['date_created', 'date_updated']
+
+
 # Configuration de l'administration
 admin.site.site_header = "Administration SENELEC"
 admin.site.site_title = "SENELEC Admin"
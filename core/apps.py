@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Enregistrer les receivers de signaux
+        from . import signals  # noqa: F401
+        # Instrumentation SQL des connexions (métriques par requête)
+        from . import metrics  # noqa: F401
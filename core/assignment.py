@@ -0,0 +1,172 @@
+"""
+Assignation automatique des réclamations aux techniciens, équilibrée par
+charge de travail (nombre de réclamations ouvertes assignées).
+
+Le moteur garde en mémoire un tas binaire (min-heap) des techniciens actifs
+indexé par leur charge. Les entrées périmées du tas ne sont pas retirées mais
+ignorées au moment du pop (suppression paresseuse), ce qui rend chaque mise à
+jour O(log n).
+"""
+from django.db import transaction
+from django.db.models import Case, Count, Q, UUIDField, Value, When
+from django.utils import timezone
+from itertools import count
+import heapq
+import threading
+
+from .events import broker
+from .models import User, Reclamation
+
+
+class AssignmentEngine:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._heap = []
+        self._loads = {}
+        self._counter = count()
+        self._seeded = False
+
+    def seed(self):
+        """Charge les techniciens actifs et leur charge en une requête groupée"""
+        rows = (
+            User.objects.filter(role='technicien', is_active=True)
+            .annotate(charge=Count(
+                'reclamations_assignees',
+                filter=Q(reclamations_assignees__status__in=Reclamation.OPEN_STATUSES),
+            ))
+            .values_list('id', 'charge')
+        )
+        with self._lock:
+            self._loads = dict(rows)
+            # Le compteur départage les ex aequo sans comparer les UUID
+            self._heap = [(load, next(self._counter), tech_id) for tech_id, load in self._loads.items()]
+            heapq.heapify(self._heap)
+            self._seeded = True
+
+    def reset(self):
+        """Force un rechargement complet à la prochaine utilisation"""
+        with self._lock:
+            self._seeded = False
+
+    def loads(self):
+        with self._lock:
+            self._ensure_seeded()
+            return dict(self._loads)
+
+    def _ensure_seeded(self):
+        if not self._seeded:
+            self.seed()
+
+    def _push(self, tech_id):
+        heapq.heappush(self._heap, (self._loads[tech_id], next(self._counter), tech_id))
+
+    def _pop_least_loaded(self):
+        while self._heap:
+            load, _, tech_id = heapq.heappop(self._heap)
+            if self._loads.get(tech_id) == load:
+                return tech_id
+        return None
+
+    def adjust(self, tech_id, delta):
+        """Répercute un changement de charge (nouvelle assignation, ticket résolu...)"""
+        with self._lock:
+            if not self._seeded or tech_id not in self._loads:
+                return
+            self._loads[tech_id] = max(self._loads[tech_id] + delta, 0)
+            self._push(tech_id)
+
+    def pick(self, n):
+        """Choisit un technicien pour chacune des n prochaines réclamations"""
+        with self._lock:
+            self._ensure_seeded()
+            picks = []
+            for _ in range(n):
+                tech_id = self._pop_least_loaded()
+                if tech_id is None:
+                    break
+                self._loads[tech_id] += 1
+                self._push(tech_id)
+                picks.append(tech_id)
+            return picks
+
+    def assign(self, reclamation_ids=None, batch_size=2000, reseed=True):
+        """
+        Assigne les réclamations ouvertes sans technicien (toutes, ou parmi
+        `reclamation_ids`) par lots, avec un seul UPDATE par lot.
+        Retourne le nombre de réclamations assignées.
+        """
+        if reseed:
+            # Une requête groupée : prend en compte les écritures des autres processus
+            self.seed()
+
+        queryset = Reclamation.objects.filter(technicien__isnull=True, status__in=Reclamation.OPEN_STATUSES)
+        if reclamation_ids is not None:
+            queryset = queryset.filter(pk__in=reclamation_ids)
+        pending = list(queryset.order_by('date_created').values_list('pk', flat=True))
+
+        assigned = 0
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            picks = self.pick(len(batch))
+            if not picks:
+                break
+            assigned += self._apply(batch[:len(picks)], picks)
+        return assigned
+
+    def _apply(self, reclamation_ids, tech_ids):
+        by_tech = {}
+        for reclamation_id, tech_id in zip(reclamation_ids, tech_ids):
+            by_tech.setdefault(tech_id, []).append(reclamation_id)
+
+        with transaction.atomic():
+            # La condition technicien IS NULL protège des assignations concurrentes
+            updated = Reclamation.objects.filter(
+                pk__in=reclamation_ids, technicien__isnull=True
+            ).update(
+                technicien=Case(
+                    *[When(pk__in=ids, then=Value(tech_id)) for tech_id, ids in by_tech.items()],
+                    output_field=UUIDField(),
+                ),
+                date_updated=timezone.now(),
+            )
+
+            # L'UPDATE groupé n'émet pas de signaux : publier les événements du flux en direct
+            rows = Reclamation.objects.filter(pk__in=reclamation_ids).values_list(
+                'pk', 'user_id', 'technicien_id', 'status', 'date_updated'
+            )
+            for pk, user_id, technicien_id, status, date_updated in rows:
+                data = {
+                    'id': str(pk),
+                    'status': status,
+                    'ancien_status': status,
+                    'technicien_id': str(technicien_id) if technicien_id else None,
+                    'ancien_technicien_id': None,
+                    'date_updated': date_updated.isoformat(),
+                }
+                transaction.on_commit(
+                    lambda data=data, user_id=user_id, technicien_id=technicien_id:
+                    broker.publish('technicien_modifie', data, user_id, (technicien_id,))
+                )
+
+        if updated != len(reclamation_ids):
+            # Certaines lignes ont été assignées ailleurs : charges à recalculer
+            self.reset()
+        return updated
+
+
+engine = AssignmentEngine()
+
+
+def sync_reclamation_load(reclamation, deleted=False):
+    """Met à jour la charge des techniciens après l'enregistrement ou la suppression d'une réclamation"""
+    old_tech = reclamation.loaded_technicien_id if reclamation.loaded_status in Reclamation.OPEN_STATUSES else None
+    new_tech = None
+    if not deleted and reclamation.status in Reclamation.OPEN_STATUSES:
+        new_tech = reclamation.technicien_id
+    if old_tech == new_tech:
+        return
+    if old_tech:
+        engine.adjust(old_tech, -1)
+    if new_tech:
+        engine.adjust(new_tech, +1)
@@ -0,0 +1,225 @@
+"""
+Versions asynchrones des vues principales, pour un déploiement ASGI.
+
+Sous ASGI, les vues synchrones passent par le thread unique de sync_to_async
+(thread_sensitive) : une requête lente bloque toutes les autres. Ces vues
+utilisent l'ORM asynchrone et ne sortent de la boucle d'événements que pour
+le hachage des mots de passe (pool de threads) et les écritures
+transactionnelles (utilisateur + outbox), que l'ORM asynchrone ne sait pas
+encore regrouper dans une transaction. L'envoi SMTP reste hors requête
+(commande process_email_outbox).
+
+Les URL pointent vers ce module lorsque SENELEC_ASYNC_VIEWS=1 (positionné
+par senelec_system/asgi.py) ; sous WSGI les vues synchrones restent utilisées.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin
+from django.contrib.auth.signals import user_logged_in
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+import json
+import logging
+
+from .backends import lookup_field
+from .http import conditional
+from .models import User
+from .passwords import generate_temp_password
+from .routers import use_replica
+from .stats import adashboard_stats_validators, aget_dashboard_stats, arequest_stats_version
+from .throttle import get_login_throttle
+from .tokens import needs_session
+from .views import (
+    create_user_with_credentials, login_payload, missing_user_fields, resend_credentials,
+    throttled_response,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Le hachage libère le GIL : inutile de le sérialiser sur le thread de l'ORM
+ahash_password = sync_to_async(make_password, thread_sensitive=False)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def login_api(request):
+    """API de connexion des utilisateurs (asynchrone)"""
+    try:
+        data = json.loads(request.body)
+        email_or_phone = data.get('email_or_phone')
+        password = data.get('password')
+
+        if not email_or_phone or not password:
+            return JsonResponse({
+                'success': False,
+                'message': 'Email/téléphone et mot de passe requis'
+            }, status=400)
+
+        throttle = get_login_throttle()
+        if throttle.backend.blocking:
+            retry_after = await sync_to_async(throttle.check, thread_sensitive=False)(request, email_or_phone)
+        else:
+            retry_after = throttle.check(request, email_or_phone)
+        if retry_after:
+            return throttled_response(retry_after)
+
+        user = await aauthenticate(request, email_or_phone=email_or_phone, password=password)
+        if user is None:
+            if not await User.objects.filter(**{lookup_field(email_or_phone): email_or_phone}).aexists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Utilisateur non trouvé'
+                }, status=404)
+            return JsonResponse({
+                'success': False,
+                'message': 'Email/téléphone ou mot de passe incorrect'
+            }, status=401)
+
+        if throttle.backend.blocking:
+            await sync_to_async(throttle.succeeded, thread_sensitive=False)(request, email_or_phone)
+        else:
+            throttle.succeeded(request, email_or_phone)
+        if needs_session(user):
+            await alogin(request, user)
+        else:
+            await user_logged_in.asend(sender=user.__class__, request=request, user=user)
+        return JsonResponse(login_payload(user))
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+    except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
+        return JsonResponse({
+            'success': False,
+            'message': f'Erreur interne: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def add_user_api(request):
+    """API pour ajouter un nouvel utilisateur (asynchrone)"""
+    try:
+        data = json.loads(request.body)
+
+        missing_fields = missing_user_fields(data)
+        if missing_fields:
+            return JsonResponse({
+                'success': False,
+                'message': f'Champs manquants: {", ".join(missing_fields)}'
+            }, status=400)
+
+        if await User.objects.filter(email=data['email']).aexists():
+            return JsonResponse({
+                'success': False,
+                'message': 'Un utilisateur avec cet email existe déjà'
+            }, status=400)
+
+        if await User.objects.filter(telephone=data['telephone']).aexists():
+            return JsonResponse({
+                'success': False,
+                'message': 'Un utilisateur avec ce téléphone existe déjà'
+            }, status=400)
+
+        temp_password = generate_temp_password()
+        password_hash = await ahash_password(temp_password)
+
+        # Utilisateur et email dans la même transaction (écriture synchrone)
+        user = await sync_to_async(create_user_with_credentials)(data, temp_password, password_hash)
+
+        return JsonResponse({
+            'success': True,
+            'message': f'Utilisateur {user.get_full_name()} créé avec succès',
+            'user': {
+                'id': str(user.id),
+                'nom': user.nom,
+                'prenom': user.prenom,
+                'email': user.email,
+                'role': user.role,
+                'temp_password': temp_password
+            },
+            'email_queued': True
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+    except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
+        return JsonResponse({
+            'success': False,
+            'message': f'Erreur interne: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def send_credentials_api(request):
+    """API pour renvoyer les informations de connexion par email (asynchrone)"""
+    try:
+        data = json.loads(request.body)
+        email = data.get('email')
+
+        if not email:
+            return JsonResponse({
+                'success': False,
+                'message': 'Email requis'
+            }, status=400)
+
+        try:
+            user = await User.objects.aget(email=email)
+        except User.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Utilisateur non trouvé'
+            }, status=404)
+
+        if not user.temp_password:
+            temp_password = generate_temp_password()
+            password_hash = await ahash_password(temp_password)
+        else:
+            temp_password = user.temp_password
+            password_hash = None
+
+        await sync_to_async(resend_credentials)(user, temp_password, password_hash)
+
+        return JsonResponse({
+            'success': True,
+            'message': f'Informations de connexion en cours d\'envoi à {email}',
+            'email_queued': True
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+    except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
+        return JsonResponse({
+            'success': False,
+            'message': f'Erreur interne: {str(e)}'
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+@use_replica
+@conditional(adashboard_stats_validators)
+async def dashboard_stats_view(request):
+    """Vue des statistiques générales du dashboard (asynchrone)"""
+    fresh = request.GET.get('fresh') in ('1', 'true')
+    version = (await arequest_stats_version(request))[0]
+    stats = await aget_dashboard_stats(fresh=fresh, version=version)
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Statistiques générales',
+        'statistics': stats
+    })
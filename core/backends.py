@@ -0,0 +1,50 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.backends import ModelBackend
+
+from .models import User
+
+
+def lookup_field(email_or_phone):
+    """Retourne le champ utilisé pour retrouver un utilisateur (email ou téléphone)"""
+    return 'email' if '@' in email_or_phone else 'telephone'
+
+
+class EmailOrPhoneBackend(ModelBackend):
+    """
+    Authentifie par email ou téléphone en une seule requête : l'utilisateur
+    chargé est directement celui sur lequel le mot de passe est vérifié
+    """
+
+    def authenticate(self, request, username=None, password=None, email_or_phone=None, **kwargs):
+        identifier = email_or_phone or username or kwargs.get(User.USERNAME_FIELD)
+        if not identifier or password is None:
+            return None
+
+        try:
+            user = User._default_manager.get(**{lookup_field(identifier): identifier})
+        except User.DoesNotExist:
+            # Hacher quand même pour ne pas révéler l'existence du compte par le temps de réponse
+            User().set_password(password)
+            return None
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, email_or_phone=None, **kwargs):
+        identifier = email_or_phone or username or kwargs.get(User.USERNAME_FIELD)
+        if not identifier or password is None:
+            return None
+
+        try:
+            user = await User._default_manager.aget(**{lookup_field(identifier): identifier})
+        except User.DoesNotExist:
+            await sync_to_async(User().set_password, thread_sensitive=False)(password)
+            return None
+
+        # Le hachage (PBKDF2) libère le GIL : il tourne dans un thread du pool,
+        # hors de la boucle d'événements et du thread partagé de l'ORM
+        password_ok = await sync_to_async(user.check_password, thread_sensitive=False)(password)
+        if password_ok and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,258 @@
+"""
+Outils communs aux commandes de benchmark (base jetable, jeu de données, mesures)
+"""
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .synthetic import generate_dataset
+
+
+@contextmanager
+def benchmark_database(keepdb=False, name=None):
+    """
+    Crée une base de test jetable le temps du benchmark pour ne jamais
+    toucher aux données réelles. `name` force un fichier (SQLite) pour que
+    d'autres processus, un serveur lancé à part par exemple, puissent l'ouvrir
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    previous_name = test_settings.get('NAME')
+    if name:
+        test_settings['NAME'] = name
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        test_settings['NAME'] = previous_name
+
+
+def seed_dataset(clients=100, techniciens=10, reclamations=1000, chunk_size=20000, unassigned=False, seed=42):
+    """Insère un jeu de données synthétique reproductible (voir core/synthetic.py)"""
+    return generate_dataset(
+        clients=clients, techniciens=techniciens, reclamations=reclamations,
+        seed=seed, chunk_size=chunk_size, unassigned=unassigned,
+    )
+
+
+def measure(func, repeat=20):
+    """Exécute `func` plusieurs fois et retourne latences (ms) et requêtes SQL"""
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(ctx.captured_queries))
+    return {
+        'runs': repeat,
+        'queries': max(queries),
+        'ms_min': round(min(timings), 3),
+        'ms_median': round(statistics.median(timings), 3),
+        'ms_max': round(max(timings), 3),
+    }
+
+
+def percentile(values, q):
+    """Percentile (0-100) par rang le plus proche d'une liste non vide"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+async def _http_request(reader, writer, raw):
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    headers = {}
+    for line in head.split(b'\r\n')[1:]:
+        if b':' in line:
+            key, value = line.split(b':', 1)
+            headers[key.strip().lower()] = value.strip()
+    if b'content-length' in headers:
+        await reader.readexactly(int(headers[b'content-length']))
+    elif headers.get(b'transfer-encoding') == b'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    return status
+
+
+def build_request(method, path, host, body=None, content_type='application/json'):
+    """Requête HTTP/1.1 brute (keep-alive)"""
+    lines = [f'{method} {path} HTTP/1.1', f'Host: {host}', 'Connection: keep-alive']
+    body = body.encode() if isinstance(body, str) else (body or b'')
+    if body:
+        lines += [f'Content-Type: {content_type}', f'Content-Length: {len(body)}']
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode() + body
+
+
+async def http_load(host, port, requests, concurrency):
+    """
+    Client HTTP asyncio minimal : `concurrency` connexions keep-alive se
+    partagent la liste de requêtes brutes. Retourne le débit, les percentiles
+    de latence (ms) et la répartition des codes de statut
+    """
+    pending = iter(requests)
+    latencies = []
+    statuses = {}
+
+    async def worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for raw in pending:
+                start = time.perf_counter()
+                status = await _http_request(reader, writer, raw)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'ms_p50': round(percentile(latencies, 50), 2),
+        'ms_p99': round(percentile(latencies, 99), 2),
+        'ms_max': round(max(latencies), 2),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+# Poids par défaut du mélange de requêtes de `manage.py bench`
+WORKLOAD_MIX = {
+    'login': 1,
+    'stats': 4,
+    'list': 4,
+    'create_user': 1,
+}
+
+
+def parse_mix(text):
+    """'login=1,stats=4' -> {'login': 1, 'stats': 4}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in WORKLOAD_MIX:
+            raise ValueError(f'Opération inconnue: {name} (attendu: {", ".join(WORKLOAD_MIX)})')
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def latency_summary(latencies, queries):
+    return {
+        'ms_p50': round(percentile(latencies, 50), 2),
+        'ms_p95': round(percentile(latencies, 95), 2),
+        'ms_p99': round(percentile(latencies, 99), 2),
+        'ms_max': round(max(latencies), 2),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def run_workload(users, requests=1000, concurrency=8, mix=None, password='benchmark', seed=0):
+    """
+    Rejoue un mélange de requêtes sur l'URLconf réelle : `concurrency` threads,
+    chacun avec son propre Client connecté (session) en tant que l'un des
+    `users`, se partagent une séquence d'opérations tirée avec `seed`.
+    Retourne le débit, les percentiles de latence (ms) et le nombre moyen de
+    requêtes SQL, au total et par opération
+    """
+    mix = mix or WORKLOAD_MIX
+    new_users = itertools.count()
+
+    def login(client, user):
+        return client.post(
+            '/api/login/',
+            json.dumps({'email_or_phone': user.email, 'password': password}),
+            content_type='application/json',
+        )
+
+    def stats(client, user):
+        return client.get('/api/dashboard/statistiques-generales/')
+
+    def list_reclamations(client, user):
+        return client.get('/api/reclamations/?limit=20')
+
+    def create_user(client, user):
+        n = next(new_users)
+        return client.post(
+            '/api/add-user/',
+            json.dumps({
+                'nom': 'Charge', 'prenom': str(n), 'email': f'bench-new-{n}@example.com',
+                'telephone': f'2219{n:08d}', 'role': 'client',
+            }),
+            content_type='application/json',
+        )
+
+    operations = {'login': login, 'stats': stats, 'list': list_reclamations, 'create_user': create_user}
+    names = list(mix)
+    schedule = random.Random(seed).choices(names, weights=[mix[name] for name in names], k=requests)
+    pending = iter(schedule)
+    pending_lock = threading.Lock()
+    samples = {name: ([], []) for name in names}
+    errors = {name: 0 for name in names}
+    samples_lock = threading.Lock()
+
+    def worker(index):
+        user = users[index % len(users)]
+        client = Client()
+        client.force_login(user)
+        try:
+            while True:
+                with pending_lock:
+                    name = next(pending, None)
+                if name is None:
+                    return
+                # Connexion propre au thread : ne compte que ses requêtes
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    try:
+                        failed = operations[name](client, user).status_code >= 400
+                    except Exception:
+                        failed = True
+                    elapsed = (time.perf_counter() - start) * 1000
+                with samples_lock:
+                    samples[name][0].append(elapsed)
+                    samples[name][1].append(len(ctx.captured_queries))
+                    errors[name] += failed
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [ms for latencies, _ in samples.values() for ms in latencies]
+    all_queries = [n for _, queries in samples.values() for n in queries]
+    return {
+        'requests': len(all_latencies),
+        'concurrency': concurrency,
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_second': round(len(all_latencies) / elapsed, 1),
+        'errors': sum(errors.values()),
+        **latency_summary(all_latencies, all_queries),
+        'operations': {
+            name: {'requests': len(latencies), 'errors': errors[name], **latency_summary(latencies, queries)}
+            for name, (latencies, queries) in samples.items() if latencies
+        },
+    }
@@ -0,0 +1,77 @@
+"""
+Profil SQLite de production (optionnel, SENELEC_SQLITE_PRODUCTION=1).
+
+- journal WAL : les lectures ne bloquent plus les écritures (et inversement)
+- synchronous=NORMAL : un fsync par checkpoint plutôt que par transaction
+  (durable en WAL sauf coupure de courant au mauvais moment)
+- busy_timeout : un écrivain attend le verrou au lieu d'échouer aussitôt
+- mmap et cache de pages plus grands pour les lectures
+- transactions IMMEDIATE et connexions persistantes (voir settings.py)
+
+retry_on_busy complète le tout pour les écritures qui échouent malgré tout
+avec "database is locked".
+"""
+from django.conf import settings
+from django.db import OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from functools import wraps
+import logging
+import random
+import time
+
+
+logger = logging.getLogger(__name__)
+
+PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # millisecondes
+    'mmap_size': 268435456,  # 256 Mo
+    'cache_size': -65536,  # en Kio (négatif) : 64 Mo
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+
+def sqlite_pragmas():
+    return {**PRODUCTION_PRAGMAS, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Applique les pragmas du profil de production à chaque nouvelle connexion SQLite"""
+    if connection.vendor != 'sqlite' or not getattr(settings, 'SQLITE_PRODUCTION', False):
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_busy(func=None, attempts=5, base_delay=0.05, using='default'):
+    """
+    Réessaie une écriture qui échoue sur un verrou SQLite, avec attente
+    exponentielle et aléa. Sans effet à l'intérieur d'un bloc atomic : la
+    transaction englobante est déjà compromise, c'est à elle de réessayer.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            connection = connections[using]
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as e:
+                    if not is_busy_error(e) or attempt == attempts or connection.in_atomic_block:
+                        raise
+                    delay = base_delay * 2 ** (attempt - 1) * (0.5 + random.random())
+                    logger.warning("Base verrouillée (%s), tentative %s dans %.0f ms", func.__name__, attempt + 1, delay * 1000)
+                    time.sleep(delay)
+        return wrapper
+
+    return decorator(func) if func else decorator
@@ -0,0 +1,198 @@
+"""
+Diffusion en direct des changements de réclamations (Server-Sent Events).
+
+Un courtier en mémoire (par processus) reçoit les événements publiés par les
+signaux des modèles et les distribue aux connexions SSE abonnées. Chaque
+connexion est une simple file asyncio : des milliers de connexions inactives
+ne coûtent aucun thread. Les derniers événements sont conservés pour rejouer
+ce qu'un client a manqué depuis son Last-Event-ID.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from django.conf import settings
+from django.db import transaction
+import asyncio
+import itertools
+import json
+import secrets
+import threading
+
+from .permissions import STAFF_ROLES
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    type: str
+    data: dict
+    user_id: str
+    technicien_ids: frozenset = field(default_factory=frozenset)
+
+    def format(self):
+        """Représentation au format text/event-stream"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+def audience_filter(user):
+    """Prédicat des événements visibles par l'utilisateur (mêmes règles que les listes)"""
+    user_id = str(user.pk)
+    if user.role in STAFF_ROLES or user.is_superuser:
+        return lambda event: True
+    if user.role == 'technicien':
+        return lambda event: user_id in event.technicien_ids
+    return lambda event: event.user_id == user_id
+
+
+class Subscriber:
+
+    def __init__(self, accepts, loop, max_queue):
+        self.accepts = accepts
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+
+    def deliver(self, event):
+        # Exécuté dans la boucle de l'abonné (via call_soon_threadsafe)
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Client trop lent : on coupe, il se reconnectera avec Last-Event-ID
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class EventBroker:
+
+    def __init__(self, history_size=1000, max_queue=100):
+        # Les identifiants ne sont valables que pour ce processus
+        self.token = secrets.token_hex(4)
+        self._counter = itertools.count(1)
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.max_queue = max_queue
+
+    def publish(self, event_type, data, user_id, technicien_ids=()):
+        with self._lock:
+            event = Event(
+                id=f'{self.token}-{next(self._counter)}',
+                type=event_type,
+                data=data,
+                user_id=str(user_id),
+                technicien_ids=frozenset(str(pk) for pk in technicien_ids if pk),
+            )
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.accepts(event):
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+                except RuntimeError:
+                    # Boucle fermée : l'abonné a disparu
+                    self.unsubscribe(subscriber)
+        return event
+
+    def subscribe(self, accepts, last_event_id=None):
+        """
+        Enregistre un abonné pour la boucle asyncio courante. Retourne
+        (abonné, événements à rejouer). Les événements à rejouer valent None si
+        Last-Event-ID n'est plus dans l'historique : le client doit tout recharger.
+        """
+        subscriber = Subscriber(accepts, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            replay = self._replay(last_event_id, accepts) if last_event_id else []
+        return subscriber, replay
+
+    def _replay(self, last_event_id, accepts):
+        token, _, number = last_event_id.partition('-')
+        if token != self.token or not number.isdigit():
+            return None
+        number = int(number)
+        events = list(self._history)
+        if events and int(events[0].id.rsplit('-', 1)[1]) > number + 1:
+            # Des événements intermédiaires ont été évincés de l'historique
+            return None
+        return [event for event in events if int(event.id.rsplit('-', 1)[1]) > number and accepts(event)]
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+
+broker = EventBroker(
+    history_size=getattr(settings, 'EVENTS_HISTORY_SIZE', 1000),
+    max_queue=getattr(settings, 'EVENTS_MAX_QUEUE', 100),
+)
+
+
+def reclamation_event_data(reclamation, previous_status=None, previous_technicien_id=None):
+    return {
+        'id': str(reclamation.pk),
+        'status': reclamation.status,
+        'ancien_status': previous_status,
+        'technicien_id': str(reclamation.technicien_id) if reclamation.technicien_id else None,
+        'ancien_technicien_id': str(previous_technicien_id) if previous_technicien_id else None,
+        'date_updated': reclamation.date_updated.isoformat() if reclamation.date_updated else None,
+    }
+
+
+def publish_reclamation_change(reclamation, created=False):
+    """
+    Publie, après validation de la transaction, l'événement correspondant à
+    l'enregistrement d'une réclamation (création, statut ou technicien modifié)
+    """
+    previous_status = reclamation.loaded_status
+    previous_technicien_id = reclamation.loaded_technicien_id
+    if created:
+        event_type = 'reclamation_creee'
+    elif previous_status != reclamation.status:
+        event_type = 'statut_modifie'
+    elif previous_technicien_id != reclamation.technicien_id:
+        event_type = 'technicien_modifie'
+    else:
+        return
+
+    # Les données sont figées maintenant : l'état chargé est réinitialisé après save()
+    data = reclamation_event_data(reclamation, previous_status, previous_technicien_id)
+    user_id = reclamation.user_id
+    technicien_ids = (reclamation.technicien_id, previous_technicien_id)
+    transaction.on_commit(lambda: broker.publish(event_type, data, user_id, technicien_ids))
+
+
+async def event_stream(user, last_event_id=None, heartbeat=None):
+    """Générateur asynchrone du flux SSE d'un utilisateur"""
+    heartbeat = heartbeat or getattr(settings, 'EVENTS_HEARTBEAT', 15)
+    subscriber, replay = broker.subscribe(audience_filter(user), last_event_id)
+    try:
+        yield f"retry: {getattr(settings, 'EVENTS_RETRY_MS', 5000)}\n\n"
+        if replay is None:
+            yield 'event: reset\ndata: {}\n\n'
+        else:
+            for event in replay:
+                yield event.format()
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                yield ': ping\n\n'
+                continue
+            if event is None:
+                break
+            yield event.format()
+    finally:
+        broker.unsubscribe(subscriber)
@@ -0,0 +1,113 @@
+"""
+Export des réclamations en CSV ou Parquet avec une mémoire constante :
+les lignes sont lues par blocs (QuerySet.iterator) et écrites au fil de l'eau.
+"""
+from asgiref.sync import sync_to_async
+from itertools import islice
+import csv
+import uuid
+
+from .models import Reclamation
+
+
+# (colonne exportée, champ values_list, type Parquet)
+EXPORT_COLUMNS = [
+    ('id', 'id', 'string'),
+    ('description', 'description', 'string'),
+    ('status', 'status', 'string'),
+    ('categorie', 'categories__nom', 'string'),
+    ('client_nom', 'user__nom', 'string'),
+    ('client_prenom', 'user__prenom', 'string'),
+    ('client_email', 'user__email', 'string'),
+    ('client_telephone', 'user__telephone', 'string'),
+    ('technicien_nom', 'technicien__nom', 'string'),
+    ('technicien_prenom', 'technicien__prenom', 'string'),
+    ('date_created', 'date_created', 'timestamp'),
+    ('date_reponse', 'dateReponse', 'timestamp'),
+    ('date_updated', 'date_updated', 'timestamp'),
+]
+
+EXPORT_FORMATS = ('csv', 'parquet')
+
+
+def export_queryset(queryset=None):
+    if queryset is None:
+        queryset = Reclamation.objects.all()
+    # Tri par l'index (date_created, id) pour un export stable
+    return queryset.order_by('date_created', 'id').values_list(*[field for _, field, _ in EXPORT_COLUMNS])
+
+
+def iter_rows(queryset, chunk_size=2000):
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [str(value) if isinstance(value, uuid.UUID) else value for value in row]
+
+
+class Echo:
+    """Pseudo-fichier dont write() renvoie la ligne, pour csv.writer en streaming"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=2000):
+    """Produit le CSV ligne par ligne (en-tête inclus)"""
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _, _ in EXPORT_COLUMNS])
+    for row in iter_rows(queryset, chunk_size):
+        yield writer.writerow([value.isoformat() if hasattr(value, 'isoformat') else value for value in row])
+
+
+async def aiter_blocks(iterator, size=500):
+    """
+    Itérateur asynchrone sur un itérateur synchrone (iter_csv, blocs d'un
+    fichier), pour StreamingHttpResponse sous ASGI : Django consommerait
+    sinon tout l'itérateur synchrone avant d'envoyer le premier octet.
+    Chaque lot de `size` éléments est lu par sync_to_async dans le thread
+    des vues synchrones (celui du curseur de base), puis envoyé.
+    """
+    iterator = iter(iterator)
+    next_block = sync_to_async(lambda: list(islice(iterator, size)))
+    try:
+        while block := await next_block():
+            for part in block:
+                yield part
+    finally:
+        # Client déconnecté : le curseur est fermé dans son thread
+        if hasattr(iterator, 'close'):
+            await sync_to_async(iterator.close)()
+
+
+def write_csv(queryset, f, chunk_size=2000):
+    for line in iter_csv(queryset, chunk_size):
+        f.write(line)
+
+
+def parquet_schema():
+    import pyarrow as pa
+    types = {'string': pa.string(), 'timestamp': pa.timestamp('us', tz='UTC')}
+    return pa.schema([(name, types[kind]) for name, _, kind in EXPORT_COLUMNS])
+
+
+def write_parquet(queryset, f, row_group_size=50_000, chunk_size=2000):
+    """
+    Écrit le Parquet par groupes de lignes : seul le groupe en cours
+    est gardé en mémoire
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema()
+    columns = [[] for _ in EXPORT_COLUMNS]
+    with pq.ParquetWriter(f, schema, compression='zstd') as writer:
+        def flush():
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            for column in columns:
+                column.clear()
+
+        for row in iter_rows(queryset, chunk_size):
+            for column, value in zip(columns, row):
+                column.append(value)
+            if len(columns[0]) >= row_group_size:
+                flush()
+        if columns[0]:
+            flush()
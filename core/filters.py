@@ -0,0 +1,71 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta
+import uuid
+
+from .models import Reclamation
+
+
+VALID_STATUSES = {status for status, _ in Reclamation.STATUS_CHOICES}
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def parse_uuid(value, name):
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise InvalidFilter(f'Identifiant invalide pour {name}')
+
+
+def parse_bound(value, name, end=False):
+    """
+    Interprète une date (AAAA-MM-JJ, bornes incluses) ou une date-heure ISO 8601.
+    Retourne (datetime, borne_exclusive).
+    """
+    moment = parse_datetime(value)
+    if moment is not None:
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment, False
+
+    day = parse_date(value)
+    if day is None:
+        raise InvalidFilter(f'Date invalide pour {name}')
+    if end:
+        # Une date de fin inclut toute la journée
+        return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)), True
+    return timezone.make_aware(datetime.combine(day, time.min)), False
+
+
+def filter_reclamations(queryset, params):
+    """
+    Applique les filtres communs des APIs de réclamations :
+    status (liste séparée par des virgules), categorie, technicien,
+    date_debut et date_fin sur date_created
+    """
+    status = params.get('status')
+    if status:
+        statuses = [s for s in status.split(',') if s]
+        unknown = set(statuses) - VALID_STATUSES
+        if unknown:
+            raise InvalidFilter(f"Statut invalide: {', '.join(sorted(unknown))}")
+        queryset = queryset.filter(status__in=statuses)
+
+    if params.get('categorie'):
+        queryset = queryset.filter(categories_id=parse_uuid(params['categorie'], 'categorie'))
+
+    if params.get('technicien'):
+        queryset = queryset.filter(technicien_id=parse_uuid(params['technicien'], 'technicien'))
+
+    if params.get('date_debut'):
+        start, _ = parse_bound(params['date_debut'], 'date_debut')
+        queryset = queryset.filter(date_created__gte=start)
+
+    if params.get('date_fin'):
+        end, exclusive = parse_bound(params['date_fin'], 'date_fin', end=True)
+        queryset = queryset.filter(**{'date_created__lt' if exclusive else 'date_created__lte': end})
+
+    return queryset
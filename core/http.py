@@ -0,0 +1,119 @@
+"""
+Requêtes conditionnelles et en-têtes de cache des vues de lecture.
+
+Les validateurs (ETag, Last-Modified) sont calculés avant la vue à partir de
+données peu coûteuses (compteur de version, contenu statique) : une requête
+If-None-Match / If-Modified-Since qui correspond reçoit un 304 sans que la vue
+ni ses requêtes ne soient exécutées.
+"""
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+from functools import wraps
+import hashlib
+import json
+
+from .permissions import STAFF_ROLES
+
+
+DEFAULT_MAX_AGE = 60
+
+
+def content_etag(payload):
+    """ETag fort d'un contenu JSON statique (calculé une seule fois)"""
+    return '"%s"' % hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32]
+
+
+def static_validators(payload):
+    """Validateurs d'une vue dont le corps ne dépend d'aucune donnée"""
+    etag = content_etag(payload)
+    return lambda request, *args, **kwargs: (etag, None)
+
+
+def cache_control_for(user, max_age):
+    """
+    Politique de cache selon le rôle : les réponses anonymes peuvent être
+    partagées, celles d'un utilisateur restent privées, et le personnel
+    (superviseur/admin) revalide toujours pour travailler sur des données à jour
+    """
+    if not user.is_authenticated:
+        return {'public': True, 'max_age': max_age}
+    if user.role in STAFF_ROLES or user.is_superuser:
+        return {'private': True, 'no_cache': True}
+    return {'private': True, 'max_age': max_age}
+
+
+def has_credentials(request):
+    """Cookie de session ou en-tête Authorization, sans charger l'utilisateur"""
+    return settings.SESSION_COOKIE_NAME in request.COOKIES or 'Authorization' in request.headers
+
+
+def not_modified_cache_control(request, max_age):
+    """
+    Politique d'un 304 : charger l'utilisateur coûterait deux requêtes (session
+    puis utilisateur), le rôle n'est donc pas connu. Une requête identifiée
+    reste privée et revalide (prudent pour le personnel, le 304 est peu coûteux)
+    """
+    if has_credentials(request):
+        return {'private': True, 'no_cache': True}
+    return {'public': True, 'max_age': max_age}
+
+
+def apply_cache_headers(response, cache_control):
+    patch_cache_control(response, **cache_control)
+    # L'utilisateur est identifié par le cookie de session ou le jeton d'accès
+    patch_vary_headers(response, ('Cookie', 'Authorization'))
+    return response
+
+
+def read_max_age(max_age):
+    return getattr(settings, 'READ_CACHE_MAX_AGE', DEFAULT_MAX_AGE) if max_age is None else max_age
+
+
+def conditional(validators, max_age=None):
+    """
+    Décorateur de vue de lecture : `validators(request, *args, **kwargs)`
+    retourne (etag, last_modified) sans construire le corps, ou (None, None)
+    pour désactiver la validation ; une vue asynchrone peut recevoir des
+    validateurs asynchrones, attendus sans passer par le thread de
+    sync_to_async. Repose sur django.views.decorators.http.condition
+    et ajoute Cache-Control / Vary selon le rôle (réponses 200) ou selon la
+    seule présence d'identifiants (304). Compatible vues asynchrones.
+    """
+    def decorator(view):
+        # Les validateurs sont calculés une seule fois puis lus par condition()
+        conditioned = condition(
+            etag_func=lambda request, *args, **kwargs: request._http_validators[0],
+            last_modified_func=lambda request, *args, **kwargs: request._http_validators[1],
+        )(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if iscoroutinefunction(validators):
+                    request._http_validators = await validators(request, *args, **kwargs)
+                else:
+                    request._http_validators = await sync_to_async(validators)(request, *args, **kwargs)
+                response = await conditioned(request, *args, **kwargs)
+                age = read_max_age(max_age)
+                if response.status_code == 304:
+                    return apply_cache_headers(response, not_modified_cache_control(request, age))
+                if response.status_code == 200:
+                    return apply_cache_headers(response, cache_control_for(await request.auser(), age))
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            request._http_validators = validators(request, *args, **kwargs)
+            response = conditioned(request, *args, **kwargs)
+            age = read_max_age(max_age)
+            if response.status_code == 304:
+                return apply_cache_headers(response, not_modified_cache_control(request, age))
+            if response.status_code == 200:
+                return apply_cache_headers(response, cache_control_for(request.user, age))
+            return response
+        return wrapper
+
+    return decorator
@@ -0,0 +1,60 @@
+"""
+Identifiants UUID version 7 (RFC 9562), ordonnés dans le temps.
+
+Les 48 premiers bits sont l'horodatage Unix en millisecondes : les nouvelles
+lignes s'ajoutent à la fin du B-tree de la clé primaire au lieu d'un point
+aléatoire (uuid4), et trier par id revient à trier par date de création.
+Même type de colonne qu'uuid4 (UUIDField), les deux versions coexistent ; les
+anciens uuid4 ne suivent simplement pas l'ordre chronologique.
+
+Dans une même milliseconde, les 12 bits suivants servent de compteur (méthode 1
+de la RFC, initialisé au hasard) : les identifiants d'un processus restent
+strictement croissants, y compris si l'horloge recule.
+(uuid.uuid7 n'existe qu'à partir de Python 3.14)
+"""
+import secrets
+import threading
+import time
+import uuid
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+COUNTER_MAX = 0xFFF
+
+
+def uuid7_from_parts(timestamp_ms, rand_a, rand_b):
+    """Assemble horodatage (48 bits), rand_a (12 bits) et rand_b (62 bits)"""
+    return uuid.UUID(int=(
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (rand_a & COUNTER_MAX) << 64
+        | 0b10 << 62
+        | rand_b & 0x3FFF_FFFF_FFFF_FFFF
+    ))
+
+
+def uuid7():
+    """Nouvel UUID version 7 (valeur par défaut des clés primaires)"""
+    global _last_ms, _counter
+    now_ms = time.time_ns() // 1_000_000
+    with _lock:
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Bit de poids fort à 0 : au moins 2048 incréments avant débordement
+            _counter = secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > COUNTER_MAX:
+                # Compteur épuisé : on emprunte la milliseconde suivante
+                _last_ms += 1
+                _counter = secrets.randbits(11)
+        timestamp_ms, counter = _last_ms, _counter
+    return uuid7_from_parts(timestamp_ms, counter, secrets.randbits(62))
+
+
+def uuid7_timestamp_ms(value):
+    """Horodatage (ms Unix) d'un UUID version 7"""
+    return value.int >> 80
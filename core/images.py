@@ -0,0 +1,365 @@
+"""
+Pipeline des images de réclamations : stockage en flux dédupliqué par
+empreinte SHA-256, puis génération des variantes compressées (sans EXIF)
+dans un pool de processus, hors du thread de la requête.
+
+Les métadonnées (EXIF, XMP, IPTC, commentaires) sont retirées de l'original
+à l'enregistrement, sans décoder ni réencoder l'image : seuls les segments
+(JPEG) ou blocs (PNG, WebP) de métadonnées sont omis à la copie. L'empreinte
+est celle du fichier nettoyé, qui n'est plus jamais modifié ensuite : le nom
+de l'original correspond toujours à son contenu.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import default_storage
+import hashlib
+import logging
+import os
+import tempfile
+
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS_DIR = 'reclamations/originals'
+VARIANTS_DIR = 'reclamations/variants'
+
+# nom de variante -> (taille maximale en pixels, qualité JPEG)
+DEFAULT_VARIANTS = {
+    'thumbnail': (256, 70),
+    'preview': (1024, 72),
+}
+
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'MPO': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+_executor = None
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def get_variants():
+    return getattr(settings, 'RECLAMATION_IMAGE_VARIANTS', DEFAULT_VARIANTS)
+
+
+def original_name(image_hash, extension):
+    return f'{ORIGINALS_DIR}/{image_hash[:2]}/{image_hash}.{extension}'
+
+
+def variant_name(image_hash, variant):
+    return f'{VARIANTS_DIR}/{image_hash[:2]}/{image_hash}_{variant}.jpg'
+
+
+def variant_urls(image_name, image_hash):
+    """URLs de l'original et de ses variantes, dérivées sans accès disque"""
+    if not image_name:
+        return None
+    urls = {'original': default_storage.url(image_name)}
+    if image_hash:
+        for variant in get_variants():
+            urls[variant] = default_storage.url(variant_name(image_hash, variant))
+    return urls
+
+
+def file_hash(path, chunk_size=64 * 1024):
+    """Empreinte SHA-256 d'un fichier lu par blocs"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+CHUNK_SIZE = 64 * 1024
+
+EXIF_ORIENTATION = 0x0112
+
+# Segments JPEG omis : APP1 (EXIF, XMP), APP13 (IPTC), commentaires
+JPEG_METADATA_MARKERS = {0xE1, 0xED, 0xFE}
+PNG_METADATA_CHUNKS = {b'eXIf', b'tEXt', b'zTXt', b'iTXt'}
+WEBP_METADATA_CHUNKS = {b'EXIF', b'XMP '}
+
+
+def _copy(src, write, size):
+    while size > 0:
+        chunk = src.read(min(size, CHUNK_SIZE))
+        if not chunk:
+            raise InvalidImage('Fichier image tronqué')
+        write(chunk)
+        size -= len(chunk)
+
+
+def _orientation_exif(payload):
+    """APP1 EXIF réduit à la seule orientation (None si l'image est droite)"""
+    from PIL import Image
+
+    exif = Image.Exif()
+    try:
+        exif.load(payload)
+    except Exception:
+        return None
+    orientation = exif.get(EXIF_ORIENTATION)
+    if orientation in (None, 1):
+        return None
+    minimal = Image.Exif()
+    minimal[EXIF_ORIENTATION] = orientation
+    data = minimal.tobytes()
+    return b'\xff\xe1' + (len(data) + 2).to_bytes(2, 'big') + data
+
+
+def _strip_jpeg(src, write):
+    """
+    Copie un JPEG sans ses segments de métadonnées ; l'orientation EXIF est
+    conservée. La copie s'arrête au marqueur EOI de la première image (les
+    images secondaires d'un MPO portent leurs propres EXIF)
+    """
+    if src.read(2) != b'\xff\xd8':
+        raise InvalidImage('Fichier image invalide')
+    header = [b'\xff\xd8']
+    while True:
+        if src.read(1) != b'\xff':
+            raise InvalidImage('Fichier image invalide')
+        marker = src.read(1)
+        # Octets de remplissage 0xFF éventuels avant le marqueur
+        while marker == b'\xff':
+            marker = src.read(1)
+        if not marker:
+            raise InvalidImage('Fichier image tronqué')
+        marker = marker[0]
+        length = int.from_bytes(src.read(2), 'big')
+        payload = src.read(length - 2)
+        if len(payload) != length - 2:
+            raise InvalidImage('Fichier image tronqué')
+        if marker == 0xE1 and payload.startswith(b'Exif\x00\x00'):
+            header.append(_orientation_exif(payload) or b'')
+        elif marker in JPEG_METADATA_MARKERS or (marker == 0xE2 and payload.startswith(b'MPF\x00')):
+            continue
+        else:
+            header.append(bytes((0xFF, marker)) + length.to_bytes(2, 'big') + payload)
+        if marker == 0xDA:
+            break
+    write(b''.join(header))
+
+    # Données compressées : seuls les marqueurs (0xFF non suivi de 0x00) comptent
+    buffer = b''
+    while True:
+        chunk = src.read(CHUNK_SIZE)
+        if not chunk:
+            write(buffer)
+            return
+        buffer += chunk
+        position = 0
+        while True:
+            index = buffer.find(b'\xff', position)
+            if index == -1:
+                keep = len(buffer)
+                break
+            if index + 1 >= len(buffer):
+                keep = index
+                break
+            marker = buffer[index + 1]
+            if marker == 0xD9:
+                write(buffer[:index + 2])
+                return
+            if marker in (0x00, 0xFF) or 0xD0 <= marker <= 0xD7:
+                position = index + 1
+                continue
+            # Segment entre deux passes (DHT, SOS...) : son contenu n'est pas interprété
+            if index + 4 > len(buffer):
+                keep = index
+                break
+            end = index + 2 + int.from_bytes(buffer[index + 2:index + 4], 'big')
+            if end > len(buffer):
+                keep = index
+                break
+            position = end
+        write(buffer[:keep])
+        buffer = buffer[keep:]
+
+
+def _strip_png(src, write):
+    signature = src.read(8)
+    write(signature)
+    while True:
+        head = src.read(8)
+        if len(head) != 8:
+            raise InvalidImage('Fichier image tronqué')
+        length, chunk_type = int.from_bytes(head[:4], 'big'), head[4:]
+        if chunk_type in PNG_METADATA_CHUNKS:
+            src.seek(length + 4, os.SEEK_CUR)
+            continue
+        write(head)
+        _copy(src, write, length + 4)
+        if chunk_type == b'IEND':
+            return
+
+
+def _strip_webp(src, out):
+    riff = src.read(12)
+    out.write(riff)
+    vp8x_flags = None
+    while True:
+        head = src.read(8)
+        if len(head) < 8:
+            break
+        chunk_type, length = head[:4], int.from_bytes(head[4:], 'little')
+        size = length + (length & 1)
+        if chunk_type in WEBP_METADATA_CHUNKS:
+            src.seek(size, os.SEEK_CUR)
+            continue
+        if chunk_type == b'VP8X':
+            vp8x_flags = out.tell() + 8
+        out.write(head)
+        _copy(src, out.write, size)
+    if vp8x_flags is not None:
+        # Indicateurs EXIF (0x08) et XMP (0x04) de l'en-tête étendu
+        out.seek(vp8x_flags)
+        flags = out.read(1)[0]
+        out.seek(vp8x_flags)
+        out.write(bytes((flags & ~0x0C,)))
+    size = out.seek(0, os.SEEK_END)
+    out.seek(4)
+    out.write((size - 8).to_bytes(4, 'little'))
+
+
+def strip_metadata(source, image_format, tmp_dir):
+    """
+    Copie `source` dans un fichier temporaire de `tmp_dir` sans ses
+    métadonnées, en flux. Retourne le chemin de la copie
+    """
+    with open(source, 'rb') as src, \
+            tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False, mode='w+b') as out:
+        try:
+            if image_format in ('JPEG', 'MPO'):
+                _strip_jpeg(src, out.write)
+            elif image_format == 'PNG':
+                _strip_png(src, out.write)
+            else:
+                _strip_webp(src, out)
+        except Exception:
+            out.close()
+            os.remove(out.name)
+            raise
+    return out.name
+
+
+def store_upload(uploaded_file):
+    """
+    Enregistre un fichier envoyé sans le charger en mémoire : il est copié
+    par blocs sans ses métadonnées, haché puis déplacé à son emplacement
+    définitif. Un fichier déjà connu n'est pas dupliqué. Retourne (nom, empreinte).
+    """
+    from PIL import Image
+
+    max_size = getattr(settings, 'RECLAMATION_IMAGE_MAX_SIZE', 15 * 1024 * 1024)
+    if uploaded_file.size > max_size:
+        raise InvalidImage(f'Image trop volumineuse (maximum {max_size // (1024 * 1024)} Mo)')
+
+    tmp_dir = os.path.join(settings.MEDIA_ROOT, 'reclamations', 'tmp')
+    os.makedirs(tmp_dir, exist_ok=True)
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        # Déjà écrit sur disque par TemporaryFileUploadHandler
+        source = uploaded_file.temporary_file_path()
+    else:
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            for chunk in uploaded_file.chunks():
+                tmp.write(chunk)
+        source = tmp.name
+
+    try:
+        # verify() ne lit que la structure du fichier, pas les pixels
+        with Image.open(source) as img:
+            image_format = img.format
+            img.verify()
+    except Exception:
+        _discard(source, uploaded_file)
+        raise InvalidImage('Fichier image invalide')
+    if image_format not in ALLOWED_FORMATS:
+        _discard(source, uploaded_file)
+        raise InvalidImage(f'Format non supporté: {image_format}')
+
+    try:
+        stripped = strip_metadata(source, image_format, tmp_dir)
+    except InvalidImage:
+        raise
+    except Exception:
+        raise InvalidImage('Fichier image invalide')
+    finally:
+        _discard(source, uploaded_file)
+
+    # Empreinte du fichier tel qu'il est stocké (lu depuis le cache de pages)
+    image_hash = file_hash(stripped)
+    name = original_name(image_hash, ALLOWED_FORMATS[image_format])
+    path = default_storage.path(name)
+    if os.path.exists(path):
+        os.remove(stripped)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file_move_safe(stripped, path, allow_overwrite=True)
+    return name, image_hash
+
+
+def _discard(source, uploaded_file):
+    if not hasattr(uploaded_file, 'temporary_file_path') and os.path.exists(source):
+        os.remove(source)
+
+
+def generate_variants(media_root, name, image_hash, variants):
+    """
+    Exécutée dans un processus du pool : produit les variantes JPEG
+    manquantes (orientation appliquée, sans métadonnées). L'original n'est
+    jamais modifié
+    """
+    from PIL import Image, ImageOps
+
+    source = os.path.join(media_root, name)
+    missing = {
+        variant: spec for variant, spec in variants.items()
+        if not os.path.exists(os.path.join(media_root, variant_name(image_hash, variant)))
+    }
+
+    if not missing:
+        return []
+
+    with Image.open(source) as img:
+        largest = max(size for size, _ in missing.values())
+        # draft() laisse le décodeur JPEG réduire l'image à moindre coût
+        img.draft('RGB', (largest, largest))
+        base = ImageOps.exif_transpose(img).convert('RGB')
+
+    for variant, (size, quality) in missing.items():
+        target = os.path.join(media_root, variant_name(image_hash, variant))
+        variant_img = base.copy()
+        variant_img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        _save_atomic(variant_img, target, 'JPEG', quality=quality)
+    return sorted(missing)
+
+
+def _save_atomic(img, path, image_format, quality):
+    tmp_path = f'{path}.tmp'
+    # Aucun paramètre exif transmis : l'image enregistrée n'a pas de métadonnées
+    img.save(tmp_path, format=image_format, quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=getattr(settings, 'RECLAMATION_IMAGE_WORKERS', 2))
+    return _executor
+
+
+def schedule_variants(name, image_hash):
+    """Soumet la génération des variantes au pool sans attendre le résultat"""
+    future = get_executor().submit(
+        generate_variants, str(settings.MEDIA_ROOT), name, image_hash, get_variants()
+    )
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error("Échec de génération des variantes: %s", future.exception())
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from core.assignment import engine
+
+
+class Command(BaseCommand):
+    help = 'Assigne les réclamations ouvertes sans technicien au technicien le moins chargé'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        assigned = engine.assign(batch_size=options['batch_size'])
+        self.stdout.write(f'✅ {assigned} réclamation(s) assignée(s)')
+        for tech_id, load in sorted(engine.loads().items(), key=lambda item: item[1]):
+            self.stdout.write(f'   {tech_id}: {load} réclamation(s) ouverte(s)')
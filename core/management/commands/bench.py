@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from core.bench import WORKLOAD_MIX, benchmark_database, parse_mix, run_workload, seed_dataset
+from core.models import User
+import json
+import os
+import subprocess
+import tempfile
+
+
+class Command(BaseCommand):
+    help = (
+        'Test de charge en processus : mélange connexion / statistiques / liste / création '
+        'd\'utilisateur sur un jeu de données généré, résultats en JSON (débit, p50/p95/p99, requêtes SQL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000)
+        parser.add_argument('--techniciens', type=int, default=50)
+        parser.add_argument('--reclamations', type=int, default=20000)
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8, help='threads clients')
+        parser.add_argument(
+            '--mix',
+            default=','.join(f'{name}={weight}' for name, weight in WORKLOAD_MIX.items()),
+            help='poids des opérations, ex. "login=1,stats=4,list=4,create_user=1"',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--fast-hasher',
+            action='store_true',
+            help='Utiliser un hacheur rapide pour isoler le coût base de données du coût PBKDF2',
+        )
+        parser.add_argument('--output', help='Fichier JSON où écrire les résultats')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        overrides = {'LOGIN_THROTTLE_ENABLED': False}
+        if options['fast_hasher']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        # Fichier plutôt que base en mémoire partagée : les threads écrivent en parallèle
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(**overrides):
+            with benchmark_database(name=os.path.join(tmp_dir, 'bench.sqlite3')):
+                seed_dataset(
+                    clients=options['clients'],
+                    techniciens=options['techniciens'],
+                    reclamations=options['reclamations'],
+                )
+                users = list(User.objects.filter(role='client').order_by('username')[:options['concurrency']])
+                results = run_workload(
+                    users,
+                    requests=options['requests'],
+                    concurrency=options['concurrency'],
+                    mix=mix,
+                    seed=options['seed'],
+                )
+
+        report = {
+            'commit': self.git_commit(),
+            'date': timezone.now().isoformat(),
+            'async_views': settings.ASYNC_VIEWS,
+            'sqlite_production': getattr(settings, 'SQLITE_PRODUCTION', False),
+            'fast_hasher': options['fast_hasher'],
+            'dataset': {
+                'clients': options['clients'],
+                'techniciens': options['techniciens'],
+                'reclamations': options['reclamations'],
+            },
+            'mix': mix,
+            **results,
+        }
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.assignment import AssignmentEngine
+from core.bench import benchmark_database, seed_dataset
+from core.models import Reclamation
+import json
+import time
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit du moteur d'assignation automatique"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reclamations', type=int, default=100_000)
+        parser.add_argument('--techniciens', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_dataset(
+                clients=1000, techniciens=options['techniciens'],
+                reclamations=options['reclamations'], unassigned=True,
+            )
+            # Toutes les réclamations du jeu de données sont à assigner
+            Reclamation.objects.update(status='en_attente')
+            engine = AssignmentEngine()
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                assigned = engine.assign(batch_size=options['batch_size'])
+                elapsed = time.perf_counter() - start
+            loads = engine.loads().values()
+
+        self.stdout.write(json.dumps({
+            'assigned': assigned,
+            'seconds': round(elapsed, 3),
+            'per_second': round(assigned / elapsed) if elapsed else None,
+            'queries': len(ctx.captured_queries),
+            'load_min': min(loads),
+            'load_max': max(loads),
+        }, indent=2))
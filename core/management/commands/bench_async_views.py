@@ -0,0 +1,99 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from core.bench import benchmark_database, build_request, http_load, seed_dataset
+from core.models import User
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare sous uvicorn les vues synchrones et asynchrones '
+        '(requêtes/s et latence p99 à forte concurrence)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=500)
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument(
+            '--endpoint',
+            choices=['stats', 'stats-fresh', 'login'],
+            default='stats-fresh',
+            help='stats : statistiques en cache, stats-fresh : recalculées, login : connexion (PBKDF2)',
+        )
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        if importlib.util.find_spec('uvicorn') is None:
+            raise CommandError('uvicorn est requis : pip install uvicorn')
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_name = os.path.join(tmp_dir, 'bench.sqlite3')
+            with benchmark_database(name=db_name):
+                seed_dataset(clients=500, techniciens=20, reclamations=20000)
+                User.objects.create(
+                    username='bench@senelec.sn', email='bench@senelec.sn', telephone='221799999999',
+                    nom='Bench', prenom='Async', password=make_password('benchmark'),
+                )
+                requests = self.build_requests(options)
+
+                for mode in ('sync', 'async'):
+                    server = self.start_server(mode, db_name, options['port'])
+                    try:
+                        results[mode] = asyncio.run(
+                            http_load('127.0.0.1', options['port'], requests, options['concurrency'])
+                        )
+                    finally:
+                        server.terminate()
+                        server.wait(timeout=10)
+
+        self.stdout.write(json.dumps({'endpoint': options['endpoint'], **results}, indent=2))
+
+    def build_requests(self, options):
+        host = f"127.0.0.1:{options['port']}"
+        if options['endpoint'] == 'login':
+            body = json.dumps({'email_or_phone': 'bench@senelec.sn', 'password': 'benchmark'})
+            raw = build_request('POST', '/api/login/', host, body)
+        else:
+            path = '/api/dashboard/statistiques-generales/'
+            if options['endpoint'] == 'stats-fresh':
+                path += '?fresh=1'
+            raw = build_request('GET', path, host)
+        return [raw] * options['requests']
+
+    def start_server(self, mode, db_name, port):
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'senelec_system.settings',
+            'SENELEC_DB_NAME': db_name,
+            'SENELEC_ASYNC_VIEWS': '1' if mode == 'async' else '0',
+            # Toutes les connexions viennent de la même IP et du même compte
+            'SENELEC_LOGIN_THROTTLE': '0',
+        }
+        server = subprocess.Popen(
+            [
+                sys.executable, '-m', 'uvicorn', 'senelec_system.asgi:application',
+                '--port', str(port), '--lifespan', 'off', '--log-level', 'warning',
+                '--no-access-log', '--backlog', '4096',
+            ],
+            env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return server
+            except OSError:
+                if server.poll() is not None:
+                    raise CommandError(f'Le serveur uvicorn ({mode}) n\'a pas démarré')
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'Le serveur uvicorn ({mode}) ne répond pas')
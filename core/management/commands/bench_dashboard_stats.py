@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.bench import benchmark_database, seed_dataset, measure
+from core.models import User, Categories, Reclamation
+from core.stats import compute_dashboard_stats
+import json
+
+
+def legacy_dashboard_stats():
+    """Ancien calcul : un COUNT(*) par compteur (8 requêtes)"""
+    return {
+        'total_users': User.objects.count(),
+        'total_clients': User.objects.filter(role='client').count(),
+        'total_techniciens': User.objects.filter(role='technicien').count(),
+        'total_categories': Categories.objects.count(),
+        'total_reclamations': Reclamation.objects.count(),
+        'reclamations_en_attente': Reclamation.objects.filter(status='en_attente').count(),
+        'reclamations_en_cours': Reclamation.objects.filter(status='en_cours').count(),
+        'reclamations_resolues': Reclamation.objects.filter(status='resolu').count(),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare le nombre de requêtes et la latence des statistiques du dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reclamations', type=int, default=1_000_000)
+        parser.add_argument('--clients', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            self.stdout.write(f"🌱 Insertion de {options['reclamations']} réclamations...")
+            seed_dataset(clients=options['clients'], reclamations=options['reclamations'])
+
+            assert legacy_dashboard_stats() == compute_dashboard_stats()
+
+            client = Client()
+            client.get('/api/dashboard/statistiques-generales/')
+            results = {
+                'legacy': measure(legacy_dashboard_stats, options['repeat']),
+                'single_pass': measure(compute_dashboard_stats, options['repeat']),
+                'view_cached': measure(
+                    lambda: client.get('/api/dashboard/statistiques-generales/'),
+                    options['repeat'],
+                ),
+                'view_fresh': measure(
+                    lambda: client.get('/api/dashboard/statistiques-generales/?fresh=1'),
+                    options['repeat'],
+                ),
+            }
+
+        self.stdout.write(json.dumps(results, indent=2))
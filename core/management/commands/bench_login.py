@@ -0,0 +1,49 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from core.bench import benchmark_database, measure
+from core.models import User
+import json
+
+
+class Command(BaseCommand):
+    help = 'Mesure le nombre de requêtes SQL et la latence par connexion via /api/login/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--fast-hasher',
+            action='store_true',
+            help='Utiliser un hacheur rapide pour isoler le coût base de données du coût PBKDF2',
+        )
+
+    def handle(self, *args, **options):
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+        results = {}
+
+        overrides = {'LOGIN_THROTTLE_ENABLED': False}
+        if hashers:
+            overrides['PASSWORD_HASHERS'] = hashers
+
+        with benchmark_database(), override_settings(**overrides):
+            User.objects.create(
+                username='bench@senelec.sn', email='bench@senelec.sn', telephone='221700000000',
+                nom='Bench', prenom='Login', password=make_password('benchmark'),
+            )
+            client = Client()
+
+            def login(identifier):
+                response = client.post(
+                    '/api/login/',
+                    json.dumps({'email_or_phone': identifier, 'password': 'benchmark'}),
+                    content_type='application/json',
+                )
+                assert response.status_code == 200, response.content
+
+            for interval in (None, 15):
+                with override_settings(LAST_LOGIN_UPDATE_INTERVAL=interval):
+                    label = 'coalesced' if interval else 'always_write'
+                    results[f'email_{label}'] = measure(lambda: login('bench@senelec.sn'), options['repeat'])
+                    results[f'phone_{label}'] = measure(lambda: login('221700000000'), options['repeat'])
+
+        self.stdout.write(json.dumps(results, indent=2))
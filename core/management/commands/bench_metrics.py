@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.urls import resolve
+from core.bench import benchmark_database
+from core.metrics import MetricsMiddleware, RequestStats, _current, record_sql, registry
+from core.models import Categories
+import json
+import statistics
+import time
+
+
+METRICS_MIDDLEWARE = 'core.metrics.MetricsMiddleware'
+
+
+def per_call_us(func, calls, rounds=7):
+    """Durée médiane d'un appel (µs) sur plusieurs séries"""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        timings.append((time.perf_counter() - start) / calls * 1e6)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = "Surcoût de l'instrumentation (MetricsMiddleware et wrapper SQL) par requête, objectif < 50 µs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20000, help='appels par série (middleware, SQL)')
+        parser.add_argument('--requests', type=int, default=1000, help='requêtes par série (bout en bout)')
+
+    def handle(self, *args, **options):
+        results = {}
+        calls = options['calls']
+
+        # 1. Middleware seul, autour d'une vue qui ne fait rien
+        request = RequestFactory().get('/api/categories/')
+        request.resolver_match = resolve('/api/categories/')
+        response = HttpResponse(b'{"success": true}', content_type='application/json')
+
+        def view(request):
+            return response
+
+        middleware = MetricsMiddleware(view)
+        bare = per_call_us(lambda: view(request), calls)
+        instrumented = per_call_us(lambda: middleware(request), calls)
+        results['middleware_us'] = round(instrumented - bare, 2)
+
+        with benchmark_database(), override_settings(LOGIN_THROTTLE_ENABLED=False):
+            Categories.objects.bulk_create([Categories(nom=f'Catégorie {i}') for i in range(6)])
+
+            # 2. Wrapper SQL, par requête SQL, pendant une requête HTTP
+            def select():
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+
+            select()
+            connection.execute_wrappers.remove(record_sql)
+            without_wrapper = per_call_us(select, calls)
+            connection.execute_wrappers.insert(0, record_sql)
+            token = _current.set(RequestStats())
+            try:
+                with_wrapper = per_call_us(select, calls)
+            finally:
+                _current.reset(token)
+            results['sql_wrapper_us_per_query'] = round(with_wrapper - without_wrapper, 2)
+
+            # 3. Bout en bout sur une vraie vue (GET /api/categories/, 1 requête SQL)
+            client = Client()
+
+            def get():
+                client.get('/api/categories/')
+
+            other_middleware = [name for name in settings.MIDDLEWARE if name != METRICS_MIDDLEWARE]
+            for label, middleware_setting in (('without', other_middleware), ('with', settings.MIDDLEWARE)):
+                with override_settings(MIDDLEWARE=middleware_setting):
+                    get()
+                    results[f'request_us_{label}_metrics'] = round(per_call_us(get, options['requests']), 1)
+            results['request_overhead_us'] = round(
+                results['request_us_with_metrics'] - results['request_us_without_metrics'], 1
+            )
+
+        registry.reset()
+        # Estimation pour une requête lourde (10 requêtes SQL, le maximum des vues actuelles est ~7)
+        results['estimated_us_10_queries'] = round(
+            results['middleware_us'] + 10 * results['sql_wrapper_us_per_query'], 1
+        )
+        results['under_50us'] = results['estimated_us_10_queries'] < 50
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from core.bench import benchmark_database, seed_dataset, measure
+from core.models import Reclamation, User
+from core.search import search_reclamation_ids
+import json
+
+
+# Termes fréquents, terme sans accent (LIKE ne le trouve pas) et référence rare
+QUERIES = ['coupure', 'compteur woyofal', 'electrique endommage', 'factur', '123457']
+
+
+class Command(BaseCommand):
+    help = 'Compare la recherche plein texte FTS5 au LIKE (icontains) sur les descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reclamations', type=int, default=1_000_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        results = {}
+        with benchmark_database():
+            self.stdout.write(f"🌱 Insertion de {options['reclamations']} réclamations...")
+            seed_dataset(clients=1000, reclamations=options['reclamations'])
+            superviseur = User(role='superviseur')
+
+            for query in QUERIES:
+                def like():
+                    queryset = Reclamation.objects.all()
+                    for term in query.split():
+                        queryset = queryset.filter(description__icontains=term)
+                    return list(queryset.values_list('id', flat=True)[:20])
+
+                results[query] = {
+                    'like': measure(like, options['repeat']),
+                    'fts5': measure(lambda: search_reclamation_ids(superviseur, query), options['repeat']),
+                }
+
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,139 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+
+def _init_worker(db_name, production):
+    # Processus lancés en mode "spawn" : chacun ouvre sa propre connexion
+    os.environ['SENELEC_DB_NAME'] = db_name
+    os.environ['SENELEC_SQLITE_PRODUCTION'] = '1' if production else '0'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'senelec_system.settings')
+    import django
+    django.setup()
+
+
+def _writer(worker_id, operations, user_ids, reclamation_ids, production, start_at):
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.db import OperationalError, transaction
+    from django.utils import timezone
+    from core.db import is_busy_error, retry_on_busy
+    from core.models import User, Reclamation
+
+    def touch_last_login(i):
+        User.objects.filter(pk=user_ids[i % len(user_ids)]).update(last_login=timezone.now())
+
+    def update_reclamation(i):
+        # Lecture puis écriture dans la même transaction (passage au verrou d'écriture)
+        with transaction.atomic():
+            reclamation = Reclamation.objects.get(pk=reclamation_ids[i % len(reclamation_ids)])
+            reclamation.status = 'en_cours' if reclamation.status == 'en_attente' else 'en_attente'
+            reclamation.save(update_fields=['status', 'date_updated'])
+
+    def create_session(i):
+        SessionStore().create()
+
+    writes = [touch_last_login, update_reclamation, create_session]
+    if production:
+        writes = [retry_on_busy(write) for write in writes]
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    latencies, errors = [], 0
+    for i in range(worker_id, worker_id + operations):
+        start = time.perf_counter()
+        try:
+            writes[i % len(writes)](i)
+        except OperationalError as e:
+            if not is_busy_error(e):
+                raise
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, errors
+
+
+def _reader(operations, start_at):
+    from django.db.models import Count
+    from core.models import Reclamation
+
+    while time.time() < start_at:
+        time.sleep(0.001)
+    start = time.perf_counter()
+    for _ in range(operations):
+        list(Reclamation.objects.values('status').annotate(n=Count('id')).order_by())
+    return operations / (time.perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = (
+        "Débit d'écritures concurrentes (plusieurs processus) sur SQLite, "
+        "profil par défaut puis profil de production"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=2)
+        parser.add_argument('--operations', type=int, default=600, help='écritures par processus')
+
+    def handle(self, *args, **options):
+        # Imports locaux : ce module est rechargé par les processus "spawn"
+        # avant django.setup(), il ne doit pas importer de modèles au chargement
+        from django.db import connection
+        from core.bench import benchmark_database, seed_dataset
+        from core.models import User, Reclamation
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_name = os.path.join(tmp_dir, 'bench.sqlite3')
+            with benchmark_database(name=db_name):
+                seed_dataset(clients=200, techniciens=10, reclamations=5000)
+                user_ids = list(User.objects.values_list('pk', flat=True)[:200])
+                reclamation_ids = list(Reclamation.objects.values_list('pk', flat=True)[:1000])
+                connection.close()
+
+                # Le mode WAL est persistant : le profil par défaut est mesuré en premier
+                for label, production in (('default', False), ('production', True)):
+                    results[label] = self.run_profile(db_name, production, user_ids, reclamation_ids, options)
+
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def run_profile(self, db_name, production, user_ids, reclamation_ids, options):
+        from core.bench import percentile
+
+        writers, readers = options['writers'], options['readers']
+        with ProcessPoolExecutor(
+            max_workers=writers + readers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(db_name, production),
+        ) as pool:
+            # Démarrage de tous les processus avant de lancer le chronomètre
+            list(pool.map(time.sleep, [0.1] * (writers + readers)))
+            start_at = time.time() + 0.5
+            write_futures = [
+                pool.submit(_writer, i * options['operations'], options['operations'],
+                            user_ids, reclamation_ids, production, start_at)
+                for i in range(writers)
+            ]
+            read_futures = [pool.submit(_reader, 200, start_at) for _ in range(readers)]
+
+            latencies, errors = [], 0
+            for future in write_futures:
+                worker_latencies, worker_errors = future.result()
+                latencies += worker_latencies
+                errors += worker_errors
+            elapsed = time.time() - start_at
+            reads_per_second = [future.result() for future in read_futures]
+
+        return {
+            'writes_ok': len(latencies),
+            'writes_locked': errors,
+            'writes_per_second': round(len(latencies) / elapsed, 1),
+            'write_ms_p50': round(percentile(latencies, 50), 2) if latencies else None,
+            'write_ms_p99': round(percentile(latencies, 99), 2) if latencies else None,
+            'reads_per_second': round(sum(reads_per_second), 1),
+        }
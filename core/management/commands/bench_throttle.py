@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from core.bench import percentile
+from core.throttle import LocalMemoryBackend, LoginThrottle, SQLiteBackend
+import json
+import os
+import tempfile
+import time
+
+
+class Command(BaseCommand):
+    help = 'Mesure le surcoût du limiteur de connexion par tentative autorisée (microsecondes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--identifiants', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        requests = [factory.post('/api/login/', REMOTE_ADDR=f'10.0.{i // 256 % 256}.{i % 256}') for i in range(256)]
+        # Limites élevées : on mesure le chemin autorisé, le plus fréquent
+        rates = {'ip': '1000000/s', 'identifiant': '1000000/s'}
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backends = {
+                'local_memory': LocalMemoryBackend(),
+                'sqlite': SQLiteBackend(os.path.join(tmp_dir, 'throttle.sqlite3')),
+            }
+            for name, backend in backends.items():
+                throttle = LoginThrottle(backend, rates)
+                timings = []
+                for i in range(options['iterations']):
+                    request = requests[i % len(requests)]
+                    identifier = f"client-{i % options['identifiants']}@example.com"
+                    start = time.perf_counter()
+                    allowed = not throttle.check(request, identifier)
+                    timings.append((time.perf_counter() - start) * 1_000_000)
+                    assert allowed
+                results[name] = {
+                    'iterations': options['iterations'],
+                    'us_p50': round(percentile(timings, 50), 1),
+                    'us_p99': round(percentile(timings, 99), 1),
+                    'us_max': round(max(timings), 1),
+                    'metrics': throttle.snapshot(),
+                }
+
+        self.stdout.write(json.dumps(results, indent=2))
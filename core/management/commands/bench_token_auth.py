@@ -0,0 +1,73 @@
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from core.bench import benchmark_database, measure, seed_dataset
+from core.models import User
+from core.tokens import user_cache
+import json
+
+
+class Command(BaseCommand):
+    help = (
+        'Requêtes SQL et latence par requête authentifiée : session Django contre jeton signé '
+        '(GET /api/reclamations/ d\'un client), et lignes django_session créées par connexion'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--logins', type=int, default=20)
+
+    def handle(self, *args, **options):
+        results = {}
+        overrides = {
+            'LOGIN_THROTTLE_ENABLED': False,
+            'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+        }
+
+        with benchmark_database(), override_settings(**overrides):
+            seed_dataset(clients=20, techniciens=2, reclamations=2000)
+            user = User.objects.create(
+                username='bench-token', email='bench-token@senelec.sn', telephone='221600000001',
+                nom='Bench', prenom='Jeton', role='client', password=make_password('benchmark'),
+            )
+
+            def login(client):
+                response = client.post(
+                    '/api/login/',
+                    json.dumps({'email_or_phone': user.email, 'password': 'benchmark'}),
+                    content_type='application/json',
+                )
+                assert response.status_code == 200, response.content
+                return response.json()
+
+            url = '/api/reclamations/?limit=20'
+
+            # 1. Session Django (force_login : ce que faisait login_api)
+            session_client = Client()
+            session_client.force_login(user)
+            results['session'] = measure(lambda: session_client.get(url), options['repeat'])
+
+            # 2. Jeton d'accès, utilisateur dans le cache du processus
+            token_client = Client(headers={'Authorization': f'Bearer {login(Client())["access_token"]}'})
+            token_client.get(url)
+            results['token'] = measure(lambda: token_client.get(url), options['repeat'])
+
+            # 3. Jeton d'accès, cache vidé avant chaque requête (pire cas : un autre worker)
+            def cold():
+                user_cache.clear()
+                token_client.get(url)
+            results['token_cold_cache'] = measure(cold, options['repeat'])
+
+            results['queries_saved_per_request'] = results['session']['queries'] - results['token']['queries']
+
+            # 4. Croissance de django_session
+            before = Session.objects.count()
+            for _ in range(options['logins']):
+                login(Client())
+            results['sessions_created'] = {
+                'logins': options['logins'],
+                'rows': Session.objects.count() - before,
+            }
+
+        self.stdout.write(json.dumps(results, indent=2))
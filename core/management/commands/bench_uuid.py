@@ -0,0 +1,111 @@
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, models, transaction
+from django.utils import timezone
+from core.bench import benchmark_database
+from core.ids import uuid7
+from core.synthetic import db_converters
+import json
+import os
+import tempfile
+import time
+import uuid
+
+
+GENERATORS = {'uuid4': uuid.uuid4, 'uuid7': uuid7}
+
+
+def database_size():
+    """Taille du fichier de base (pages utilisées x taille de page), en octets"""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        return pages * cursor.fetchone()[0]
+
+
+def index_stats(table, size_before):
+    """
+    Taille et remplissage de l'index de la clé primaire (SQLite, table virtuelle
+    dbstat). Sans dbstat (SQLite compilé sans SQLITE_ENABLE_DBSTAT_VTAB), seule la
+    croissance de la base pendant l'insertion (table et index) est mesurée
+    """
+    if connection.vendor != 'sqlite':
+        return {}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*), sum(pgsize), sum(unused), sum(pagetype = 'leaf') FROM dbstat WHERE name = %s",
+                [f'sqlite_autoindex_{table}_1'],
+            )
+            pages, size, unused, leaves = cursor.fetchone()
+    except OperationalError:
+        return {'table_and_index_mb': round((database_size() - size_before) / 1024 / 1024, 1)}
+    return {
+        'index_pages': pages,
+        'index_leaf_pages': leaves or 0,
+        'index_mb': round((size or 0) / 1024 / 1024, 1),
+        'index_fill': round(1 - unused / size, 3) if size else None,
+    }
+
+
+def insert_rows(table, generator, rows, batch, report_every):
+    """
+    Insère `rows` lignes par lots d'une transaction chacun (flux continu de
+    créations) ; débit mesuré par tranche de `report_every` lignes
+    """
+    db_uuid, db_datetime = db_converters()
+    now = db_datetime(timezone.now())
+    sql = f'INSERT INTO {table} (id, description, date_created) VALUES (%s, %s, %s)'
+    windows = []
+    window_start = total_start = time.perf_counter()
+    for start in range(0, rows, batch):
+        values = [(db_uuid(generator()), 'Coupure de courant', now) for _ in range(min(batch, rows - start))]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, values)
+        done = start + len(values)
+        if done % report_every == 0 or done == rows:
+            elapsed = time.perf_counter() - window_start
+            previous = windows[-1]['rows'] if windows else 0
+            windows.append({'rows': done, 'rows_per_s': round((done - previous) / elapsed)})
+            window_start = time.perf_counter()
+    total = time.perf_counter() - total_start
+    return {'seconds': round(total, 1), 'rows_per_s': round(rows / total), 'windows': windows}
+
+
+class Command(BaseCommand):
+    help = (
+        'Clés primaires uuid4 contre UUID version 7 : débit d\'insertion au fil de la croissance '
+        'de la table et taille / remplissage de l\'index de la clé primaire'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=3_000_000, help='lignes insérées par variante')
+        parser.add_argument('--batch', type=int, default=5000, help='lignes par transaction')
+        parser.add_argument('--report-every', type=int, default=500_000, help='taille des tranches de débit')
+        parser.add_argument('--output', help='Fichier JSON où écrire les résultats')
+
+    def handle(self, *args, **options):
+        results = {'rows': options['rows'], 'batch': options['batch']}
+        # Base sur disque : la taille des index et le cache de pages comptent
+        with tempfile.TemporaryDirectory() as directory, \
+                benchmark_database(name=os.path.join(directory, 'bench_uuid.sqlite3')):
+            uuid_type = models.UUIDField().db_type(connection)
+            datetime_type = models.DateTimeField().db_type(connection)
+            for name, generator in GENERATORS.items():
+                table = f'bench_pk_{name}'
+                with connection.cursor() as cursor:
+                    # Même colonne que core_reclamation.id
+                    cursor.execute(
+                        f'CREATE TABLE {table} (id {uuid_type} NOT NULL PRIMARY KEY, '
+                        f'description text NOT NULL, date_created {datetime_type} NOT NULL)'
+                    )
+                size_before = database_size() if connection.vendor == 'sqlite' else 0
+                self.stderr.write(f'{name} : insertion de {options["rows"]} lignes...')
+                results[name] = insert_rows(table, generator, options['rows'], options['batch'], options['report_every'])
+                results[name].update(index_stats(table, size_before))
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+        self.stdout.write(output)
@@ -1,8 +1,31 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.hashers import make_password
+from django.db import connection
 from core.models import User, Categories
+from core.passwords import generate_temp_password
+from core.stats import invalidate_dashboard_stats
+from core.synthetic import generate_dataset
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+import argparse
 import random
 import string
+import time
+
+
+def reference_date(value):
+    """--now : date ou date-heure ISO 8601 (UTC si aucun fuseau n'est indiqué)"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, dt_time()) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f'date ISO invalide : {value}')
+    return parsed if timezone.is_aware(parsed) else parsed.replace(tzinfo=dt_timezone.utc)
 
 
 class Command(BaseCommand):
@@ -14,6 +37,22 @@ class Command(BaseCommand):
             action='store_true',
             help='Supprimer toutes les données existantes avant de créer les nouvelles',
         )
+        parser.add_argument(
+            '--scale',
+            action='store_true',
+            help='Générer en plus un jeu de données synthétique (volumes de production)',
+        )
+        parser.add_argument('--clients', type=int, default=10000, help='Clients générés (--scale)')
+        parser.add_argument('--techniciens', type=int, default=100, help='Techniciens générés (--scale)')
+        parser.add_argument('--reclamations', type=int, default=100000, help='Réclamations générées (--scale)')
+        parser.add_argument('--days', type=int, default=365, help='Période couverte par les réclamations (--scale)')
+        parser.add_argument('--seed', type=int, default=42, help='Graine du générateur (--scale)')
+        parser.add_argument(
+            '--now',
+            type=reference_date,
+            help='Date de référence ISO des réclamations générées, maintenant par défaut (--scale). '
+                 'Avec --seed, deux exécutions produisent les mêmes lignes, identifiants compris',
+        )
 
     def handle(self, *args, **options):
         if options['reset']:
@@ -161,4 +200,53 @@ class Command(BaseCommand):
             self.stdout.write(f'   {user.role.upper()}: {user.email} / {password}')
         
         self.stdout.write('\n✨ Données par défaut créées avec succès!')
-        self.stdout.write('💡 Vous pouvez maintenant tester l\'authentification avec ces comptes.') 
\ No newline at end of file
+        self.stdout.write('💡 Vous pouvez maintenant tester l\'authentification avec ces comptes.')
+
+        if options['scale']:
+            self.generate_scale_data(options, [cat_data['nom'] for cat_data in categories_data])
+
+    def generate_scale_data(self, options, category_names):
+        if User.objects.filter(username__startswith='synthetic-').exists():
+            raise CommandError('Des données synthétiques existent déjà : relancer avec --reset')
+
+        self.stdout.write(
+            f'\n🏭 Génération synthétique: {options["clients"]} clients, '
+            f'{options["techniciens"]} techniciens, {options["reclamations"]} réclamations '
+            f'(graine {options["seed"]}'
+            + (f', date de référence {options["now"].isoformat()}' if options['now'] else '')
+            + ')...'
+        )
+        # Un seul mot de passe (et un seul hachage) pour tous les comptes générés
+        password = generate_temp_password()
+
+        def progress(done, total):
+            self.stdout.write(f'   {done}/{total} réclamations', ending='\r')
+
+        # Ordre de déclaration : les premières catégories reçoivent le plus de réclamations
+        categories = Categories.objects.filter(is_active=True).in_bulk(field_name='nom')
+        categories = [categories.pop(nom) for nom in category_names if nom in categories] + list(categories.values())
+
+        start = time.perf_counter()
+        generate_dataset(
+            clients=options['clients'],
+            techniciens=options['techniciens'],
+            reclamations=options['reclamations'],
+            categories=categories,
+            seed=options['seed'],
+            password=password,
+            days=options['days'],
+            progress=progress,
+            now=options['now'],
+        )
+        if connection.vendor == 'sqlite':
+            # Statistiques du planificateur à jour après un chargement massif
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        invalidate_dashboard_stats()
+
+        self.stdout.write(f'\n✅ Données synthétiques générées en {time.perf_counter() - start:.1f} s')
+        self.stdout.write(
+            f'🔑 Comptes générés: client-<n>@synthetic.senelec.sn, '
+            f'technicien-<n>@synthetic.senelec.sn / {password}'
+        )
+        self.stdout.write('💡 Agrégats analytiques: python manage.py refresh_rollups --full') 
\ No newline at end of file
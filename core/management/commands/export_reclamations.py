@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.export import EXPORT_FORMATS, export_queryset, write_csv, write_parquet
+from core.filters import filter_reclamations, InvalidFilter
+from core.models import Reclamation
+from core.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = 'Exporte les réclamations en CSV ou Parquet avec une mémoire constante'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Fichier de sortie')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, help='Déduit de l\'extension par défaut')
+        parser.add_argument('--status', help='Statut(s) séparés par des virgules')
+        parser.add_argument('--categorie', help='Identifiant de catégorie')
+        parser.add_argument('--technicien', help='Identifiant de technicien')
+        parser.add_argument('--date-debut', help='AAAA-MM-JJ ou date-heure ISO 8601')
+        parser.add_argument('--date-fin', help='AAAA-MM-JJ (inclus) ou date-heure ISO 8601')
+        parser.add_argument('--row-group-size', type=int, default=50_000)
+
+    def handle(self, *args, **options):
+        output = options['output']
+        format_ = options['format'] or ('parquet' if output.endswith('.parquet') else 'csv')
+        params = {
+            key: options[option]
+            for key, option in (
+                ('status', 'status'), ('categorie', 'categorie'), ('technicien', 'technicien'),
+                ('date_debut', 'date_debut'), ('date_fin', 'date_fin'),
+            )
+            if options[option]
+        }
+
+        try:
+            # Export en lecture seule : réplique si elle est configurée
+            queryset = export_queryset(filter_reclamations(Reclamation.objects.using(replica_alias()), params))
+        except InvalidFilter as e:
+            raise CommandError(str(e))
+
+        if format_ == 'csv':
+            with open(output, 'w', encoding='utf-8', newline='') as f:
+                write_csv(queryset, f)
+        else:
+            with open(output, 'wb') as f:
+                write_parquet(queryset, f, row_group_size=options['row_group_size'])
+
+        self.stdout.write(f'✅ Export écrit dans {output}')
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.onboarding import BulkUserImporter, iter_csv_rows, iter_jsonl_rows
+import json
+
+
+class Command(BaseCommand):
+    help = "Importe en masse des utilisateurs depuis un fichier CSV ou JSON-lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichier à importer')
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='Format du fichier (déduit de l\'extension par défaut)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Nombre de processus pour le hachage des mots de passe (défaut: nombre de CPU)',
+        )
+        parser.add_argument('--report', help='Écrire le rapport détaillé (JSON) dans ce fichier')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format_ = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+
+        try:
+            with open(path, 'rb') as f:
+                rows = iter_csv_rows(f) if format_ == 'csv' else iter_jsonl_rows(f)
+                importer = BulkUserImporter(chunk_size=options['chunk_size'], workers=options['workers'])
+                report = importer.run(rows)
+        except OSError as e:
+            raise CommandError(f'Impossible de lire {path}: {e}')
+
+        for line in report['lignes']:
+            if line['status'] == 'erreur':
+                self.stdout.write(f"❌ Ligne {line['ligne']}: {', '.join(line['erreurs'])}")
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+        self.stdout.write(f"\n📊 {report['crees']} utilisateur(s) créé(s), {report['erreurs']} ligne(s) en erreur")
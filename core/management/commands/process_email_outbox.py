@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from core.outbox import deliver_pending_emails
+import time
+
+
+class Command(BaseCommand):
+    help = "Envoie les emails en attente de l'outbox par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Nombre maximum d\'emails envoyés par lot',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Tourner en continu (worker) au lieu de traiter une seule passe',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Pause en secondes quand l\'outbox est vide (mode --loop)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = deliver_pending_emails(batch_size=options['batch_size'])
+            if any(result.values()):
+                self.stdout.write(
+                    f"📧 {result['envoyes']} envoyés, {result['reprogrammes']} reprogrammés, "
+                    f"{result['abandonnes']} abandonnés"
+                )
+
+            if not options['loop']:
+                break
+            # Enchaîner les lots tant que l'outbox se vide à pleine capacité
+            if result['envoyes'] + result['reprogrammes'] + result['abandonnes'] < options['batch_size']:
+                time.sleep(options['interval'])
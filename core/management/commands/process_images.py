@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from core.images import InvalidImage, generate_variants, get_executor, get_variants, store_upload
+from core.models import Reclamation
+import os
+
+
+class Command(BaseCommand):
+    help = "Génère les variantes manquantes des images de réclamations (et leurs empreintes)"
+
+    def handle(self, *args, **options):
+        # Les images plus anciennes que le pipeline passent par le même stockage :
+        # copie sans métadonnées à son emplacement définitif, puis empreinte
+        legacy = Reclamation.objects.filter(image_hash__isnull=True).exclude(image='').exclude(image__isnull=True)
+        for pk, name in legacy.values_list('pk', 'image').iterator():
+            path = default_storage.path(name)
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    stored, image_hash = store_upload(File(f, name=os.path.basename(path)))
+            except InvalidImage as e:
+                self.stderr.write(f'❌ {name}: {e}')
+                continue
+            Reclamation.objects.filter(pk=pk).update(image=stored, image_hash=image_hash)
+
+        images = (
+            Reclamation.objects.exclude(image_hash__isnull=True)
+            .values_list('image', 'image_hash').order_by().distinct()
+        )
+        executor = get_executor()
+        futures = [
+            executor.submit(generate_variants, str(settings.MEDIA_ROOT), name, image_hash, get_variants())
+            for name, image_hash in images.iterator()
+        ]
+
+        generated = errors = 0
+        for future in futures:
+            try:
+                generated += len(future.result())
+            except Exception as e:
+                errors += 1
+                self.stderr.write(f'❌ {e}')
+
+        self.stdout.write(f'✅ {generated} variante(s) générée(s), {errors} erreur(s)')
@@ -0,0 +1,111 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.profiling import profiling_dir
+from collections import Counter, defaultdict
+from pathlib import Path
+import json
+import pstats
+
+
+SORT_KEYS = {
+    # Indices dans les tuples (appels primitifs, appels, temps propre, temps cumulé, appelants) de pstats
+    'tottime': 2,
+    'cumtime': 3,
+    'calls': 1,
+}
+
+
+def function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # fonction native, ex. <built-in method time.sleep>
+    # Chemins raccourcis au paquet : .../site-packages/django/db/... -> django/db/...
+    parts = Path(filename).parts
+    for marker in ('site-packages', 'dist-packages', 'lib'):
+        if marker in parts:
+            parts = parts[len(parts) - parts[::-1].index(marker):]
+            break
+    else:
+        parts = parts[-3:]
+    return f'{"/".join(parts)}:{line}({name})'
+
+
+class Command(BaseCommand):
+    help = 'Fonctions les plus coûteuses et requêtes SQL les plus lentes sur les profils collectés (core/profiling.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='Répertoire des profils (défaut : PROFILING_DIR)')
+        parser.add_argument('--limit', type=int, default=25, help='Nombre de lignes par tableau')
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='tottime')
+        parser.add_argument('--view', help='Seulement les profils de cette vue (nom de route, ex. reclamation_list)')
+        parser.add_argument('--filter', help='Seulement les fonctions dont le chemin contient ce texte (ex. core/)')
+        parser.add_argument(
+            '--wsgi-only', action='store_true',
+            help='Ignorer les profils ASGI (qui incluent les requêtes concurrentes)',
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir']) if options['dir'] else profiling_dir()
+        if not directory.is_dir():
+            raise CommandError(f'Répertoire introuvable : {directory}')
+
+        profiles = []
+        for path in sorted(directory.glob('*.prof')):
+            try:
+                with open(path.with_suffix('.sql.json')) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {'view': '?', 'ms': 0, 'queries': []}
+            if options['view'] and meta['view'] != options['view']:
+                continue
+            if options['wsgi_only'] and meta.get('serveur') == 'asgi':
+                continue
+            profiles.append((path, meta))
+        if not profiles:
+            raise CommandError(f'Aucun profil dans {directory}')
+
+        # 1. Requêtes profilées par vue
+        per_view = defaultdict(list)
+        for _, meta in profiles:
+            per_view[meta['view']].append(meta['ms'])
+        self.stdout.write(f'{len(profiles)} profils dans {directory}\n')
+        asgi = sum(1 for _, meta in profiles if meta.get('serveur') == 'asgi')
+        if asgi:
+            self.stdout.write(self.style.WARNING(
+                f'Attention : {asgi} profil(s) ASGI. Le profileur reste actif pendant les await et '
+                'mélange les requêtes concurrentes : les temps par fonction ne sont pas propres à la '
+                'vue (relancer avec --wsgi-only pour les exclure)\n'
+            ))
+        self.stdout.write(f'{"vue":<40} {"profils":>8} {"ms moyen":>10} {"ms max":>10}')
+        for view, durations in sorted(per_view.items(), key=lambda item: -sum(item[1])):
+            self.stdout.write(
+                f'{view:<40} {len(durations):>8} {sum(durations) / len(durations):>10.1f} {max(durations):>10.1f}'
+            )
+
+        # 2. Fonctions les plus coûteuses, tous profils confondus
+        stats = pstats.Stats(str(profiles[0][0]))
+        for path, _ in profiles[1:]:
+            stats.add(str(path))
+        rows = [(function_label(func), values) for func, values in stats.stats.items()]
+        if options['filter']:
+            rows = [row for row in rows if options['filter'] in row[0]]
+        rows.sort(key=lambda row: row[1][SORT_KEYS[options['sort']]], reverse=True)
+
+        self.stdout.write(f'\nFonctions (tri : {options["sort"]}, temps cumulés sur tous les profils)')
+        self.stdout.write(f'{"appels":>10} {"propre ms":>10} {"cumulé ms":>10}  fonction')
+        for label, (_, calls, tottime, cumtime, _) in rows[:options['limit']]:
+            self.stdout.write(f'{calls:>10} {tottime * 1000:>10.1f} {cumtime * 1000:>10.1f}  {label}')
+
+        # 3. Requêtes SQL les plus lentes (texte identique, paramètres non enregistrés)
+        count = Counter()
+        total_ms = Counter()
+        for _, meta in profiles:
+            for query in meta['queries']:
+                sql = ' '.join(query['sql'].split())
+                count[sql] += 1
+                total_ms[sql] += query['ms']
+        if total_ms:
+            self.stdout.write('\nRequêtes SQL (temps total)')
+            self.stdout.write(f'{"exécutions":>10} {"total ms":>10} {"moyen ms":>10}  requête')
+            for sql, ms in total_ms.most_common(options['limit']):
+                shown = sql if len(sql) <= 120 else sql[:117] + '...'
+                self.stdout.write(f'{count[sql]:>10} {ms:>10.1f} {ms / count[sql]:>10.2f}  {shown}')
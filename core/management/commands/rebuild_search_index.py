@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.search import install_search_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte des réclamations (SQLite FTS5)"
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError("La recherche plein texte nécessite SQLite (FTS5)")
+
+        install_search_index(connection, rebuild=True)
+        self.stdout.write("✅ Index plein texte reconstruit")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.routers import REPLICA, refresh_replica
+import time
+
+
+class Command(BaseCommand):
+    help = 'Rafraîchit la réplique en lecture à partir de la base principale (API de sauvegarde SQLite)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Rafraîchir en continu')
+        parser.add_argument('--interval', type=int, default=30, help='Secondes entre deux copies (--loop)')
+        parser.add_argument(
+            '--pages', type=int, default=-1,
+            help='Pages copiées par étape (-1 : tout en une fois)',
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.settings:
+            raise CommandError('Aucune réplique configurée (variable SENELEC_REPLICA_DB_NAME)')
+        for alias in ('default', REPLICA):
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError('La copie par l\'API de sauvegarde ne concerne que SQLite')
+
+        while True:
+            elapsed = refresh_replica(pages=options['pages'])
+            self.stdout.write(f'✅ Réplique rafraîchie en {elapsed * 1000:.0f} ms')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
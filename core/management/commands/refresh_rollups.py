@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from core.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = 'Actualise les agrégats journaliers des réclamations (incrémental par défaut)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Tout recalculer (nécessaire pour prendre en compte les suppressions)',
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = refresh_rollups(full=options['full'])
+        self.stdout.write(f'✅ {rebuilt} jour(s) recalculé(s)')
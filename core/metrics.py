@@ -0,0 +1,275 @@
+"""
+Instrumentation des requêtes, agrégée dans le processus et exposée au format
+texte Prometheus sur /api/metrics.
+
+Par vue (nom de route) et méthode HTTP :
+- histogramme des durées de traitement et des tailles de réponse
+- nombre de réponses par code de statut
+- nombre et durée cumulée des requêtes SQL
+
+Le wrapper SQL est ajouté une fois pour toutes à chaque connexion
+(connection.execute_wrappers, le mécanisme de connection.execute_wrapper) et
+attribue les requêtes à la requête HTTP courante par une ContextVar : les
+requêtes exécutées par sync_to_async depuis une vue asynchrone sont ainsi
+comptées aussi. Hors requête HTTP (commandes, tâches), il ne mesure rien.
+
+Chaque processus a ses propres compteurs : avec plusieurs workers, Prometheus
+doit interroger chacun d'eux (ou agréger par instance).
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from bisect import bisect_left
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+import threading
+import time
+
+
+# Bornes en secondes et en octets (la dernière classe, +Inf, est implicite)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+UNRESOLVED = 'non_resolue'
+
+# Méthode choisie par le client : hors de cette liste, elle est comptée sous
+# OTHER_METHOD pour borner le nombre de séries
+HTTP_METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'})
+OTHER_METHOD = 'other'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def copy(self):
+        other = Histogram(self.bounds)
+        other.counts = list(self.counts)
+        other.sum = self.sum
+        return other
+
+    def observe(self, value):
+        # Classe "le" inclusive : première borne >= valeur
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.bounds, '+Inf'), self.counts):
+            total += count
+            yield bound, total
+
+
+class ViewMetrics:
+    __slots__ = ('latency', 'size', 'statuses', 'queries', 'sql_seconds')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses = {}
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+    def copy(self):
+        other = ViewMetrics()
+        other.latency = self.latency.copy()
+        other.size = self.size.copy()
+        other.statuses = dict(self.statuses)
+        other.queries = self.queries
+        other.sql_seconds = self.sql_seconds
+        return other
+
+
+class RequestStats:
+    """Compteurs SQL de la requête HTTP en cours"""
+    __slots__ = ('queries', 'sql_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+_current = ContextVar('senelec_request_stats', default=None)
+
+
+def record_sql(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_seconds += time.perf_counter() - start
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Installe le wrapper SQL sur chaque connexion. En tête de liste : un
+    execute_wrapper() en cours retire toujours le dernier élément à sa sortie
+    """
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_sql)
+
+
+def label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{name}="{label_value(value)}"' for name, value in values.items()) + '}'
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, method, status, seconds, size, queries, sql_seconds):
+        with self._lock:
+            metrics = self._views.get((view, method))
+            if metrics is None:
+                metrics = self._views[(view, method)] = ViewMetrics()
+            metrics.latency.observe(seconds)
+            if size is not None:
+                metrics.size.observe(size)
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            metrics.queries += queries
+            metrics.sql_seconds += sql_seconds
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self, extra=()):
+        """
+        Texte au format d'exposition Prometheus 0.0.4. `extra` ajoute des
+        métriques d'autres modules : (nom, type, aide, [(labels, valeur), ...])
+        """
+        with self._lock:
+            snapshot = [(view, method, metrics.copy()) for (view, method), metrics in sorted(self._views.items())]
+
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def histogram(name, attribute):
+            for view, method, metrics in snapshot:
+                values = getattr(metrics, attribute)
+                count = 0
+                for bound, count in values.cumulative():
+                    lines.append(f'{name}_bucket{labels(view=view, method=method, le=bound)} {count}')
+                lines.append(f'{name}_sum{labels(view=view, method=method)} {values.sum}')
+                lines.append(f'{name}_count{labels(view=view, method=method)} {count}')
+
+        header('senelec_http_request_duration_seconds', 'histogram', 'Durée de traitement des requêtes par vue')
+        histogram('senelec_http_request_duration_seconds', 'latency')
+
+        header('senelec_http_response_size_bytes', 'histogram', 'Taille des réponses par vue (hors flux)')
+        histogram('senelec_http_response_size_bytes', 'size')
+
+        header('senelec_http_responses_total', 'counter', 'Réponses par vue et code de statut')
+        for view, method, metrics in snapshot:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(f'senelec_http_responses_total{labels(view=view, method=method, status=status)} {count}')
+
+        header('senelec_db_queries_total', 'counter', 'Requêtes SQL exécutées par vue')
+        for view, method, metrics in snapshot:
+            lines.append(f'senelec_db_queries_total{labels(view=view, method=method)} {metrics.queries}')
+
+        header('senelec_db_query_duration_seconds_total', 'counter', 'Temps SQL cumulé par vue')
+        for view, method, metrics in snapshot:
+            lines.append(f'senelec_db_query_duration_seconds_total{labels(view=view, method=method)} {metrics.sql_seconds}')
+
+        for name, kind, help_text, samples in extra:
+            header(name, kind, help_text)
+            for sample_labels, value in samples:
+                lines.append(f'{name}{labels(**sample_labels) if sample_labels else ""} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def metrics_allowed(request):
+    """
+    Jeton METRICS_TOKEN (en-tête Authorization: Bearer) s'il est défini. Sans
+    jeton, accès local en DEBUG uniquement : derrière un proxy sur la même
+    machine, toutes les requêtes publiques arrivent de 127.0.0.1
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        return constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    return settings.DEBUG and request.META.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED
+
+
+def method_label(request):
+    return request.method if request.method in HTTP_METHODS else OTHER_METHOD
+
+
+def response_size(response):
+    # Les réponses en flux (exports, SSE) n'ont pas de taille connue à ce stade
+    return None if response.streaming else len(response.content)
+
+
+class MetricsMiddleware:
+    """
+    Mesure chaque requête (à placer en tête de MIDDLEWARE pour inclure le
+    coût des autres middlewares)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, seconds, stats):
+        registry.record(
+            view_label(request), method_label(request), response.status_code, seconds,
+            response_size(response), stats.queries, stats.sql_seconds,
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['date_created', 'id'], name='reclamation_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['status', 'date_created', 'id'], name='reclamation_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='reclamation_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['technicien', 'status'], name='reclamation_tech_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(condition=models.Q(('status__in', ['en_attente', 'en_cours'])), fields=['technicien', 'date_created', 'id'], name='reclamation_tech_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'is_active'], name='user_role_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+
+# SQL figé : cette migration ne dépend pas de l'état courant de core/search.py
+FTS_TABLE = 'core_reclamation_fts'
+
+CREATE_FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS core_reclamation_fts USING fts5(
+    description,
+    content='core_reclamation',
+    content_rowid='rowid',
+    tokenize="unicode61 remove_diacritics 2",
+    prefix='2 3 4'
+)
+"""
+
+CREATE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_ai AFTER INSERT ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(rowid, description) VALUES (new.rowid, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_ad AFTER DELETE ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(core_reclamation_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_au AFTER UPDATE OF description ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(core_reclamation_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+        INSERT INTO core_reclamation_fts(rowid, description) VALUES (new.rowid, new.description);
+    END
+    """,
+]
+
+TRIGGER_NAMES = ['core_reclamation_fts_ai', 'core_reclamation_fts_ad', 'core_reclamation_fts_au']
+
+
+def install(apps, schema_editor):
+    # FTS5 n'existe que sous SQLite
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_FTS_TABLE)
+    for sql in CREATE_TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute("INSERT INTO core_reclamation_fts(core_reclamation_fts) VALUES ('rebuild')")
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in TRIGGER_NAMES:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_reclamation_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reclamation',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:13
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_reclamation_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReclamationDailyRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('jour', models.DateField()),
+                ('status', models.CharField(choices=[('en_attente', 'En Attente'), ('en_cours', 'En Cours'), ('resolu', 'Résolu'), ('ferme', 'Fermé'), ('annule', 'Annulé')], max_length=15)),
+                ('nombre', models.PositiveIntegerField(default=0)),
+                ('nombre_repondues', models.PositiveIntegerField(default=0)),
+                ('duree_totale', models.FloatField(default=0)),
+                ('sketch', models.JSONField(default=dict)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Agrégat journalier',
+                'verbose_name_plural': 'Agrégats journaliers',
+                'db_table': 'core_reclamation_daily_rollup',
+                'ordering': ['jour'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nom', models.CharField(max_length=50, unique=True)),
+                ('valeur', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'core_rollup_watermark',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reclamation',
+            index=models.Index(fields=['date_updated'], name='reclamation_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='reclamationdailyrollup',
+            name='categories',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='core.categories'),
+        ),
+        migrations.AddConstraint(
+            model_name='reclamationdailyrollup',
+            constraint=models.UniqueConstraint(fields=('jour', 'categories', 'status'), name='rollup_unique_key'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:04
+
+import core.ids
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_user_zones(apps, schema_editor):
+    """Zone des utilisateurs existants, déduite de leur adresse"""
+    from core.outages import normalize_zone
+
+    User = apps.get_model('core', 'User')
+    users = []
+    for user in User.objects.filter(zone__isnull=True, adresse__isnull=False).only('pk', 'adresse').iterator():
+        user.zone = normalize_zone(user.adresse)
+        if user.zone:
+            users.append(user)
+    User.objects.bulk_update(users, ['zone'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='zone',
+            field=models.CharField(blank=True, max_length=80, null=True),
+        ),
+        migrations.CreateModel(
+            name='Incident',
+            fields=[
+                ('id', models.UUIDField(default=core.ids.uuid7, editable=False, primary_key=True, serialize=False)),
+                ('zone', models.CharField(max_length=80)),
+                ('status', models.CharField(choices=[('ouvert', 'Ouvert'), ('en_cours', 'En Cours'), ('resolu', 'Résolu')], default='ouvert', max_length=15)),
+                ('date_debut', models.DateTimeField()),
+                ('date_resolution', models.DateTimeField(blank=True, null=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_updated', models.DateTimeField(auto_now=True)),
+                ('categories', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incidents', to='core.categories')),
+                ('technicien', models.ForeignKey(blank=True, limit_choices_to={'role': 'technicien'}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incidents_assignes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Incident',
+                'verbose_name_plural': 'Incidents',
+                'db_table': 'core_incident',
+                'ordering': ['-date_created'],
+            },
+        ),
+        migrations.AddField(
+            model_name='reclamation',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reclamations', to='core.incident'),
+        ),
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['status', 'zone'], name='incident_status_zone_idx'),
+        ),
+        migrations.RunPython(fill_user_zones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_outage_incidents'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='emailoutbox',
+            name='status',
+            field=models.CharField(choices=[('en_attente', 'En Attente'), ('en_cours', "En Cours d'Envoi"), ('envoye', 'Envoyé'), ('abandonne', 'Abandonné')], default='en_attente', max_length=15),
+        ),
+    ]
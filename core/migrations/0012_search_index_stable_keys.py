@@ -0,0 +1,112 @@
+from django.db import migrations
+
+
+# SQL figé : cette migration ne dépend pas de l'état courant de core/search.py.
+# Remplace l'index à contenu externe de 0004 (indexé sur le rowid implicite de
+# core_reclamation, renuméroté par VACUUM) par une table FTS5 qui porte
+# l'identifiant UUID et des rowid stables tirés de core_reclamation_fts_keys
+TRIGGER_NAMES = ['core_reclamation_fts_ai', 'core_reclamation_fts_ad', 'core_reclamation_fts_au']
+
+DROP_INDEX = [
+    *[f'DROP TRIGGER IF EXISTS {name}' for name in TRIGGER_NAMES],
+    'DROP TABLE IF EXISTS core_reclamation_fts',
+]
+
+INSTALL = [
+    """
+    CREATE TABLE IF NOT EXISTS core_reclamation_fts_keys (
+        id INTEGER PRIMARY KEY,
+        reclamation_id char(32) NOT NULL UNIQUE
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_reclamation_fts USING fts5(
+        reclamation_id UNINDEXED,
+        description,
+        tokenize="unicode61 remove_diacritics 2",
+        prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_ai AFTER INSERT ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts_keys(reclamation_id) VALUES (new.id);
+        INSERT INTO core_reclamation_fts(rowid, reclamation_id, description)
+        VALUES (last_insert_rowid(), new.id, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_ad AFTER DELETE ON core_reclamation BEGIN
+        DELETE FROM core_reclamation_fts
+        WHERE rowid = (SELECT id FROM core_reclamation_fts_keys WHERE reclamation_id = old.id);
+        DELETE FROM core_reclamation_fts_keys WHERE reclamation_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_reclamation_fts_au AFTER UPDATE OF description ON core_reclamation BEGIN
+        UPDATE core_reclamation_fts SET description = new.description
+        WHERE rowid = (SELECT id FROM core_reclamation_fts_keys WHERE reclamation_id = old.id);
+    END
+    """,
+    'DELETE FROM core_reclamation_fts_keys',
+    'INSERT INTO core_reclamation_fts_keys(reclamation_id) SELECT id FROM core_reclamation',
+    """
+    INSERT INTO core_reclamation_fts(rowid, reclamation_id, description)
+    SELECT k.id, r.id, r.description
+    FROM core_reclamation_fts_keys k JOIN core_reclamation r ON r.id = k.reclamation_id
+    """,
+]
+
+# Retour à l'index de 0004
+RESTORE_PREVIOUS = [
+    'DROP TABLE IF EXISTS core_reclamation_fts_keys',
+    """
+    CREATE VIRTUAL TABLE core_reclamation_fts USING fts5(
+        description,
+        content='core_reclamation',
+        content_rowid='rowid',
+        tokenize="unicode61 remove_diacritics 2",
+        prefix='2 3 4'
+    )
+    """,
+    """
+    CREATE TRIGGER core_reclamation_fts_ai AFTER INSERT ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(rowid, description) VALUES (new.rowid, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_reclamation_fts_ad AFTER DELETE ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(core_reclamation_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER core_reclamation_fts_au AFTER UPDATE OF description ON core_reclamation BEGIN
+        INSERT INTO core_reclamation_fts(core_reclamation_fts, rowid, description) VALUES ('delete', old.rowid, old.description);
+        INSERT INTO core_reclamation_fts(rowid, description) VALUES (new.rowid, new.description);
+    END
+    """,
+    "INSERT INTO core_reclamation_fts(core_reclamation_fts) VALUES ('rebuild')",
+]
+
+
+def run_sqlite(statements):
+    # FTS5 n'existe que sous SQLite
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_email_outbox_claim'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sqlite(DROP_INDEX + INSTALL),
+            run_sqlite(DROP_INDEX + RESTORE_PREVIOUS),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_search_index_stable_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='refresh_counter',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.db import models
 from django.utils import timezone
 import uuid
 
+from .ids import uuid7
+
 
 class User(AbstractUser):
     """
@@ -15,11 +17,16 @@ class User(AbstractUser):
         ('technicien', 'Technicien'),
     ]
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # UUID version 7 : clés croissantes dans le temps (core/ids.py)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     nom = models.CharField(max_length=50)
     prenom = models.CharField(max_length=50)
     telephone = models.CharField(max_length=15, unique=True, db_index=True)
     adresse = models.TextField(blank=True, null=True)
+    # Localité normalisée (ex. "medina-dakar") : regroupement des pannes par zone.
+    # Déduite de l'adresse si elle n'est pas renseignée, et recalculée quand
+    # l'adresse change sauf si la zone est modifiée en même temps (core/outages.py)
+    zone = models.CharField(max_length=80, blank=True, null=True)
     email = models.EmailField(unique=True, db_index=True)
     role = models.CharField(max_length=15, choices=ROLE_CHOICES, default='client')
     numero_compteur = models.CharField(max_length=30, blank=True, null=True)
@@ -27,6 +34,11 @@ class User(AbstractUser):
     # Champs pour l'authentification automatique
     is_first_login = models.BooleanField(default=True)
     temp_password = models.CharField(max_length=20, blank=True, null=True)
+    # Incrémenté à la déconnexion et au changement de mot de passe : révoque tous
+    # les jetons émis (core/tokens.py)
+    token_version = models.PositiveIntegerField(default=0)
+    # Incrémenté à chaque rafraîchissement : un jeton de rafraîchissement ne sert qu'une fois
+    refresh_counter = models.PositiveIntegerField(default=0)
     date_created = models.DateTimeField(auto_now_add=True)
     date_updated = models.DateTimeField(auto_now=True)
     
@@ -37,19 +49,62 @@ class User(AbstractUser):
         verbose_name = 'Utilisateur'
         verbose_name_plural = 'Utilisateurs'
         db_table = 'core_user'
+        indexes = [
+            # Comptages par rôle du dashboard et recherche des techniciens actifs
+            models.Index(fields=['role', 'is_active'], name='user_role_idx'),
+        ]
     
     def __str__(self):
         return f"{self.prenom} {self.nom} ({self.role})"
     
     def get_full_name(self):
         return f"{self.prenom} {self.nom}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_location()
+        instance._loaded_password = instance.__dict__.get('password')
+        return instance
+    
+    def _remember_loaded_location(self):
+        # Adresse et zone telles qu'en base : une zone saisie à la main est conservée
+        self._loaded_location = (self.__dict__.get('adresse'), self.__dict__.get('zone'))
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'adresse' in self.__dict__ and (update_fields is None or 'adresse' in update_fields):
+            loaded_adresse, loaded_zone = getattr(self, '_loaded_location', (None, None))
+            moved = not self._state.adding and self.adresse != loaded_adresse and self.zone == loaded_zone
+            if (not self.zone and self.adresse) or moved:
+                from .outages import normalize_zone
+                self.zone = normalize_zone(self.adresse)
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'zone'}
+        # Nouveau mot de passe (réinitialisation, administration) : les jetons
+        # déjà émis, rafraîchissement compris, sont révoqués comme à la déconnexion
+        password_changed = (
+            'password' in self.__dict__ and not self._state.adding
+            and (update_fields is None or 'password' in update_fields)
+            and self.password != getattr(self, '_loaded_password', self.password)
+        )
+        if password_changed:
+            self.token_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._remember_loaded_location()
+        self._loaded_password = self.__dict__.get('password')
+        if password_changed:
+            from .tokens import user_cache
+            user_cache.evict(self.pk.hex)
 
 
 class Categories(models.Model):
     """
     Modèle pour les catégories de réclamations
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     nom = models.CharField(max_length=80, unique=True)
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
@@ -75,15 +130,23 @@ class Reclamation(models.Model):
         ('ferme', 'Fermé'),
         ('annule', 'Annulé'),
     ]
+    # Statuts comptés dans la charge de travail d'un technicien
+    OPEN_STATUSES = ('en_attente', 'en_cours')
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     description = models.TextField()
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='en_attente')
     dateReponse = models.DateTimeField(blank=True, null=True)
     image = models.ImageField(upload_to='reclamations/', blank=True, null=True)
+    # Empreinte SHA-256 du fichier image : déduplication et noms des variantes
+    image_hash = models.CharField(max_length=64, blank=True, null=True, editable=False)
     
     # Relations
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reclamations')
+    # Incident (panne de zone) auquel le détecteur a rattaché la réclamation
+    incident = models.ForeignKey(
+        'Incident', on_delete=models.SET_NULL, blank=True, null=True, related_name='reclamations',
+    )
     categories = models.ForeignKey(Categories, on_delete=models.CASCADE, related_name='reclamations')
     technicien = models.ForeignKey(
         User, 
@@ -103,12 +166,203 @@ class Reclamation(models.Model):
         verbose_name_plural = 'Réclamations'
         ordering = ['-date_created']
         db_table = 'core_reclamation'
+        indexes = [
+            # Listes triées par date (superviseurs) et pagination par curseur
+            models.Index(fields=['date_created', 'id'], name='reclamation_date_idx'),
+            # Filtre par statut trié par date, et comptages par statut du dashboard
+            models.Index(fields=['status', 'date_created', 'id'], name='reclamation_status_date_idx'),
+            # Historique d'un client
+            models.Index(fields=['user', 'date_created', 'id'], name='reclamation_user_date_idx'),
+            # File d'un technicien par statut
+            models.Index(fields=['technicien', 'status'], name='reclamation_tech_status_idx'),
+            # File ouverte d'un technicien (index partiel, ne contient que les tickets à traiter)
+            models.Index(
+                fields=['technicien', 'date_created', 'id'],
+                name='reclamation_tech_open_idx',
+                condition=models.Q(status__in=['en_attente', 'en_cours']),
+            ),
+            # Actualisation incrémentale des agrégats (watermark sur date_updated)
+            models.Index(fields=['date_updated'], name='reclamation_updated_idx'),
+        ]
     
     def __str__(self):
         return f"Réclamation #{str(self.id)[:8]} - {self.user.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_state()
+        return instance
+    
+    def _remember_loaded_state(self):
+        # Valeurs telles qu'en base, pour détecter les changements dans les signaux
+        self._loaded_status = self.__dict__.get('status')
+        self._loaded_technicien_id = self.__dict__.get('technicien_id')
+    
+    @property
+    def loaded_status(self):
+        return getattr(self, '_loaded_status', None)
+    
+    @property
+    def loaded_technicien_id(self):
+        return getattr(self, '_loaded_technicien_id', None)
+    
     def save(self, *args, **kwargs):
         # Automatiquement définir dateReponse quand le status change vers 'resolu' ou 'ferme'
         if self.status in ['resolu', 'ferme'] and not self.dateReponse:
             self.dateReponse = timezone.now()
         super().save(*args, **kwargs)
+        self._remember_loaded_state()
+
+
+class EmailOutbox(models.Model):
+    """
+    File d'attente persistante des emails à envoyer (pattern outbox)
+    """
+    STATUS_CHOICES = [
+        ('en_attente', 'En Attente'),
+        # Réservé par un worker jusqu'à prochaine_tentative (core/outbox.py)
+        ('en_cours', 'En Cours d\'Envoi'),
+        ('envoye', 'Envoyé'),
+        ('abandonne', 'Abandonné'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='emails'
+    )
+    destinataire = models.EmailField()
+    sujet = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='en_attente')
+
+    # Gestion des tentatives
+    tentatives = models.PositiveIntegerField(default=0)
+    prochaine_tentative = models.DateTimeField(default=timezone.now)
+    derniere_erreur = models.TextField(blank=True, null=True)
+
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_envoi = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Email en attente'
+        verbose_name_plural = 'Emails en attente'
+        ordering = ['date_created']
+        db_table = 'core_email_outbox'
+        indexes = [
+            models.Index(fields=['status', 'prochaine_tentative'], name='outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email à {self.destinataire} ({self.status})"
+
+
+class ReclamationDailyRollup(models.Model):
+    """
+    Agrégat journalier des réclamations par catégorie et statut, alimenté
+    par la commande refresh_rollups (délais de réponse compris)
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    jour = models.DateField()
+    categories = models.ForeignKey(Categories, on_delete=models.CASCADE, related_name='rollups')
+    status = models.CharField(max_length=15, choices=Reclamation.STATUS_CHOICES)
+    nombre = models.PositiveIntegerField(default=0)
+
+    # Délai dateReponse - date_created des réclamations ayant une réponse
+    nombre_repondues = models.PositiveIntegerField(default=0)
+    duree_totale = models.FloatField(default=0)  # secondes
+    sketch = models.JSONField(default=dict)  # histogramme fusionnable (core.sketch)
+
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Agrégat journalier'
+        verbose_name_plural = 'Agrégats journaliers'
+        ordering = ['jour']
+        db_table = 'core_reclamation_daily_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['jour', 'categories', 'status'], name='rollup_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.jour} - {self.categories_id} - {self.status}: {self.nombre}"
+
+
+class RollupWatermark(models.Model):
+    """
+    Position de la dernière actualisation incrémentale d'un agrégat
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    nom = models.CharField(max_length=50, unique=True)
+    valeur = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'core_rollup_watermark'
+
+    def __str__(self):
+        return f"{self.nom}: {self.valeur}"
+
+
+class DataVersion(models.Model):
+    """
+    Compteur de version d'un jeu de données, incrémenté à chaque modification
+    pour invalider les caches de tous les processus
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    nom = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'core_data_version'
+
+    def __str__(self):
+        return f"{self.nom}: v{self.version}"
+
+
+class Incident(models.Model):
+    """
+    Panne de zone : regroupe les réclamations "Panne Électrique" d'une même
+    localité arrivées en rafale (détecteur de core/outages.py), traitées en bloc
+    """
+    STATUS_CHOICES = [
+        ('ouvert', 'Ouvert'),
+        ('en_cours', 'En Cours'),
+        ('resolu', 'Résolu'),
+    ]
+    OPEN_STATUSES = ('ouvert', 'en_cours')
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    zone = models.CharField(max_length=80)
+    categories = models.ForeignKey(Categories, on_delete=models.CASCADE, related_name='incidents')
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='ouvert')
+    technicien = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='incidents_assignes',
+        limit_choices_to={'role': 'technicien'}
+    )
+    # Création de la première réclamation du groupe
+    date_debut = models.DateTimeField()
+    date_resolution = models.DateTimeField(blank=True, null=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Incident'
+        verbose_name_plural = 'Incidents'
+        ordering = ['-date_created']
+        db_table = 'core_incident'
+        indexes = [
+            # Incident ouvert d'une zone (détecteur) et liste des incidents par statut
+            models.Index(fields=['status', 'zone'], name='incident_status_zone_idx'),
+        ]
+
+    def __str__(self):
+        return f"Incident {self.zone} ({self.status})"
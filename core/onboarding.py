@@ -0,0 +1,234 @@
+"""
+Import en masse d'utilisateurs depuis un flux CSV ou JSON-lines
+"""
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+import csv
+import json
+
+from .models import User, EmailOutbox
+from .outages import normalize_zone
+from .outbox import build_credentials_email
+from .passwords import PasswordHasherPool, generate_temp_password
+from .stats import invalidate_dashboard_stats
+
+
+REQUIRED_FIELDS = ['nom', 'prenom', 'email', 'telephone', 'role']
+VALID_ROLES = {role for role, _ in User.ROLE_CHOICES}
+
+
+def iter_csv_rows(lines):
+    """Lit des lignes CSV (bytes ou str) avec en-tête et produit des dicts"""
+    decoded = (line.decode('utf-8-sig') if isinstance(line, bytes) else line for line in lines)
+    yield from csv.DictReader(decoded)
+
+
+def iter_jsonl_rows(lines):
+    """Lit un objet JSON par ligne ; les lignes invalides produisent None"""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8-sig')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield row if isinstance(row, dict) else None
+
+
+def validate_row(row):
+    """Retourne (données nettoyées, erreurs) pour une ligne brute"""
+    if row is None:
+        return None, ['Ligne illisible']
+
+    data = {key: (str(value).strip() if value is not None else '') for key, value in row.items() if key}
+    errors = [f'Champ manquant: {field}' for field in REQUIRED_FIELDS if not data.get(field)]
+    if data.get('email'):
+        try:
+            validate_email(data['email'])
+        except ValidationError:
+            errors.append('Email invalide')
+    if data.get('role') and data['role'] not in VALID_ROLES:
+        errors.append(f"Rôle invalide: {data['role']}")
+    if len(data.get('telephone', '')) > 15:
+        errors.append('Téléphone trop long')
+    return data, errors
+
+
+def conflict_errors(data, existing_emails, existing_phones):
+    errors = []
+    if data['email'] in existing_emails:
+        errors.append('Un utilisateur avec cet email existe déjà')
+    if data['telephone'] in existing_phones:
+        errors.append('Un utilisateur avec ce téléphone existe déjà')
+    return errors
+
+
+def save_entries(entries):
+    """Utilisateurs et emails d'identifiants de `entries`, dans une transaction"""
+    if not entries:
+        return
+    with transaction.atomic():
+        User.objects.bulk_create([user for _, user, _ in entries])
+        EmailOutbox.objects.bulk_create([email for _, _, email in entries])
+
+
+class BulkUserImporter:
+    """
+    Crée des utilisateurs par lots : une recherche de conflits par lot,
+    hachage des mots de passe en parallèle, puis bulk_create des utilisateurs
+    et de leurs emails d'identifiants dans une transaction par lot.
+    """
+
+    def __init__(self, chunk_size=1000, workers=None):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.seen_emails = set()
+        self.seen_phones = set()
+        self.report = []
+        self.created = 0
+        self.errors = 0
+
+    def run(self, rows):
+        """Importe toutes les lignes et retourne le rapport"""
+        with PasswordHasherPool(workers=self.workers) as pool:
+            chunk = []
+            for line_number, row in enumerate(rows, start=1):
+                chunk.append((line_number, row))
+                if len(chunk) >= self.chunk_size:
+                    self._process_chunk(chunk, pool)
+                    chunk = []
+            if chunk:
+                self._process_chunk(chunk, pool)
+
+        # bulk_create n'émet pas de signaux post_save
+        if self.created:
+            invalidate_dashboard_stats()
+
+        self.report.sort(key=lambda line: line['ligne'])
+
+        return {
+            'total': self.created + self.errors,
+            'crees': self.created,
+            'erreurs': self.errors,
+            'lignes': self.report,
+        }
+
+    def _reject(self, line_number, email, errors):
+        self.errors += 1
+        self.report.append({'ligne': line_number, 'email': email, 'status': 'erreur', 'erreurs': errors})
+
+    def _process_chunk(self, chunk, pool):
+        candidates = []
+        for line_number, row in chunk:
+            data, errors = validate_row(row)
+            email = data.get('email') if data else None
+            if not errors:
+                if data['email'] in self.seen_emails:
+                    errors.append('Email en double dans le fichier')
+                if data['telephone'] in self.seen_phones:
+                    errors.append('Téléphone en double dans le fichier')
+            if errors:
+                self._reject(line_number, email, errors)
+                continue
+            self.seen_emails.add(data['email'])
+            self.seen_phones.add(data['telephone'])
+            candidates.append((line_number, data))
+
+        if not candidates:
+            return
+
+        # Une seule requête pour détecter les conflits du lot avec la base
+        existing = self._existing([data for _, data in candidates])
+        accepted = []
+        for line_number, data in candidates:
+            errors = conflict_errors(data, *existing)
+            if errors:
+                self._reject(line_number, data['email'], errors)
+            else:
+                accepted.append((line_number, data, generate_temp_password()))
+
+        if not accepted:
+            return
+
+        hashes = pool.hash_many(temp_password for _, _, temp_password in accepted)
+
+        users, emails = [], []
+        for (line_number, data, temp_password), password_hash in zip(accepted, hashes):
+            user = User(
+                username=data['email'],
+                email=data['email'],
+                nom=data['nom'],
+                prenom=data['prenom'],
+                telephone=data['telephone'],
+                role=data['role'],
+                adresse=data.get('adresse', ''),
+                # bulk_create n'appelle pas User.save(), qui déduit la zone
+                zone=data.get('zone') or normalize_zone(data.get('adresse')),
+                numero_compteur=data.get('numero_compteur', ''),
+                password=password_hash,
+                temp_password=temp_password,
+                is_active=True,
+            )
+            subject, message = build_credentials_email(user, temp_password)
+            users.append(user)
+            emails.append(EmailOutbox(user=user, destinataire=user.email, sujet=subject, message=message))
+
+        entries = list(zip(accepted, users, emails))
+        try:
+            save_entries(entries)
+        except IntegrityError:
+            # Email ou téléphone créé par une autre requête depuis la recherche de
+            # conflits : seules les lignes désormais en collision sont rejetées
+            entries = self._drop_conflicts(entries)
+            try:
+                save_entries(entries)
+            except IntegrityError:
+                # Nouvelle course, ou contrainte non couverte par la recherche
+                entries = self._save_one_by_one(entries)
+
+        for (line_number, _, _), user, _ in entries:
+            self.created += 1
+            self.report.append({'ligne': line_number, 'email': user.email, 'status': 'cree', 'id': str(user.id)})
+
+    def _existing(self, rows):
+        """Emails et téléphones de `rows` déjà présents en base (une requête)"""
+        existing = User.objects.filter(
+            Q(email__in=[data['email'] for data in rows])
+            | Q(telephone__in=[data['telephone'] for data in rows])
+        ).values_list('email', 'telephone')
+        existing_emails, existing_phones = set(), set()
+        for email, telephone in existing:
+            existing_emails.add(email)
+            existing_phones.add(telephone)
+        return existing_emails, existing_phones
+
+    def _drop_conflicts(self, entries):
+        existing = self._existing([data for (_, data, _), _, _ in entries])
+        kept = []
+        for entry in entries:
+            line_number, data, _ = entry[0]
+            errors = conflict_errors(data, *existing)
+            if errors:
+                self._reject(line_number, data['email'], errors)
+            else:
+                kept.append(entry)
+        return kept
+
+    def _save_one_by_one(self, entries):
+        """Un savepoint par ligne : une ligne en conflit n'annule pas les autres"""
+        saved = []
+        for entry in entries:
+            try:
+                save_entries([entry])
+            except IntegrityError:
+                line_number, data, _ = entry[0]
+                self._reject(line_number, data['email'], ['Conflit à l\'enregistrement (email ou téléphone déjà utilisé)'])
+            else:
+                saved.append(entry)
+        return saved
+
@@ -0,0 +1,310 @@
+"""
+Détection des pannes de zone parmi les réclamations "Panne Électrique".
+
+Quand un départ déclenche, des centaines de réclamations d'une même localité
+arrivent en quelques minutes. Le détecteur garde, par zone (User.zone, ou
+l'adresse normalisée), une fenêtre glissante des réclamations récentes de la
+catégorie (OUTAGE_WINDOW secondes) dans une deque :
+- chaque nouvelle réclamation est ajoutée à droite, les plus anciennes que la
+  fenêtre retirées à gauche : O(1) amorti par réclamation
+- dès que la fenêtre atteint OUTAGE_THRESHOLD réclamations, un Incident est
+  créé et toutes les réclamations de la fenêtre y sont rattachées (un UPDATE)
+- tant que l'incident est ouvert, les nouvelles réclamations de la zone y sont
+  rattachées directement
+
+L'état se reconstruit depuis la base en une passe (incidents ouverts, puis
+réclamations de la catégorie plus récentes que la fenêtre, par date de
+création), au premier usage après le démarrage ou après reset().
+
+Chaque processus a son propre détecteur : avec plusieurs workers, une rafale
+est répartie entre eux. Avant de créer un incident, la base est consultée
+pour réutiliser celui qu'un autre processus aurait ouvert dans la zone. Le
+rattachement à un incident connu est un UPDATE conditionné à son statut :
+résolu par un autre processus, il est oublié et la zone repart d'une fenêtre.
+
+Le verrou ne protège que l'état en mémoire : les requêtes (reconstruction,
+création d'incident, rattachements) sont faites hors du verrou.
+"""
+from collections import deque
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists
+from django.utils import timezone
+from django.utils.text import slugify
+import re
+import threading
+
+from .assignment import engine as assignment_engine
+from .events import broker
+from .models import Categories, Incident, Reclamation
+from .stats import invalidate_dashboard_stats
+
+
+DEFAULT_CATEGORY = 'Panne Électrique'
+DEFAULT_WINDOW = 15 * 60
+DEFAULT_THRESHOLD = 10
+
+
+def normalize_zone(adresse):
+    """
+    Localité normalisée d'une adresse : sans accents ni casse, sans les
+    composantes numérotées (rue, villa...), quartier puis ville.
+    "Villa 12, Médina, Dakar" -> "medina-dakar" ; "Pikine" -> "pikine"
+    """
+    parts = [slugify(part) for part in re.split(r'[,;\n]', adresse or '')]
+    parts = [part for part in parts if part and not any(char.isdigit() for char in part)]
+    if not parts:
+        return None
+    zone = parts[0] if len(parts) == 1 else f'{parts[-2]}-{parts[-1]}'
+    return zone[:80]
+
+
+class OutageDetector:
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._windows = {}
+        # Réclamations présentes dans les fenêtres : observe() est idempotent (la
+        # reconstruction peut déjà contenir la réclamation qui l'a déclenchée)
+        self._members = set()
+        self._incidents = {}
+        self._category_id = None
+        self._seeded = False
+
+    @property
+    def window(self):
+        return timedelta(seconds=getattr(settings, 'OUTAGE_WINDOW', DEFAULT_WINDOW))
+
+    @property
+    def threshold(self):
+        return getattr(settings, 'OUTAGE_THRESHOLD', DEFAULT_THRESHOLD)
+
+    def seed(self, now=None):
+        """Reconstruit les fenêtres et les incidents ouverts depuis la base, en une passe"""
+        now = now or timezone.now()
+        name = getattr(settings, 'OUTAGE_CATEGORY', DEFAULT_CATEGORY)
+        category_id = Categories.objects.filter(nom=name).values_list('pk', flat=True).first()
+        incidents = dict(
+            Incident.objects.filter(status__in=Incident.OPEN_STATUSES)
+            .order_by('date_created').values_list('zone', 'pk')
+        )
+        # Réclamations récentes pas encore rattachées : une passe, par date de création
+        rows = (
+            Reclamation.objects.filter(
+                categories_id=category_id, incident__isnull=True, date_created__gte=now - self.window,
+            )
+            .order_by('date_created')
+            .values_list('pk', 'user__zone', 'date_created')
+        )
+
+        windows = {}
+        members = set()
+        for pk, zone, created in (rows.iterator() if category_id else ()):
+            if zone:
+                windows.setdefault(zone, deque()).append((created, pk))
+                members.add(pk)
+        with self._lock:
+            self._category_id = category_id
+            self._incidents = incidents
+            self._windows = windows
+            self._members = members
+            self._seeded = True
+
+    def reset(self):
+        """Force une reconstruction à la prochaine utilisation"""
+        with self._lock:
+            self._seeded = False
+
+    def _ensure_seeded(self):
+        # Hors du verrou : seed() ne le prend que pour remplacer l'état
+        if not self._seeded:
+            self.seed()
+
+    def watches(self, category_id):
+        self._ensure_seeded()
+        return category_id == self._category_id
+
+    def observe(self, reclamation_id, zone, created):
+        """
+        Ajoute une réclamation de la catégorie surveillée. Retourne l'identifiant
+        de l'incident auquel cet appel l'a rattachée, ou None
+        """
+        if not zone:
+            return None
+        self._ensure_seeded()
+        with self._lock:
+            incident_id = self._incidents.get(zone)
+        if incident_id is not None:
+            if attach(incident_id, [reclamation_id]):
+                return incident_id
+            if incident_is_open(incident_id):
+                # Non rattachée alors que l'incident est ouvert : déjà rattachée
+                # ailleurs ou supprimée. La zone est en incident, pas de fenêtre
+                return None
+            # Résolu par un autre processus ou depuis l'administration
+            self.close(zone, incident_id)
+
+        with self._lock:
+            window = self._windows.get(zone)
+            if window is None:
+                window = self._windows[zone] = deque()
+            if reclamation_id not in self._members:
+                window.append((created, reclamation_id))
+                self._members.add(reclamation_id)
+            horizon = created - self.window
+            while window and window[0][0] < horizon:
+                self._members.discard(window.popleft()[1])
+            if len(window) < self.threshold:
+                return None
+            batch = list(window)
+            self._drop(zone)
+
+        incident_id = open_incident(zone, self._category_id, batch)
+        with self._lock:
+            self._incidents[zone] = incident_id
+            # Arrivées pendant la création de l'incident : rattachées aussi
+            late = [pk for _, pk in self._windows.get(zone, ())]
+            self._drop(zone)
+        if late:
+            attach(incident_id, late)
+        return incident_id
+
+    def _drop(self, zone):
+        for _, pk in self._windows.pop(zone, ()):
+            self._members.discard(pk)
+
+    def close(self, zone, incident_id=None):
+        """
+        Incident résolu : la zone repart d'une fenêtre vide. Avec `incident_id`,
+        sans effet si la zone est déjà passée à un autre incident
+        """
+        with self._lock:
+            if incident_id is not None and self._incidents.get(zone) != incident_id:
+                return
+            self._incidents.pop(zone, None)
+            self._drop(zone)
+
+    def snapshot(self):
+        """Réclamations dans la fenêtre de chaque zone, et incidents ouverts"""
+        self._ensure_seeded()
+        with self._lock:
+            return (
+                {zone: len(window) for zone, window in self._windows.items() if window},
+                {zone: incident_id for zone, incident_id in self._incidents.items()},
+            )
+
+
+def attach(incident_id, reclamation_ids):
+    """
+    Rattache les réclamations à l'incident s'il est encore ouvert (un UPDATE).
+    Retourne le nombre de réclamations rattachées
+    """
+    # Les réclamations déjà rattachées (incident d'un autre processus) ne bougent pas
+    return Reclamation.objects.filter(
+        Exists(Incident.objects.filter(pk=incident_id, status__in=Incident.OPEN_STATUSES)),
+        pk__in=reclamation_ids, incident__isnull=True,
+    ).update(incident_id=incident_id)
+
+
+def incident_is_open(incident_id):
+    return Incident.objects.filter(pk=incident_id, status__in=Incident.OPEN_STATUSES).exists()
+
+
+def open_incident(zone, category_id, window):
+    """Crée l'incident de la zone (ou reprend celui d'un autre processus) et y rattache la fenêtre"""
+    with transaction.atomic():
+        incident = Incident.objects.filter(zone=zone, status__in=Incident.OPEN_STATUSES).first()
+        if incident is None:
+            incident = Incident.objects.create(zone=zone, categories_id=category_id, date_debut=window[0][0])
+            transaction.on_commit(lambda: broker.publish(
+                'incident_ouvert', {'id': str(incident.pk), 'zone': zone}, None,
+            ))
+        attach(incident.pk, [pk for _, pk in window])
+    return incident.pk
+
+
+detector = OutageDetector()
+
+
+def observe_reclamation(reclamation):
+    """
+    Signal post_save d'une nouvelle réclamation : soumise au détecteur après
+    validation de la transaction (une réclamation annulée par un rollback
+    n'entre jamais dans une fenêtre)
+    """
+    if reclamation.incident_id or not detector.watches(reclamation.categories_id):
+        return
+    zone = reclamation.user.zone
+    if zone:
+        pk, created = reclamation.pk, reclamation.date_created
+        transaction.on_commit(lambda: detector.observe(pk, zone, created))
+
+
+INCIDENT_ACTIONS = ('prendre_en_charge', 'resoudre')
+
+
+class IncidentConflict(Exception):
+    """L'incident a été pris en charge ou résolu par une autre requête depuis sa lecture"""
+
+
+def handle_incident(incident, action, technicien_id=None):
+    """
+    Traitement en bloc des réclamations ouvertes d'un incident, un UPDATE :
+    - prendre_en_charge : technicien assigné, statut en_cours
+    - resoudre : statut resolu, date de réponse
+    L'incident n'est modifié que s'il est toujours dans l'état lu par
+    l'appelant (statut et technicien) : de deux traitements concurrents, le
+    second lève IncidentConflict sans rien modifier.
+    Retourne le nombre de réclamations modifiées
+    """
+    now = timezone.now()
+    if action == 'prendre_en_charge':
+        changes = {'status': 'en_cours', 'technicien_id': technicien_id}
+    else:
+        changes = {'status': 'resolu', 'date_resolution': now}
+    with transaction.atomic():
+        claimed = Incident.objects.filter(
+            pk=incident.pk, status=incident.status, technicien_id=incident.technicien_id,
+        ).update(date_updated=now, **changes)
+        if not claimed:
+            raise IncidentConflict
+        for field, value in changes.items():
+            setattr(incident, field, value)
+        incident.date_updated = now
+
+        queryset = Reclamation.objects.filter(incident=incident, status__in=Reclamation.OPEN_STATUSES)
+        previous = {
+            pk: (status, tech_id) for pk, status, tech_id in queryset.values_list('pk', 'status', 'technicien_id')
+        }
+        if action == 'prendre_en_charge':
+            updated = queryset.update(status='en_cours', technicien_id=technicien_id, date_updated=now)
+        else:
+            updated = queryset.update(status='resolu', dateReponse=now, date_updated=now)
+
+        # L'UPDATE groupé n'émet pas de signaux : charges, statistiques et flux en direct
+        rows = Reclamation.objects.filter(pk__in=list(previous)).values_list(
+            'pk', 'user_id', 'technicien_id', 'status',
+        )
+        for pk, user_id, tech_id, status in rows:
+            old_status, old_tech_id = previous[pk]
+            data = {
+                'id': str(pk),
+                'status': status,
+                'ancien_status': old_status,
+                'technicien_id': str(tech_id) if tech_id else None,
+                'ancien_technicien_id': str(old_tech_id) if old_tech_id else None,
+                'date_updated': now.isoformat(),
+                'incident_id': str(incident.pk),
+            }
+            event_type = 'statut_modifie' if status != old_status else 'technicien_modifie'
+            transaction.on_commit(
+                lambda event_type=event_type, data=data, user_id=user_id, technicien_ids=(tech_id, old_tech_id):
+                broker.publish(event_type, data, user_id, technicien_ids)
+            )
+
+        transaction.on_commit(assignment_engine.reset)
+        transaction.on_commit(invalidate_dashboard_stats)
+        if incident.status == 'resolu':
+            transaction.on_commit(lambda: detector.close(incident.zone, incident.pk))
+    return updated
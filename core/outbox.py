@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+from .db import retry_on_busy
+from .models import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(destinataire, sujet, message, user=None):
+    """
+    Enregistre un email dans l'outbox. À appeler dans la même transaction
+    que l'écriture métier pour que l'email ne soit jamais perdu ni envoyé à tort
+    """
+    return EmailOutbox.objects.create(
+        user=user,
+        destinataire=destinataire,
+        sujet=sujet,
+        message=message,
+    )
+
+
+def build_credentials_email(user, temp_password):
+    """Construit le sujet et le message contenant les informations de connexion"""
+    subject = 'Vos informations de connexion - Système SENELEC'
+    message = f"""
+    Bonjour {user.get_full_name()},
+
+    Voici vos informations de connexion au système SENELEC :
+
+    📧 Email : {user.email}
+    🔑 Mot de passe temporaire : {temp_password}
+    👤 Rôle : {user.get_role_display()}
+
+    Veuillez vous connecter et modifier votre mot de passe lors de votre première connexion.
+
+    Cordialement,
+    L'équipe SENELEC
+    """
+    return subject, message
+
+
+def retry_delay(tentatives):
+    """Délai avant la prochaine tentative (backoff exponentiel plafonné)"""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60)
+    maximum = getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 3600)
+    return timedelta(seconds=min(base * 2 ** (tentatives - 1), maximum))
+
+
+def due_emails(now, batch_size):
+    """Emails dus (en attente, ou réservation expirée), les plus anciens d'abord"""
+    return list(
+        EmailOutbox.objects
+        .filter(status__in=('en_attente', 'en_cours'), prochaine_tentative__lte=now)
+        .order_by('prochaine_tentative')[:batch_size]
+    )
+
+
+@retry_on_busy
+def claim_pending_emails(batch_size=100, now=None):
+    """
+    Réserve un lot d'emails dus : chaque ligne passe en 'en_cours' avec
+    prochaine_tentative repoussée de EMAIL_OUTBOX_CLAIM_TIMEOUT secondes, par un
+    UPDATE conditionnel sur le statut et la date lus. Un autre worker qui a lu
+    les mêmes lignes ne modifie rien et ne les envoie pas.
+    Une réservation expirée (worker arrêté pendant l'envoi) redevient due.
+    """
+    now = now or timezone.now()
+    lease = now + timedelta(seconds=getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 600))
+    candidates = due_emails(now, batch_size)
+    claimed = []
+    with transaction.atomic():
+        for email in candidates:
+            won = EmailOutbox.objects.filter(
+                pk=email.pk, status=email.status, prochaine_tentative=email.prochaine_tentative,
+            ).update(status='en_cours', prochaine_tentative=lease)
+            if won:
+                email.status, email.prochaine_tentative = 'en_cours', lease
+                claimed.append(email)
+    return claimed
+
+
+def deliver_pending_emails(batch_size=100):
+    """
+    Envoie un lot d'emails en attente sur une seule connexion SMTP réutilisée.
+    Seuls les emails réservés par ce worker sont envoyés (claim_pending_emails).
+    Retourne le nombre d'emails envoyés, reprogrammés et abandonnés.
+    """
+    max_tentatives = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    emails = claim_pending_emails(batch_size)
+    result = {'envoyes': 0, 'reprogrammes': 0, 'abandonnes': 0}
+    if not emails:
+        return result
+
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(
+                email.sujet,
+                email.message,
+                settings.DEFAULT_FROM_EMAIL,
+                [email.destinataire],
+                connection=connection,
+            )
+            try:
+                # Un envoi par message pour isoler les échecs sans rouvrir la connexion
+                connection.send_messages([message])
+                sent.append(email)
+            except Exception as e:
+                email.derniere_erreur = str(e)
+                failed.append(email)
+    except Exception as e:
+        # Connexion impossible : tout le lot restant est reprogrammé
+        logger.warning("Connexion SMTP impossible: %s", e)
+        for email in emails:
+            if email not in sent and email not in failed:
+                email.derniere_erreur = str(e)
+                failed.append(email)
+    finally:
+        connection.close()
+
+    now = timezone.now()
+    for email in sent:
+        email.status = 'envoye'
+        email.tentatives += 1
+        email.date_envoi = now
+        email.derniere_erreur = None
+    for email in failed:
+        email.tentatives += 1
+        if email.tentatives >= max_tentatives:
+            email.status = 'abandonne'
+            result['abandonnes'] += 1
+        else:
+            email.status = 'en_attente'
+            email.prochaine_tentative = now + retry_delay(email.tentatives)
+            result['reprogrammes'] += 1
+    result['envoyes'] = len(sent)
+
+    EmailOutbox.objects.bulk_update(
+        sent + failed,
+        ['status', 'tentatives', 'date_envoi', 'prochaine_tentative', 'derniere_erreur'],
+    )
+    return result
@@ -0,0 +1,53 @@
+"""
+Pagination par curseur (keyset) sur (date_created, id) : le coût d'une page
+ne dépend pas de sa position, contrairement à OFFSET
+"""
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+import uuid
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(date_created, pk):
+    """Encode la position (date_created, id) en un curseur opaque"""
+    payload = json.dumps([date_created.isoformat(), str(pk)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Décode un curseur ; lève InvalidCursor s'il est mal formé"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_created, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        date_created = parse_datetime(date_created)
+        if date_created is None:
+            raise ValueError(cursor)
+        return date_created, uuid.UUID(pk)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise InvalidCursor(cursor)
+
+
+def paginate_by_cursor(queryset, cursor=None, limit=20):
+    """
+    Applique l'ordre (-date_created, -id) et la position du curseur au queryset
+    (qui peut être un queryset values()). Retourne (lignes, curseur suivant).
+    """
+    queryset = queryset.order_by('-date_created', '-id')
+    if cursor:
+        date_created, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(date_created__lt=date_created) | Q(date_created=date_created, id__lt=pk)
+        )
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['date_created'], last['id'])
+    return rows, next_cursor
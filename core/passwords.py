@@ -0,0 +1,65 @@
+"""
+Génération de mots de passe temporaires et hachage réparti sur un pool
+de processus (PBKDF2 est lié au CPU)
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import string
+
+
+def generate_temp_password(length=8):
+    """Génère un mot de passe temporaire aléatoire"""
+    characters = string.ascii_letters + string.digits
+    return ''.join(random.choice(characters) for _ in range(length))
+
+
+def _init_worker(settings_module):
+    # Nécessaire quand les processus sont lancés en mode "spawn" (Windows, macOS)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def _hash(password):
+    from django.contrib.auth.hashers import make_password
+    return make_password(password)
+
+
+class PasswordHasherPool:
+    """
+    Pool de processus réutilisable pour hacher des lots de mots de passe.
+    S'utilise comme gestionnaire de contexte.
+    """
+
+    def __init__(self, workers=None, inline_threshold=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.inline_threshold = inline_threshold
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def hash_many(self, passwords):
+        """Retourne les hachages dans l'ordre des mots de passe fournis"""
+        passwords = list(passwords)
+        # Inutile de payer le démarrage des processus pour quelques mots de passe
+        if self.workers <= 1 or len(passwords) <= self.inline_threshold:
+            return [_hash(password) for password in passwords]
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'senelec_system.settings'),),
+            )
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._executor.map(_hash, passwords, chunksize=chunksize))
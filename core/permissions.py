@@ -0,0 +1,20 @@
+from .models import Reclamation
+
+
+STAFF_ROLES = ('admin', 'superviseur')
+
+
+def visible_reclamations(user, queryset=None):
+    """
+    Restreint les réclamations à celles visibles par l'utilisateur :
+    les clients voient les leurs, les techniciens celles qui leur sont
+    assignées, les superviseurs et administrateurs voient tout
+    """
+    if queryset is None:
+        queryset = Reclamation.objects.all()
+
+    if user.role in STAFF_ROLES or user.is_superuser:
+        return queryset
+    if user.role == 'technicien':
+        return queryset.filter(technicien=user)
+    return queryset.filter(user=user)
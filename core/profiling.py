@@ -0,0 +1,197 @@
+"""
+Profilage à la demande des requêtes de production (PROFILING_ENABLED).
+
+Une requête est profilée si elle porte l'en-tête X-Senelec-Profile avec le
+jeton PROFILING_TOKEN, ou si elle est tirée au sort (une sur
+PROFILING_SAMPLE_RATE). Pour chacune, le répertoire PROFILING_DIR reçoit :
+- <id>.prof : statistiques cProfile (pstats, snakeviz...)
+- <id>.sql.json : la requête HTTP et la trace SQL (texte SQL sans les
+  paramètres, alias, durée)
+Seuls les PROFILING_MAX_FILES profils les plus récents sont conservés. La
+commande profile_summary agrège les fonctions les plus coûteuses.
+
+Désactivé, le middleware lève MiddlewareNotUsed : Django le retire de la
+chaîne et le wrapper SQL n'est jamais installé.
+
+Un seul profil à la fois par processus (cProfile ne supporte pas plusieurs
+profileurs actifs) : une requête tirée pendant un profilage en cours ne
+l'est pas.
+
+Sous ASGI, le profileur reste actif pendant les await : le .prof contient
+aussi le travail des autres requêtes servies par la boucle d'événements
+pendant ce temps, et pas celui des threads de sync_to_async. Seule la trace
+SQL (portée par un ContextVar) est propre à la requête. Ces profils sont
+marqués 'serveur': 'asgi' et signalés par profile_summary ; pour des temps
+par fonction fiables, profiler sous WSGI.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.crypto import constant_time_compare
+from pathlib import Path
+import cProfile
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+
+from .metrics import view_label
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Senelec-Profile'
+PROFILE_ID_HEADER = 'X-Senelec-Profile-Id'
+
+_trace = ContextVar('senelec_sql_trace', default=None)
+
+
+def trace_sql(execute, sql, params, many, context):
+    trace = _trace.get()
+    if trace is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        trace.append({
+            'alias': context['connection'].alias,
+            'sql': sql,
+            'many': many,
+            'ms': round((time.perf_counter() - start) * 1000, 3),
+        })
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # En tête de liste, comme core.metrics.record_sql
+    if trace_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, trace_sql)
+
+
+def profiling_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', Path(settings.BASE_DIR) / 'profiles'))
+
+
+def rotate(directory, max_files):
+    """Supprime les profils les plus anciens au-delà de max_files"""
+    profiles = sorted(directory.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+    for path in profiles[:max(0, len(profiles) - max_files)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.sql.json').unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    Profile les requêtes désignées (en-tête privilégié ou échantillonnage).
+    À placer juste après MetricsMiddleware
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.token = getattr(settings, 'PROFILING_TOKEN', None)
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 200)
+        self.directory = profiling_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+        connection_created.connect(instrument_connection, dispatch_uid='core.profiling')
+        for connection in connections.all(initialized_only=True):
+            instrument_connection(None, connection)
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def trigger(self, request):
+        """'header', 'sample' ou None"""
+        if self.token:
+            header = request.headers.get(PROFILE_HEADER)
+            if header and constant_time_compare(header, self.token):
+                return 'header'
+        if self.sample_rate and random.randrange(self.sample_rate) == 0:
+            return 'sample'
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        trigger = self.trigger(request)
+        if trigger is None or not self._lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            trace = []
+            token = _trace.set(trace)
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            try:
+                response = profiler.runcall(self.get_response, request)
+            finally:
+                elapsed = time.perf_counter() - start
+                _trace.reset(token)
+            self.save(request, response, profiler, trace, elapsed, trigger, 'wsgi')
+        finally:
+            self._lock.release()
+        return response
+
+    async def __acall__(self, request):
+        trigger = self.trigger(request)
+        if trigger is None or not self._lock.acquire(blocking=False):
+            return await self.get_response(request)
+
+        try:
+            trace = []
+            token = _trace.set(trace)
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            # Actif pendant les await : inclut les autres coroutines de la boucle
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - start
+                _trace.reset(token)
+            self.save(request, response, profiler, trace, elapsed, trigger, 'asgi')
+        finally:
+            self._lock.release()
+        return response
+
+    def save(self, request, response, profiler, trace, elapsed, trigger, server):
+        view = view_label(request)
+        profile_id = '{}-{}-{}'.format(
+            time.strftime('%Y%m%d-%H%M%S'), uuid.uuid4().hex[:8], view.replace(':', '.'),
+        )
+        try:
+            profiler.dump_stats(self.directory / f'{profile_id}.prof')
+            with open(self.directory / f'{profile_id}.sql.json', 'w') as f:
+                json.dump({
+                    'id': profile_id,
+                    'view': view,
+                    'method': request.method,
+                    'path': request.path,
+                    'status': response.status_code,
+                    'trigger': trigger,
+                    'serveur': server,
+                    'ms': round(elapsed * 1000, 3),
+                    'sql_count': len(trace),
+                    'sql_ms': round(sum(query['ms'] for query in trace), 3),
+                    'queries': trace,
+                }, f, indent=2)
+            rotate(self.directory, self.max_files)
+        except OSError as e:
+            logger.error("Profil %s non enregistré: %s", profile_id, e)
+            return
+        response[PROFILE_ID_HEADER] = profile_id
+        logger.info("Requête profilée (%s) %s %s en %.1f ms: %s", trigger, request.method, request.path,
+                    elapsed * 1000, profile_id)
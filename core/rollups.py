@@ -0,0 +1,144 @@
+"""
+Agrégats journaliers (jour x catégorie x statut) des réclamations et
+actualisation incrémentale à partir d'un watermark sur date_updated.
+
+Une réclamation modifiée peut changer de statut ou de catégorie : plutôt que
+d'appliquer des deltas, chaque jour touché depuis le dernier watermark est
+recalculé entièrement, toutes catégories confondues, depuis la table des
+réclamations (un jour de données, lu via l'index sur date_created). L'ancien
+couple (jour, catégorie) d'une réclamation recatégorisée est ainsi corrigé.
+
+date_updated est fixé avant la validation de la transaction : une écriture
+validée tardivement peut porter une date antérieure au watermark. Chaque
+actualisation relit donc ROLLUP_SAFETY_LAG secondes avant le watermark.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from datetime import datetime, time, timedelta
+
+from .models import Reclamation, ReclamationDailyRollup, RollupWatermark
+from .sketch import DurationSketch
+
+
+WATERMARK_NAME = 'reclamation_daily_rollup'
+DEFAULT_SAFETY_LAG = 5 * 60
+
+
+def day_bounds(day):
+    """Début et fin (exclue) d'un jour dans le fuseau horaire courant"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def rebuild_day(day):
+    """Recalcule les agrégats d'un jour, toutes catégories confondues"""
+    start, end = day_bounds(day)
+    groups = {}
+    rows = (
+        Reclamation.objects
+        .filter(date_created__gte=start, date_created__lt=end)
+        .order_by()
+        .values_list('categories_id', 'status', 'date_created', 'dateReponse')
+    )
+    for category_id, status, date_created, date_reponse in rows.iterator(chunk_size=5000):
+        rollup = groups.get((category_id, status))
+        if rollup is None:
+            rollup = groups[(category_id, status)] = ReclamationDailyRollup(
+                jour=day, categories_id=category_id, status=status
+            )
+            rollup._sketch = DurationSketch()
+        rollup.nombre += 1
+        if date_reponse:
+            duration = (date_reponse - date_created).total_seconds()
+            rollup.nombre_repondues += 1
+            rollup.duree_totale += duration
+            rollup._sketch.add(duration)
+
+    for rollup in groups.values():
+        rollup.sketch = rollup._sketch.to_json()
+
+    with transaction.atomic():
+        ReclamationDailyRollup.objects.filter(jour=day).delete()
+        ReclamationDailyRollup.objects.bulk_create(groups.values())
+    return len(groups)
+
+
+def refresh_rollups(full=False):
+    """
+    Met à jour les agrégats des jours dont une réclamation a été modifiée
+    depuis le dernier watermark (moins ROLLUP_SAFETY_LAG), ou tout recalcule
+    avec `full` dans une seule transaction (les lecteurs ne voient jamais la
+    table vide). Les suppressions de réclamations ne sont prises en compte que
+    par une actualisation complète.
+    Retourne le nombre de jours recalculés.
+    """
+    watermark, _ = RollupWatermark.objects.get_or_create(nom=WATERMARK_NAME)
+    if full:
+        with transaction.atomic():
+            ReclamationDailyRollup.objects.all().delete()
+            return _refresh(Reclamation.objects.order_by(), watermark)
+
+    changed = Reclamation.objects.order_by()
+    if watermark.valeur:
+        lag = timedelta(seconds=getattr(settings, 'ROLLUP_SAFETY_LAG', DEFAULT_SAFETY_LAG))
+        changed = changed.filter(date_updated__gte=watermark.valeur - lag)
+    return _refresh(changed, watermark)
+
+
+def _refresh(changed, watermark):
+    new_watermark = changed.aggregate(valeur=Max('date_updated'))['valeur']
+    if new_watermark is None:
+        return 0
+
+    days = (
+        changed.filter(date_updated__lte=new_watermark)
+        .annotate(jour=TruncDate('date_created'))
+        .values_list('jour', flat=True)
+        .distinct()
+    )
+    days = sorted(days)
+    for day in days:
+        rebuild_day(day)
+
+    # Le watermark ne recule jamais (relecture de la marge de sécurité)
+    if watermark.valeur is None or new_watermark > watermark.valeur:
+        watermark.valeur = new_watermark
+        watermark.save(update_fields=['valeur'])
+    return len(days)
+
+
+def sla_summary(rollups, quantiles=(0.5, 0.9, 0.95)):
+    """
+    Fusionne des agrégats journaliers par catégorie : volumes par statut,
+    délai moyen et percentiles de délai de réponse (en heures)
+    """
+    categories = {}
+    for rollup in rollups:
+        summary = categories.get(rollup.categories_id)
+        if summary is None:
+            summary = categories[rollup.categories_id] = {
+                'total': 0,
+                'par_statut': {},
+                'repondues': 0,
+                'duree_totale': 0.0,
+                'sketch': DurationSketch(),
+            }
+        summary['total'] += rollup.nombre
+        summary['par_statut'][rollup.status] = summary['par_statut'].get(rollup.status, 0) + rollup.nombre
+        summary['repondues'] += rollup.nombre_repondues
+        summary['duree_totale'] += rollup.duree_totale
+        summary['sketch'].merge(DurationSketch.from_json(rollup.sketch))
+
+    for summary in categories.values():
+        sketch = summary.pop('sketch')
+        duree_totale = summary.pop('duree_totale')
+        summary['delai_moyen_heures'] = (
+            round(duree_totale / summary['repondues'] / 3600, 2) if summary['repondues'] else None
+        )
+        for q in quantiles:
+            value = sketch.quantile(q)
+            summary[f'p{int(q * 100)}_heures'] = round(value / 3600, 2) if value is not None else None
+    return categories
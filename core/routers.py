@@ -0,0 +1,169 @@
+"""
+Routage lecture/écriture entre la base principale et une réplique en lecture.
+
+Seules les charges désignées (statistiques, analytique, exports) lisent la
+réplique, via le décorateur `use_replica` ou le contexte `replica_reads()`.
+Toute écriture épingle la suite de la requête sur la base principale, et un
+cookie prolonge cet épinglage sur les requêtes suivantes le temps que la
+réplique soit rafraîchie (lecture de ses propres écritures). Sans réplique
+configurée (ou si son fichier n'existe pas), tout est lu sur la principale.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from functools import wraps
+import os
+import sqlite3
+import time
+
+
+REPLICA = 'replica'
+PIN_COOKIE = 'senelec_primary'
+
+_replica_reads = ContextVar('senelec_replica_reads', default=False)
+_pinned = ContextVar('senelec_primary_pinned', default=False)
+# Écriture dans la requête en cours : seule raison de (re)poser le cookie
+_wrote = ContextVar('senelec_primary_wrote', default=False)
+
+
+def replica_available():
+    db = connections.settings.get(REPLICA)
+    if db is None:
+        return False
+    if db['ENGINE'] == 'django.db.backends.sqlite3':
+        return os.path.exists(db['NAME'])
+    return True
+
+
+def replica_alias():
+    """Base d'une charge désignée : la réplique, sauf si indisponible ou après une écriture"""
+    if not _pinned.get() and replica_available():
+        return REPLICA
+    return DEFAULT_DB_ALIAS
+
+
+def read_alias():
+    """Base à utiliser pour une lecture dans le contexte courant"""
+    return replica_alias() if _replica_reads.get() else DEFAULT_DB_ALIAS
+
+
+def pin_to_primary():
+    _pinned.set(True)
+    _wrote.set(True)
+
+
+def is_pinned():
+    return _pinned.get()
+
+
+@contextmanager
+def pin_scope(pinned=False):
+    """Portée de l'épinglage (une requête) : rien ne fuit vers la suivante"""
+    token = _pinned.set(pinned)
+    wrote_token = _wrote.set(False)
+    try:
+        yield
+    finally:
+        _wrote.reset(wrote_token)
+        _pinned.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Autorise la réplique pour les lectures du bloc"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(view):
+    """Décorateur de vue (synchrone ou asynchrone) à lectures seules tolérant un léger retard"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        # Lecture de ses propres écritures : plus de réplique jusqu'à la fin de la requête
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # La réplique est une copie de la principale
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplique reçoit le schéma par copie (refresh_replica)
+        return db != REPLICA
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Réinitialise l'épinglage à chaque requête (les threads et contextes sont
+    réutilisés d'une requête à l'autre) et le prolonge par cookie après une
+    écriture. Le cookie n'est posé que par une requête qui écrit : une requête
+    qui lit avec le cookie ne le prolonge pas, l'épinglage expire bien
+    REPLICA_PIN_SECONDS après la dernière écriture.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with pin_scope(PIN_COOKIE in request.COOKIES):
+            return self.process_response(self.get_response(request))
+
+    async def __acall__(self, request):
+        with pin_scope(PIN_COOKIE in request.COOKIES):
+            return self.process_response(await self.get_response(request))
+
+    def process_response(self, response):
+        if _wrote.get() and replica_available():
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 60),
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def refresh_replica(pages=-1):
+    """
+    Copie la base principale dans la réplique avec l'API de sauvegarde SQLite
+    (instantané cohérent, sans bloquer les écrivains en mode WAL).
+    Retourne la durée de la copie en secondes.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    start = time.perf_counter()
+    target = sqlite3.connect(connections.settings[REPLICA]['NAME'])
+    try:
+        source.connection.backup(target, pages=pages)
+    finally:
+        target.close()
+    return time.perf_counter() - start
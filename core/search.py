@@ -0,0 +1,171 @@
+"""
+Recherche plein texte sur les descriptions de réclamations (SQLite FTS5).
+
+La table virtuelle core_reclamation_fts garde sa propre copie des descriptions
+et l'identifiant UUID de la réclamation (colonne UNINDEXED), synchronisées par
+triggers. core_reclamation a une clé primaire UUID : son rowid implicite peut
+être renuméroté (VACUUM, copie de la table par une migration), il ne sert
+donc jamais de clé. Le rowid FTS vient
+de core_reclamation_fts_keys, dont la clé INTEGER PRIMARY KEY est stable ;
+elle permet aussi de retrouver la ligne FTS d'une réclamation modifiée ou
+supprimée sans parcourir l'index.
+
+Le tokenizer unicode61 avec remove_diacritics rend la recherche insensible aux
+accents et à la casse.
+"""
+from contextlib import contextmanager
+from django.db import connection
+import re
+
+from .models import Reclamation
+from .permissions import STAFF_ROLES
+
+
+FTS_TABLE = 'core_reclamation_fts'
+KEYS_TABLE = 'core_reclamation_fts_keys'
+
+CREATE_KEYS_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {KEYS_TABLE} (
+    id INTEGER PRIMARY KEY,
+    reclamation_id char(32) NOT NULL UNIQUE
+)
+"""
+
+CREATE_FTS_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    reclamation_id UNINDEXED,
+    description,
+    tokenize="unicode61 remove_diacritics 2",
+    prefix='2 3 4'
+)
+"""
+
+FTS_ROWID = f'(SELECT id FROM {KEYS_TABLE} WHERE reclamation_id = old.id)'
+
+CREATE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON core_reclamation BEGIN
+        INSERT INTO {KEYS_TABLE}(reclamation_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE}(rowid, reclamation_id, description)
+        VALUES (last_insert_rowid(), new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON core_reclamation BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = {FTS_ROWID};
+        DELETE FROM {KEYS_TABLE} WHERE reclamation_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description ON core_reclamation BEGIN
+        UPDATE {FTS_TABLE} SET description = new.description WHERE rowid = {FTS_ROWID};
+    END
+    """,
+]
+
+TRIGGER_NAMES = [f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au']
+
+REBUILD = [
+    f'DELETE FROM {FTS_TABLE}',
+    f'DELETE FROM {KEYS_TABLE}',
+    f'INSERT INTO {KEYS_TABLE}(reclamation_id) SELECT id FROM core_reclamation',
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, reclamation_id, description)
+    SELECT k.id, r.id, r.description FROM {KEYS_TABLE} k JOIN core_reclamation r ON r.id = k.reclamation_id
+    """,
+]
+
+
+def search_available(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def install_search_index(using=None, rebuild=False):
+    """
+    Crée la table FTS5 et ses triggers s'ils manquent. Les triggers disparaissent
+    quand Django reconstruit core_reclamation lors d'une migration : dans ce cas
+    l'index est reconstruit. Retourne True si une reconstruction a eu lieu.
+    """
+    conn = using or connection
+    if not search_available(conn):
+        return False
+
+    with conn.cursor() as cursor:
+        names = [FTS_TABLE, KEYS_TABLE, *TRIGGER_NAMES]
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name IN (%s)"
+            % ', '.join(['%s'] * len(names)),
+            names,
+        )
+        missing = set(names) - {row[0] for row in cursor.fetchall()}
+
+        cursor.execute(CREATE_KEYS_TABLE)
+        cursor.execute(CREATE_FTS_TABLE)
+        for sql in CREATE_TRIGGERS:
+            cursor.execute(sql)
+
+        if rebuild or missing:
+            for sql in REBUILD:
+                cursor.execute(sql)
+            return True
+    return False
+
+
+@contextmanager
+def deferred_search_index(using=None):
+    """
+    Suspend l'indexation ligne par ligne (trigger d'insertion) pendant un
+    chargement massif, puis reconstruit l'index en une seule passe
+    """
+    conn = using or connection
+    if not search_available(conn):
+        yield
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai')
+    try:
+        yield
+    finally:
+        install_search_index(conn, rebuild=True)
+
+
+def build_match_query(text):
+    """
+    Transforme une saisie libre en requête FTS5 sûre : chaque mot devient un
+    terme entre guillemets avec recherche par préfixe, tous les termes sont requis
+    """
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_reclamation_ids(user, text, limit=20, offset=0):
+    """
+    Retourne les identifiants des réclamations visibles par `user` qui
+    correspondent à `text`, triés par pertinence (bm25)
+    """
+    match = build_match_query(text)
+    if not match:
+        return []
+
+    params = [match]
+    scope = ''
+    if not (user.role in STAFF_ROLES or user.is_superuser):
+        column = 'technicien_id' if user.role == 'technicien' else 'user_id'
+        field = Reclamation._meta.get_field('technicien' if user.role == 'technicien' else 'user')
+        scope = f' AND r.{column} = %s'
+        params.append(field.get_db_prep_value(user.pk, connection))
+    params += [limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT f.reclamation_id FROM {FTS_TABLE} f
+            JOIN core_reclamation r ON r.id = f.reclamation_id
+            WHERE {FTS_TABLE} MATCH %s{scope}
+            ORDER BY f.rank
+            LIMIT %s OFFSET %s
+            """,
+            params,
+        )
+        id_field = Reclamation._meta.pk
+        return [id_field.to_python(row[0]) for row in cursor.fetchall()]
@@ -0,0 +1,62 @@
+from django.conf import settings
+import json
+
+from .images import variant_urls
+from .models import Categories
+
+
+# Champs lus via values() : les jointures vers user, categories et technicien
+# sont faites par la même requête, sans instancier de modèles
+RECLAMATION_LIST_FIELDS = (
+    'id', 'description', 'status', 'dateReponse', 'image', 'image_hash', 'date_created', 'date_updated',
+    'user_id', 'user__nom', 'user__prenom', 'user__email', 'user__telephone',
+    'categories_id', 'categories__nom',
+    'technicien_id', 'technicien__nom', 'technicien__prenom',
+)
+
+
+def media_url(name):
+    return f'{settings.MEDIA_URL}{name}' if name else None
+
+
+def serialize_reclamation_row(row):
+    """Convertit une ligne values() de réclamation en dict JSON"""
+    return {
+        'id': str(row['id']),
+        'description': row['description'],
+        'status': row['status'],
+        'dateReponse': row['dateReponse'].isoformat() if row['dateReponse'] else None,
+        'image': media_url(row['image']),
+        'images': variant_urls(row['image'], row['image_hash']),
+        'date_created': row['date_created'].isoformat(),
+        'date_updated': row['date_updated'].isoformat(),
+        'user': {
+            'id': str(row['user_id']),
+            'nom': row['user__nom'],
+            'prenom': row['user__prenom'],
+            'email': row['user__email'],
+            'telephone': row['user__telephone'],
+        },
+        'categorie': {
+            'id': str(row['categories_id']),
+            'nom': row['categories__nom'],
+        },
+        'technicien': {
+            'id': str(row['technicien_id']),
+            'nom': row['technicien__nom'],
+            'prenom': row['technicien__prenom'],
+        } if row['technicien_id'] else None,
+    }
+
+
+def serialize_active_categories():
+    """Corps JSON (bytes) de la liste des catégories actives"""
+    categories = Categories.objects.filter(is_active=True).order_by('nom').values_list('id', 'nom', 'description')
+    return json.dumps({
+        'success': True,
+        'message': 'Catégories actives',
+        'categories': [
+            {'id': str(pk), 'nom': nom, 'description': description}
+            for pk, nom, description in categories
+        ]
+    }).encode()
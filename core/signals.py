@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.db import connections, transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+from django.utils import timezone
+from datetime import timedelta
+
+from .assignment import engine as assignment_engine, sync_reclamation_load
+from .db import retry_on_busy
+from .events import publish_reclamation_change
+from .models import User, Categories, Reclamation, Incident
+from .outages import detector as outage_detector, observe_reclamation
+from .search import install_search_index
+from .stats import invalidate_dashboard_stats
+from .tokens import user_cache
+from .versioning import CATEGORIES, bump_version
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Categories)
+@receiver([post_save, post_delete], sender=Reclamation)
+def invalidate_dashboard_stats_on_change(sender, update_fields=None, **kwargs):
+    """Invalide les statistiques du dashboard quand les données changent"""
+    # Une simple mise à jour de last_login ne modifie aucun compteur
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_dashboard_stats()
+
+
+@receiver([post_save, post_delete], sender=Categories)
+def bump_categories_version(sender, **kwargs):
+    """Invalide le cache des catégories de tous les processus (dans la même transaction)"""
+    bump_version(CATEGORIES)
+
+
+@receiver(post_save, sender=Reclamation)
+def update_technicien_load_on_save(sender, instance, **kwargs):
+    """Garde les charges du moteur d'assignation cohérentes avec les statuts"""
+    sync_reclamation_load(instance)
+
+
+@receiver(post_save, sender=Reclamation)
+def publish_reclamation_event(sender, instance, created, **kwargs):
+    """Alimente le flux SSE des changements de statut et d'assignation"""
+    publish_reclamation_change(instance, created=created)
+
+
+@receiver(post_save, sender=Incident)
+def release_resolved_incident(sender, instance, **kwargs):
+    """Incident résolu (administration comprise) : plus aucun rattachement dans ce processus"""
+    if instance.status not in Incident.OPEN_STATUSES:
+        zone, incident_id = instance.zone, instance.pk
+        transaction.on_commit(lambda: outage_detector.close(zone, incident_id))
+
+
+@receiver(post_save, sender=Reclamation)
+def detect_outage(sender, instance, created, **kwargs):
+    """Soumet les nouvelles réclamations au détecteur de pannes de zone"""
+    if created:
+        observe_reclamation(instance)
+
+
+@receiver([post_save, post_delete], sender=Categories)
+def reset_outage_detector(sender, **kwargs):
+    """La catégorie surveillée a pu être créée, renommée ou supprimée"""
+    outage_detector.reset()
+
+
+@receiver(post_delete, sender=Reclamation)
+def update_technicien_load_on_delete(sender, instance, **kwargs):
+    sync_reclamation_load(instance, deleted=True)
+
+
+@receiver([post_save, post_delete], sender=User)
+def reset_assignment_engine(sender, update_fields=None, **kwargs):
+    """Un technicien ajouté, désactivé ou changé de rôle impose de recharger le moteur"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    assignment_engine.reset()
+
+
+@receiver([post_save, post_delete], sender=User)
+def evict_token_user(sender, instance, update_fields=None, **kwargs):
+    """Recharge l'utilisateur mis en cache par l'authentification par jeton (rôle, is_active...)"""
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    user_cache.evict(instance.pk.hex)
+
+
+# Remplace le receiver de django.contrib.auth (connecté avant, dans son ready())
+# pour ne réécrire last_login que s'il est plus ancien que l'intervalle configuré
+user_logged_in.disconnect(dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in, dispatch_uid='update_last_login')
+@retry_on_busy
+def update_last_login(sender, user, **kwargs):
+    """Met à jour last_login, au plus une fois par LAST_LOGIN_UPDATE_INTERVAL minutes"""
+    now = timezone.now()
+    interval = getattr(settings, 'LAST_LOGIN_UPDATE_INTERVAL', None)
+    if interval and user.last_login and now - user.last_login < timedelta(minutes=interval):
+        return
+    user.last_login = now
+    user.save(update_fields=['last_login'])
+
+
+@receiver(post_migrate)
+def ensure_search_index(sender, using='default', **kwargs):
+    """Réinstalle l'index plein texte si une migration a reconstruit core_reclamation"""
+    if sender.name == 'core':
+        install_search_index(connections[using])
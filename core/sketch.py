@@ -0,0 +1,66 @@
+"""
+Histogramme logarithmique fusionnable pour estimer des percentiles de durées
+(principe de DDSketch) : chaque valeur tombe dans le seau
+ceil(log(x) / log(gamma)), ce qui garantit une erreur relative bornée
+par `accuracy` quel que soit le volume. Deux sketches se fusionnent en
+additionnant leurs seaux, ce qui permet d'agréger des rollups journaliers.
+"""
+import math
+
+
+class DurationSketch:
+
+    def __init__(self, buckets=None, zeros=0, accuracy=0.01):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = dict(buckets or {})
+        self.zeros = zeros
+
+    @classmethod
+    def from_json(cls, data):
+        data = data or {}
+        return cls(
+            buckets={int(key): value for key, value in data.get('buckets', {}).items()},
+            zeros=data.get('zeros', 0),
+            accuracy=data.get('accuracy', 0.01),
+        )
+
+    def to_json(self):
+        accuracy = (self.gamma - 1) / (self.gamma + 1)
+        return {
+            'accuracy': round(accuracy, 6),
+            'zeros': self.zeros,
+            'buckets': {str(key): value for key, value in sorted(self.buckets.items())},
+        }
+
+    @property
+    def count(self):
+        return self.zeros + sum(self.buckets.values())
+
+    def add(self, value):
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + 1
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        for key, value in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + value
+        return self
+
+    def quantile(self, q):
+        """Valeur estimée du quantile q (0 <= q <= 1), None si vide"""
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        if rank < self.zeros:
+            return 0.0
+        seen = self.zeros
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
@@ -0,0 +1,176 @@
+"""
+Statistiques générales du dashboard et leurs validateurs HTTP.
+
+La version des statistiques (jeton, date) vit uniquement dans le cache, avec
+la même durée de vie que les statistiques : les signaux de User, Categories
+et Reclamation la suppriment sans écrire en base (pas de ligne partagée mise
+à jour à chaque enregistrement). Avec un cache par processus (LocMem),
+l'invalidation reste locale : un autre processus sert au plus
+DASHBOARD_STATS_CACHE_TIMEOUT secondes une version périmée, puis en crée
+une nouvelle. Avec un cache partagé (Redis, Memcached), elle est immédiate.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .ids import uuid7
+from .models import User, Categories, Reclamation
+
+
+DASHBOARD_STATS_CACHE_KEY = 'core:dashboard_stats'
+DASHBOARD_STATS_VERSION_KEY = 'core:dashboard_stats_version'
+
+
+def dashboard_aggregates():
+    """
+    Un seul agrégat par table (répartition par rôle et par statut via
+    agrégation conditionnelle)
+    """
+    return [
+        (User.objects, {
+            'total_users': Count('*'),
+            'total_clients': Count('role', filter=Q(role='client')),
+            'total_techniciens': Count('role', filter=Q(role='technicien')),
+        }),
+        (Categories.objects, {
+            'total_categories': Count('*'),
+        }),
+        (Reclamation.objects, {
+            'total_reclamations': Count('*'),
+            'reclamations_en_attente': Count('status', filter=Q(status='en_attente')),
+            'reclamations_en_cours': Count('status', filter=Q(status='en_cours')),
+            'reclamations_resolues': Count('status', filter=Q(status='resolu')),
+        }),
+    ]
+
+
+def compute_dashboard_stats():
+    """Calcule les statistiques générales"""
+    stats = {}
+    for manager, aggregates in dashboard_aggregates():
+        stats.update(manager.aggregate(**aggregates))
+    return stats
+
+
+async def acompute_dashboard_stats():
+    """Version asynchrone de compute_dashboard_stats (ORM asynchrone)"""
+    stats = {}
+    for manager, aggregates in dashboard_aggregates():
+        stats.update(await manager.aaggregate(**aggregates))
+    return stats
+
+
+def stats_timeout():
+    return getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 30)
+
+
+def new_stats_version():
+    # Jeton unique : un cache vidé (redémarrage) ne revalide jamais un ancien ETag
+    return uuid7().hex, timezone.now()
+
+
+def get_stats_version():
+    """Retourne (jeton, date) de la version courante, créée au besoin"""
+    version = cache.get(DASHBOARD_STATS_VERSION_KEY)
+    if version is None:
+        version = new_stats_version()
+        # add() : deux requêtes simultanées retiennent la même version
+        if not cache.add(DASHBOARD_STATS_VERSION_KEY, version, stats_timeout()):
+            version = cache.get(DASHBOARD_STATS_VERSION_KEY) or version
+    return version
+
+
+async def aget_stats_version():
+    """Version asynchrone de get_stats_version"""
+    version = await cache.aget(DASHBOARD_STATS_VERSION_KEY)
+    if version is None:
+        version = new_stats_version()
+        if not await cache.aadd(DASHBOARD_STATS_VERSION_KEY, version, stats_timeout()):
+            version = await cache.aget(DASHBOARD_STATS_VERSION_KEY) or version
+    return version
+
+
+def request_stats_version(request):
+    """get_stats_version mémorisé sur la requête : validateurs et vue partagent la même lecture"""
+    if '_dashboard_stats_version' not in request.__dict__:
+        request._dashboard_stats_version = get_stats_version()
+    return request._dashboard_stats_version
+
+
+async def arequest_stats_version(request):
+    """Version asynchrone de request_stats_version"""
+    if '_dashboard_stats_version' not in request.__dict__:
+        request._dashboard_stats_version = await aget_stats_version()
+    return request._dashboard_stats_version
+
+
+def stats_cache_key(version):
+    # La clé inclut la version : une entrée calculée avant une modification
+    # n'est jamais servie après elle, même si elle a été écrite en retard
+    return f'{DASHBOARD_STATS_CACHE_KEY}:{version}'
+
+
+def get_dashboard_stats(fresh=False, version=None):
+    """
+    Retourne les statistiques du dashboard depuis le cache, ou les recalcule
+    si elles ont expiré, ont été invalidées ou si `fresh` est demandé.
+    `version` : jeton de version déjà lu par l'appelant
+    """
+    if version is None:
+        version = get_stats_version()[0]
+    key = stats_cache_key(version)
+    if not fresh:
+        stats = cache.get(key)
+        if stats is not None:
+            return stats
+
+    stats = compute_dashboard_stats()
+    cache.set(key, stats, stats_timeout())
+    return stats
+
+
+async def aget_dashboard_stats(fresh=False, version=None):
+    """Version asynchrone de get_dashboard_stats"""
+    if version is None:
+        version = (await aget_stats_version())[0]
+    key = stats_cache_key(version)
+    if not fresh:
+        stats = await cache.aget(key)
+        if stats is not None:
+            return stats
+
+    stats = await acompute_dashboard_stats()
+    await cache.aset(key, stats, stats_timeout())
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """
+    Invalide les statistiques en cache (et les ETag), sans écriture en base.
+    La version est aussi supprimée à la validation de la transaction : une
+    lecture faite entre-temps a pu créer une version sur les anciennes données
+    """
+    cache.delete(DASHBOARD_STATS_VERSION_KEY)
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_STATS_VERSION_KEY))
+
+
+def dashboard_stats_validators(request):
+    """
+    Validateurs HTTP des statistiques, dérivés de la version en cache
+    (aucune requête SQL). ?fresh=1 désactive la validation.
+    """
+    if request.GET.get('fresh') in ('1', 'true'):
+        return None, None
+    version, date_updated = request_stats_version(request)
+    # ETag faible : le contenu est sémantiquement celui de cette version
+    return f'W/"dashboard-stats-{version}"', date_updated
+
+
+async def adashboard_stats_validators(request):
+    """Version asynchrone de dashboard_stats_validators"""
+    if request.GET.get('fresh') in ('1', 'true'):
+        return None, None
+    version, date_updated = await arequest_stats_version(request)
+    return f'W/"dashboard-stats-{version}"', date_updated
@@ -0,0 +1,277 @@
+"""
+Générateur de données synthétiques aux volumes de production (clients,
+techniciens, réclamations), pour create_default_data --scale et les benchmarks.
+
+- insertion par lots dans une seule transaction : bulk_create pour les
+  utilisateurs, executemany de tuples pour les réclamations
+- un seul hachage de mot de passe, partagé par tous les utilisateurs générés
+- graine fixe : deux exécutions avec la même graine et la même date de
+  référence (`now`) produisent les mêmes lignes (identifiants compris)
+- identifiants UUID version 7 horodatés à la date de création de chaque ligne,
+  comme ceux de l'application (core/ids.py)
+- répartition réaliste des statuts, des catégories et des dates de création
+  (avec délais de réponse pour les réclamations traitées)
+- index secondaires des réclamations et trigger de l'index plein texte
+  suspendus pendant l'insertion, reconstruits en une passe à la fin
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from operator import itemgetter
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .ids import uuid7_from_parts
+from .models import User, Categories, Reclamation
+from .outages import normalize_zone
+from .search import deferred_search_index
+
+
+DESCRIPTIONS = [
+    'Coupure de courant depuis ce matin dans tout le quartier',
+    'Le compteur Woyofal affiche une erreur et ne prend plus les recharges',
+    'Facture anormalement élevée pour le mois dernier',
+    'Poteau électrique endommagé après l\'orage, câbles au sol',
+    'Baisse de tension répétée, les appareils électroménagers s\'éteignent',
+    'Demande de raccordement pour une nouvelle maison toujours en attente',
+    'Délestage prolongé sans information préalable',
+    'Étincelles au niveau du branchement extérieur',
+]
+
+PRENOMS = [
+    'Awa', 'Moussa', 'Fatou', 'Ibrahima', 'Aminata', 'Mamadou', 'Khady', 'Cheikh',
+    'Mariama', 'Ousmane', 'Ndeye', 'Abdoulaye', 'Aissatou', 'Modou', 'Coumba', 'Lamine',
+]
+
+NOMS = ['Diop', 'Ndiaye', 'Fall', 'Sow', 'Ba', 'Sarr', 'Gueye', 'Diallo', 'Faye', 'Mbaye', 'Cisse', 'Kane']
+
+QUARTIERS = [
+    'Médina, Dakar', 'Parcelles Assainies, Dakar', 'Pikine', 'Guédiawaye', 'Rufisque',
+    'Grand Yoff, Dakar', 'HLM, Dakar', 'Thiès', 'Mbour', 'Saint-Louis', 'Kaolack', 'Ziguinchor',
+]
+ZONES = {quartier: normalize_zone(quartier) for quartier in QUARTIERS}
+
+# Part de chaque statut dans le stock de réclamations
+STATUS_WEIGHTS = {
+    'en_attente': 12,
+    'en_cours': 10,
+    'resolu': 58,
+    'ferme': 15,
+    'annule': 5,
+}
+
+# Délai moyen de réponse (heures) pour les réclamations résolues ou fermées
+MEAN_RESPONSE_HOURS = 36
+
+
+def precomputed_password(password):
+    """Un seul hachage PBKDF2, réutilisé par tous les utilisateurs générés"""
+    return make_password(password)
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def seeded_uuid(rng, moment):
+    """
+    UUID version 7 horodaté à `moment` (datetime naïf UTC), partie aléatoire
+    tirée de la graine (reproductible, sans appel à os.urandom)
+    """
+    timestamp_ms = (moment - EPOCH) // timedelta(milliseconds=1)
+    return uuid7_from_parts(timestamp_ms, rng.getrandbits(12), rng.getrandbits(62))
+
+
+@contextmanager
+def deferred_indexes(model):
+    """
+    Supprime les index secondaires du modèle pendant le chargement et les
+    recrée à la fin : un tri unique par index plutôt qu'une insertion
+    aléatoire dans chaque B-tree à chaque ligne. Seulement si le DDL est
+    transactionnel, pour qu'un échec restaure les index avec le rollback
+    """
+    if not connection.features.can_rollback_ddl:
+        yield
+        return
+    # Éditeur utilisé pour générer le SQL seulement : celui de SQLite refuse
+    # d'ouvrir un contexte à l'intérieur d'une transaction
+    editor = connection.schema_editor()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for index in model._meta.indexes:
+            cursor.execute(editor.sql_delete_index % {
+                'table': quote(model._meta.db_table), 'name': quote(index.name),
+            })
+    yield
+    with connection.cursor() as cursor:
+        for index in model._meta.indexes:
+            cursor.execute(str(index.create_sql(model, editor)))
+
+
+def insert_rows(model, columns, rows):
+    """
+    INSERT par executemany de tuples déjà convertis pour la base, sans
+    instancier de modèles : pour des millions de lignes, la compilation SQL de
+    bulk_create (~100 µs par ligne) coûte bien plus que l'écriture elle-même.
+    Les champs absents de `columns` reçoivent leur valeur par défaut
+    """
+    fields = [model._meta.get_field(name) for name in columns]
+    given = {field.attname for field in fields}
+    missing = [field for field in model._meta.concrete_fields if field.attname not in given]
+    defaults = tuple(field.get_db_prep_save(field.get_default(), connection) for field in missing)
+
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields + missing),
+        ', '.join(['%s'] * (len(fields) + len(missing))),
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [row + defaults for row in rows])
+
+
+def db_converters():
+    """Conversions vers la base choisies une fois (UUID natif ou hexadécimal, dates)"""
+    db_uuid = (lambda value: value) if connection.features.has_native_uuid_field else (lambda value: value.hex)
+    return db_uuid, connection.ops.adapt_datetimefield_value
+
+
+def chunks(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield start, min(start + chunk_size, total)
+
+
+USER_COLUMNS = [
+    'id', 'username', 'email', 'nom', 'prenom', 'telephone', 'adresse', 'zone', 'numero_compteur',
+    'role', 'password', 'is_first_login', 'date_joined', 'date_created', 'date_updated',
+]
+
+
+def generate_users(rng, role, count, password_hash, now, chunk_size, prefix):
+    """Insère `count` utilisateurs du rôle donné ; retourne leurs identifiants"""
+    db_uuid, db_datetime = db_converters()
+    ids = []
+    for start, stop in chunks(count, chunk_size):
+        rows = []
+        for i in range(start, stop):
+            joined = now - timedelta(days=rng.uniform(0, 3 * 365))
+            pk = seeded_uuid(rng, joined)
+            joined = db_datetime(joined)
+            adresse = rng.choice(QUARTIERS)
+            ids.append(pk)
+            rows.append((
+                db_uuid(pk),
+                f'synthetic-{role}-{i}',
+                f'{role}-{i}@synthetic.senelec.sn',
+                rng.choice(NOMS),
+                rng.choice(PRENOMS),
+                f'{prefix}{i:08d}',
+                adresse,
+                ZONES[adresse],
+                f'CPT-{i:08d}' if role == 'client' else None,
+                role,
+                password_hash,
+                False,
+                joined,
+                joined,
+                joined,
+            ))
+        insert_rows(User, USER_COLUMNS, rows)
+    return ids
+
+
+RECLAMATION_COLUMNS = [
+    'id', 'description', 'status', 'dateReponse', 'user', 'categories', 'technicien',
+    'date_created', 'date_updated',
+]
+
+
+def generate_reclamations(rng, count, client_ids, tech_ids, category_ids, now, days, chunk_size, progress=None):
+    db_uuid, db_datetime = db_converters()
+    client_ids = [db_uuid(pk) for pk in client_ids]
+    tech_ids = [db_uuid(pk) for pk in tech_ids]
+    category_ids = [db_uuid(pk) for pk in category_ids]
+
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    # Les premières catégories (pannes, facturation) concentrent les réclamations
+    category_weights = [1 / (rank + 1) for rank in range(len(category_ids))]
+    span = timedelta(days=days).total_seconds()
+
+    for start, stop in chunks(count, chunk_size):
+        size = stop - start
+        batch_statuses = rng.choices(statuses, weights=status_weights, k=size)
+        batch_categories = rng.choices(category_ids, weights=category_weights, k=size)
+        rows = []
+        for i, status, category_id in zip(range(start, stop), batch_statuses, batch_categories):
+            # Plus de réclamations récentes qu'anciennes
+            created = now - timedelta(seconds=span * rng.random() ** 1.5)
+            date_reponse = None
+            updated = created
+            if status in ('resolu', 'ferme'):
+                date_reponse = min(now, created + timedelta(hours=rng.expovariate(1 / MEAN_RESPONSE_HOURS)))
+                updated = date_reponse
+            technicien_id = None if status == 'en_attente' or not tech_ids else rng.choice(tech_ids)
+            rows.append((
+                db_uuid(seeded_uuid(rng, created)),
+                f'{rng.choice(DESCRIPTIONS)} (réf. {i})',
+                status,
+                db_datetime(date_reponse),
+                rng.choice(client_ids),
+                category_id,
+                technicien_id,
+                db_datetime(created),
+                db_datetime(updated),
+            ))
+        # Clés triées (donc par date de création) : insertion séquentielle dans le B-tree de la clé primaire
+        rows.sort(key=itemgetter(0))
+        insert_rows(Reclamation, RECLAMATION_COLUMNS, rows)
+        if progress:
+            progress(stop, count)
+
+
+def generate_dataset(
+    clients=1000,
+    techniciens=50,
+    reclamations=10000,
+    categories=None,
+    seed=42,
+    password='benchmark',
+    days=365,
+    chunk_size=20000,
+    unassigned=False,
+    progress=None,
+    now=None,
+):
+    """
+    Insère clients, techniciens et réclamations synthétiques. Sans catégories
+    fournies, six catégories génériques sont créées. `unassigned` laisse toutes
+    les réclamations sans technicien. `now` (date de référence, maintenant par
+    défaut) fixe les dates et donc les identifiants. Retourne les identifiants
+    (clients, techniciens, catégories)
+    """
+    rng = random.Random(seed)
+    now = (now or timezone.now()).replace(microsecond=0)
+    if timezone.is_aware(now):
+        # Dates naïves en UTC, comme l'ORM les écrit avec USE_TZ : pas de conversion par ligne
+        now = timezone.make_naive(now, dt_timezone.utc)
+    password_hash = precomputed_password(password)
+
+    with transaction.atomic(), deferred_indexes(Reclamation), deferred_search_index():
+        if categories is None:
+            categories = Categories.objects.bulk_create([
+                Categories(id=seeded_uuid(rng, now), nom=f'Catégorie {i}') for i in range(6)
+            ])
+        category_ids = [category.pk for category in categories]
+        client_ids = generate_users(rng, 'client', clients, password_hash, now, chunk_size, '2217')
+        tech_ids = generate_users(rng, 'technicien', techniciens, password_hash, now, chunk_size, '2218')
+
+        generate_reclamations(
+            rng, reclamations, client_ids,
+            tech_ids=[] if unassigned else tech_ids,
+            category_ids=category_ids,
+            now=now, days=days, chunk_size=chunk_size, progress=progress,
+        )
+
+    return client_ids, tech_ids, category_ids
@@ -1,3 +1,2365 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core import mail
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.models import F
+from django.test import AsyncClient, AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from smtplib import SMTPException
+import asyncio
+import io
+import itertools
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from . import async_views
+from .assignment import AssignmentEngine, engine as assignment_engine
+from .images import DEFAULT_VARIANTS, file_hash, generate_variants, variant_name
+from .bench import WORKLOAD_MIX, run_workload, seed_dataset
+from .db import retry_on_busy
+from .events import EventBroker, audience_filter, broker as event_broker, event_stream
+from .filters import filter_reclamations
+from .ids import uuid7, uuid7_timestamp_ms
+from .metrics import registry as metrics_registry
+from .models import User, Categories, Reclamation, Incident, EmailOutbox, ReclamationDailyRollup, RollupWatermark
+from .onboarding import BulkUserImporter
+from .outbox import claim_pending_emails, deliver_pending_emails, due_emails, queue_email
+from .outages import IncidentConflict, detector as outage_detector, handle_incident, normalize_zone
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, paginate_by_cursor
+from .passwords import PasswordHasherPool
+from .rollups import WATERMARK_NAME, refresh_rollups
+from .profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfilingMiddleware
+from .permissions import visible_reclamations
+from .search import build_match_query, search_reclamation_ids
+from .routers import PIN_COOKIE, REPLICA, is_pinned, pin_scope, read_alias, replica_reads
+from .serializers import RECLAMATION_LIST_FIELDS
+from .sketch import DurationSketch
+from .stats import compute_dashboard_stats, get_dashboard_stats, get_stats_version
+from .synthetic import STATUS_WEIGHTS, generate_dataset
+from .throttle import LocalMemoryBackend, SQLiteBackend, get_login_throttle, retry_after_header
+from .tokens import user_cache
+
+
+# "SCAN <table>" sans "USING ... INDEX" signifie un parcours complet de la table
+# (SQLite < 3.36 écrit "SCAN TABLE <table>")
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(core_\w+)$')
+
+
+class DashboardStatsTests(TestCase):
+    """Statistiques du dashboard : un agrégat par table, cache invalidé par les signaux"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.category = Categories.objects.create(nom='Coupure')
+        self.client_user = User.objects.create(
+            username='client-stats', email='client-stats@senelec.sn', telephone='221780000001',
+            nom='Diallo', prenom='Binta', role='client',
+        )
+        User.objects.create(
+            username='tech-stats', email='tech-stats@senelec.sn', telephone='221780000002',
+            nom='Sarr', prenom='Ibou', role='technicien',
+        )
+        for status in ('en_attente', 'en_attente', 'en_cours', 'resolu'):
+            Reclamation.objects.create(
+                description='Coupure', user=self.client_user, categories=self.category, status=status,
+            )
+
+    def stats(self, **kwargs):
+        response = self.client.get('/api/dashboard/statistiques-generales/', **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['statistics']
+
+    def test_one_aggregate_per_table(self):
+        with self.assertNumQueries(3):
+            stats = compute_dashboard_stats()
+        self.assertEqual(stats, {
+            'total_users': 2, 'total_clients': 1, 'total_techniciens': 1,
+            'total_categories': 1,
+            'total_reclamations': 4, 'reclamations_en_attente': 2,
+            'reclamations_en_cours': 1, 'reclamations_resolues': 1,
+        })
+
+    def test_cached_until_data_changes(self):
+        self.assertEqual(self.stats()['total_reclamations'], 4)
+        # Servies depuis le cache : aucun agrégat
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.stats()['total_reclamations'], 4)
+        self.assertFalse([query for query in ctx.captured_queries if 'COUNT(' in query['sql']])
+
+        Reclamation.objects.create(description='Coupure', user=self.client_user, categories=self.category)
+        self.assertEqual(self.stats()['total_reclamations'], 5)
+
+        reclamation = Reclamation.objects.filter(status='en_attente').first()
+        reclamation.status = 'resolu'
+        reclamation.save()
+        stats = self.stats()
+        self.assertEqual((stats['reclamations_en_attente'], stats['reclamations_resolues']), (2, 2))
+
+        reclamation.delete()
+        self.assertEqual(self.stats()['total_reclamations'], 4)
+
+    def test_last_login_update_keeps_cache(self):
+        stats = get_dashboard_stats()
+        self.client_user.last_login = timezone.now()
+        self.client_user.save(update_fields=['last_login'])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(get_dashboard_stats(), stats)
+        self.assertFalse([query for query in ctx.captured_queries if 'COUNT(' in query['sql']])
+
+    def test_version_lives_in_cache_only(self):
+        etag = self.client.get('/api/dashboard/statistiques-generales/')['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            Reclamation.objects.create(description='Coupure', user=self.client_user, categories=self.category)
+            self.client_user.nom = 'Ba'
+            self.client_user.save()
+        self.assertFalse([query for query in ctx.captured_queries if 'core_data_version' in query['sql']])
+
+        response = self.client.get('/api/dashboard/statistiques-generales/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['statistics']['total_reclamations'], 5)
+
+    def test_version_renewed_at_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reclamation.objects.create(description='Coupure', user=self.client_user, categories=self.category)
+            # Lecture concurrente avant la validation : version sur les anciennes données
+            before_commit = get_stats_version()
+        self.assertNotEqual(get_stats_version(), before_commit)
+
+    def test_version_expires_with_stats(self):
+        version = get_stats_version()
+        self.assertEqual(get_stats_version(), version)
+        # Durée de vie écoulée (ou cache vidé) : nouvelle version, jamais l'ancienne
+        cache.clear()
+        self.assertNotEqual(get_stats_version()[0], version[0])
+
+    def test_fresh_bypasses_cache(self):
+        self.stats()
+        with CaptureQueriesContext(connection) as ctx:
+            self.stats(data={'fresh': '1'})
+        self.assertEqual(len([query for query in ctx.captured_queries if 'COUNT(' in query['sql']]), 3)
+
+
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=3, EMAIL_OUTBOX_RETRY_DELAY=60, EMAIL_OUTBOX_MAX_RETRY_DELAY=3600)
+class EmailOutboxTests(TestCase):
+    """Outbox des emails envoyée par process_email_outbox (backend locmem des tests)"""
+
+    def queue(self, count=1):
+        return [queue_email(f'client{i}@senelec.sn', 'Identifiants', 'Bonjour') for i in range(count)]
+
+    def failing_send(self):
+        return mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=SMTPException('serveur indisponible'),
+        )
+
+    def test_credentials_email_queued_then_delivered(self):
+        response = self.client.post('/api/add-user/', {
+            'nom': 'Diop', 'prenom': 'Awa', 'email': 'awa@senelec.sn', 'telephone': '221790000001', 'role': 'client',
+        }, content_type='application/json')
+        self.assertTrue(response.json()['email_queued'])
+        self.assertEqual(mail.outbox, [])
+
+        call_command('process_email_outbox', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['awa@senelec.sn'])
+        self.assertIn(response.json()['user']['temp_password'], mail.outbox[0].body)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.tentatives), ('envoye', 1))
+        self.assertIsNotNone(email.date_envoi)
+
+        # Déjà envoyé : une nouvelle passe n'envoie rien
+        self.assertEqual(deliver_pending_emails()['envoyes'], 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_retry_with_backoff_then_abandon(self):
+        self.queue()
+        with self.failing_send():
+            self.assertEqual(deliver_pending_emails()['reprogrammes'], 1)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.status, email.tentatives), ('en_attente', 1))
+        self.assertEqual(email.derniere_erreur, 'serveur indisponible')
+        self.assertAlmostEqual((email.prochaine_tentative - timezone.now()).total_seconds(), 60, delta=5)
+
+        # Pas encore dû
+        self.assertEqual(deliver_pending_emails(), {'envoyes': 0, 'reprogrammes': 0, 'abandonnes': 0})
+
+        EmailOutbox.objects.update(prochaine_tentative=timezone.now())
+        with self.failing_send():
+            deliver_pending_emails()
+        email.refresh_from_db()
+        self.assertEqual(email.tentatives, 2)
+        # Délai doublé
+        self.assertAlmostEqual((email.prochaine_tentative - timezone.now()).total_seconds(), 120, delta=5)
+
+        EmailOutbox.objects.update(prochaine_tentative=timezone.now())
+        with self.failing_send():
+            self.assertEqual(deliver_pending_emails()['abandonnes'], 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentatives), ('abandonne', 3))
+        self.assertEqual(deliver_pending_emails()['envoyes'], 0)
+        self.assertEqual(mail.outbox, [])
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        self.queue(3)
+        # Un autre worker a réservé deux emails et les envoie encore
+        other = claim_pending_emails(batch_size=2)
+        self.assertEqual({email.status for email in EmailOutbox.objects.filter(pk__in=[e.pk for e in other])}, {'en_cours'})
+
+        self.assertEqual(deliver_pending_emails()['envoyes'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(EmailOutbox.objects.filter(status='en_cours').count(), 2)
+
+        # Réservation expirée (worker arrêté) : les emails sont repris
+        EmailOutbox.objects.filter(status='en_cours').update(prochaine_tentative=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver_pending_emails()['envoyes'], 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_concurrent_claims_do_not_overlap(self):
+        self.queue(2)
+        read, concurrent = [], []
+
+        def read_then_race(now, batch_size):
+            rows = due_emails(now, batch_size)
+            read.append(len(rows))
+            # Un autre worker réserve les mêmes lignes entre la lecture et l'UPDATE
+            if len(read) == 1:
+                concurrent.extend(claim_pending_emails())
+            return rows
+
+        with mock.patch('core.outbox.due_emails', side_effect=read_then_race):
+            self.assertEqual(claim_pending_emails(), [])
+        # Les deux workers ont lu les deux lignes ; seul le second les a réservées
+        self.assertEqual(read, [2, 2])
+        self.assertEqual(len(concurrent), 2)
+
+
+class BulkImportTests(TestCase):
+    """Import en masse d'utilisateurs (/api/add-users/bulk/)"""
+
+    URL = '/api/add-users/bulk/'
+    CSV = (
+        'nom,prenom,email,telephone,role,adresse\n'
+        'Diop,Awa,awa@senelec.sn,221791000001,client,"Villa 3, Médina, Dakar"\n'
+        'Fall,Modou,modou@senelec.sn,221791000002,technicien,\n'
+        'Sow,Awa,awa@senelec.sn,221791000003,client,\n'
+        'Ba,Ndeye,pas-un-email,221791000004,client,\n'
+        'Kane,Ali,ali@senelec.sn,221791000005,pirate,\n'
+    )
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username='admin-import', email='admin-import@senelec.sn', telephone='221791000099',
+            nom='Ndiaye', prenom='Admin', role='admin',
+        )
+
+    def post(self, body, content_type='text/csv', user=None):
+        if user:
+            self.client.force_login(user)
+        return self.client.post(self.URL, body, content_type=content_type)
+
+    def test_staff_only(self):
+        self.assertEqual(self.post(self.CSV).status_code, 401)
+        client_user = User.objects.create(
+            username='client-import', email='client-import@senelec.sn', telephone='221791000098',
+            nom='Gueye', prenom='Client', role='client',
+        )
+        response = self.post('nom,prenom,email,telephone,role\nX,Y,x@senelec.sn,221791000097,admin\n', user=client_user)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(User.objects.filter(email='x@senelec.sn').exists())
+
+    def test_csv_report(self):
+        response = self.post(self.CSV, user=self.admin)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertFalse(body['success'])
+        report = body['report']
+        self.assertEqual((report['total'], report['crees'], report['erreurs']), (5, 2, 3))
+        lines = {line['ligne']: line for line in report['lignes']}
+        self.assertEqual([lines[i]['status'] for i in range(1, 6)], ['cree', 'cree', 'erreur', 'erreur', 'erreur'])
+        self.assertEqual(lines[3]['erreurs'], ['Email en double dans le fichier'])
+        self.assertEqual(lines[4]['erreurs'], ['Email invalide'])
+        self.assertEqual(lines[5]['erreurs'], ['Rôle invalide: pirate'])
+
+        awa = User.objects.get(email='awa@senelec.sn')
+        self.assertEqual((str(awa.pk), awa.zone), (lines[1]['id'], 'medina-dakar'))
+        self.assertTrue(awa.check_password(awa.temp_password))
+        self.assertEqual(EmailOutbox.objects.filter(user__email__in=['awa@senelec.sn', 'modou@senelec.sn']).count(), 2)
+
+    def test_jsonl_and_existing_users(self):
+        body = '\n'.join([
+            json.dumps({'nom': 'Diop', 'prenom': 'Awa', 'email': 'awa@senelec.sn',
+                        'telephone': '221791000001', 'role': 'client'}),
+            'pas du json',
+            json.dumps({'nom': 'Ndiaye', 'prenom': 'Bis', 'email': 'autre@senelec.sn',
+                        'telephone': '221791000099', 'role': 'client'}),
+            '',
+        ])
+        report = self.post(body, content_type='application/x-ndjson', user=self.admin).json()['report']
+        self.assertEqual((report['crees'], report['erreurs']), (1, 2))
+        self.assertEqual(report['lignes'][1]['erreurs'], ['Ligne illisible'])
+        self.assertEqual(report['lignes'][2]['erreurs'], ['Un utilisateur avec ce téléphone existe déjà'])
+
+        # Même fichier rejoué : tout est en conflit avec la base
+        report = self.post(body, content_type='application/x-ndjson').json()['report']
+        self.assertEqual(report['lignes'][0]['erreurs'], [
+            'Un utilisateur avec cet email existe déjà', 'Un utilisateur avec ce téléphone existe déjà',
+        ])
+        self.assertEqual(report['crees'], 0)
+
+    def test_unsupported_format(self):
+        response = self.client.post(self.URL + '?format=xml', '<users/>', content_type='text/xml')
+        self.assertEqual(response.status_code, 401)
+        self.client.force_login(self.admin)
+        response = self.client.post(self.URL + '?format=xml', '<users/>', content_type='text/xml')
+        self.assertEqual(response.status_code, 400)
+
+    ROWS = [
+        {'nom': 'Diop', 'prenom': f'Awa{i}', 'email': f'awa{i}@senelec.sn',
+         'telephone': f'22179200000{i}', 'role': 'client'}
+        for i in range(3)
+    ]
+
+    def test_concurrent_conflict_rejects_only_colliding_row(self):
+        importer = BulkUserImporter(chunk_size=3, workers=1)
+        real_hash_many = PasswordHasherPool.hash_many
+
+        def racing_hash_many(pool, passwords):
+            # Créé par une autre requête après la recherche de conflits
+            User.objects.get_or_create(
+                email='awa1@senelec.sn', defaults={'username': 'concurrent', 'telephone': '221792999999'},
+            )
+            return real_hash_many(pool, passwords)
+
+        with mock.patch.object(PasswordHasherPool, 'hash_many', racing_hash_many):
+            report = importer.run(iter(self.ROWS))
+        self.assertEqual((report['total'], report['crees'], report['erreurs']), (3, 2, 1))
+        self.assertEqual([line['status'] for line in report['lignes']], ['cree', 'erreur', 'cree'])
+        self.assertEqual(report['lignes'][1]['erreurs'], ['Un utilisateur avec cet email existe déjà'])
+        self.assertEqual(
+            set(EmailOutbox.objects.values_list('destinataire', flat=True)), {'awa0@senelec.sn', 'awa2@senelec.sn'},
+        )
+
+    def test_unexplained_integrity_error_falls_back_to_row_savepoints(self):
+        importer = BulkUserImporter(chunk_size=3, workers=1)
+        real_bulk_create = User.objects.bulk_create
+
+        def failing_bulk_create(users, *args, **kwargs):
+            # Le lot échoue sans conflit visible ; awa1 échoue aussi seule
+            if len(users) > 1 or users[0].email == 'awa1@senelec.sn':
+                raise IntegrityError('UNIQUE constraint failed: core_user.email')
+            return real_bulk_create(users, *args, **kwargs)
+
+        with mock.patch.object(User.objects, 'bulk_create', side_effect=failing_bulk_create):
+            report = importer.run(iter(self.ROWS))
+        self.assertEqual([line['status'] for line in report['lignes']], ['cree', 'erreur', 'cree'])
+        self.assertTrue(report['lignes'][1]['erreurs'][0].startswith('Conflit'))
+        self.assertEqual(
+            set(User.objects.filter(email__startswith='awa').values_list('email', flat=True)),
+            {'awa0@senelec.sn', 'awa2@senelec.sn'},
+        )
+        self.assertFalse(EmailOutbox.objects.filter(destinataire='awa1@senelec.sn').exists())
+
+
+@override_settings(
+    LOGIN_THROTTLE_ENABLED=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    LAST_LOGIN_UPDATE_INTERVAL=15,
+)
+class EmailOrPhoneLoginTests(TestCase):
+    """Connexion par email ou téléphone : une requête pour charger et vérifier l'utilisateur"""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username='login@senelec.sn', email='login@senelec.sn', telephone='221793000001',
+            nom='Faye', prenom='Coumba', role='technicien', password=make_password('secret'),
+        )
+
+    def login(self, email_or_phone, password='secret'):
+        return self.client.post(
+            '/api/login/', {'email_or_phone': email_or_phone, 'password': password}, content_type='application/json',
+        )
+
+    def test_backend_single_query(self):
+        for identifier in ('login@senelec.sn', '221793000001'):
+            with self.subTest(identifier=identifier), self.assertNumQueries(1):
+                self.assertEqual(authenticate(email_or_phone=identifier, password='secret'), self.user)
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email_or_phone='221793000001', password='mauvais'))
+        with self.assertNumQueries(1):
+            self.assertIsNone(authenticate(email_or_phone='inconnu@senelec.sn', password='secret'))
+
+    async def test_async_backend(self):
+        user = await aauthenticate(email_or_phone='221793000001', password='secret')
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertIsNone(await aauthenticate(email_or_phone='login@senelec.sn', password='mauvais'))
+
+    def test_login_statuses(self):
+        self.assertEqual(self.login('221793000001').json()['user']['email'], 'login@senelec.sn')
+        self.assertEqual(self.login('login@senelec.sn', password='mauvais').status_code, 401)
+        self.assertEqual(self.login('221799999999').status_code, 404)
+        self.assertEqual(self.client.post('/api/login/', {}, content_type='application/json').status_code, 400)
+
+    def test_last_login_written_once_per_interval(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.login('login@senelec.sn').status_code, 200)
+        self.assertEqual(len([query for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]), 1)
+        self.user.refresh_from_db()
+        first_login = self.user.last_login
+
+        # Reconnexion dans l'intervalle : chargement de l'utilisateur seulement
+        with self.assertNumQueries(1):
+            self.assertEqual(self.login('login@senelec.sn').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, first_login)
+
+
+class KeysetPaginationTests(TestCase):
+    """Liste des réclamations paginée par curseur (date_created, id) et restreinte par rôle"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Categories.objects.create(nom='Coupure')
+        cls.client_user = User.objects.create(
+            username='client-page', email='client-page@senelec.sn', telephone='221794000001',
+            nom='Mbaye', prenom='Aida', role='client',
+        )
+        cls.other_client = User.objects.create(
+            username='autre-page', email='autre-page@senelec.sn', telephone='221794000002',
+            nom='Cisse', prenom='Omar', role='client',
+        )
+        cls.technicien = User.objects.create(
+            username='tech-page', email='tech-page@senelec.sn', telephone='221794000003',
+            nom='Thiam', prenom='Lamine', role='technicien',
+        )
+        cls.superviseur = User.objects.create(
+            username='sup-page', email='sup-page@senelec.sn', telephone='221794000004',
+            nom='Kane', prenom='Rama', role='superviseur',
+        )
+        moment = timezone.now().replace(microsecond=0)
+        for i in range(7):
+            Reclamation.objects.create(
+                description=f'Coupure {i}', user=cls.client_user, categories=cls.category,
+                technicien=cls.technicien if i % 2 else None, status='en_cours' if i % 2 else 'en_attente',
+            )
+        Reclamation.objects.create(description='Autre', user=cls.other_client, categories=cls.category)
+        # Plusieurs réclamations à la même date : départage par id
+        Reclamation.objects.filter(description__in=['Coupure 2', 'Coupure 3', 'Coupure 4']).update(date_created=moment)
+
+    def all_pages(self, user, params='', limit=3):
+        self.client.force_login(user)
+        ids, cursor = [], None
+        while True:
+            query = f'?limit={limit}{params}' + (f'&cursor={cursor}' if cursor else '')
+            response = self.client.get('/api/reclamations/' + query)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            self.assertLessEqual(body['count'], limit)
+            ids += [row['id'] for row in body['reclamations']]
+            cursor = body['next_cursor']
+            if not cursor:
+                return ids
+
+    def expected(self, queryset):
+        return [str(pk) for pk in queryset.order_by('-date_created', '-id').values_list('pk', flat=True)]
+
+    def test_ties_are_neither_skipped_nor_repeated(self):
+        for limit in (1, 2, 3, 8):
+            with self.subTest(limit=limit):
+                self.assertEqual(self.all_pages(self.superviseur, limit=limit), self.expected(Reclamation.objects.all()))
+
+    def test_scoped_by_role(self):
+        self.assertEqual(self.all_pages(self.client_user), self.expected(self.client_user.reclamations.all()))
+        self.assertEqual(self.all_pages(self.technicien), self.expected(Reclamation.objects.filter(technicien=self.technicien)))
+        self.assertEqual(self.all_pages(self.other_client), self.expected(self.other_client.reclamations.all()))
+        self.assertEqual(
+            self.all_pages(self.superviseur, params='&status=en_cours'),
+            self.expected(Reclamation.objects.filter(status='en_cours')),
+        )
+
+    def test_last_page_has_no_cursor(self):
+        queryset = Reclamation.objects.values('id', 'date_created')
+        rows, cursor = paginate_by_cursor(queryset, limit=8)
+        self.assertEqual((len(rows), cursor), (8, None))
+        rows, cursor = paginate_by_cursor(queryset, limit=7)
+        self.assertEqual(decode_cursor(cursor), (rows[-1]['date_created'], rows[-1]['id']))
+
+    def test_invalid_cursor_and_params(self):
+        row = Reclamation.objects.values('date_created', 'pk').first()
+        self.assertIsInstance(decode_cursor(encode_cursor(row['date_created'], row['pk']))[1], uuid.UUID)
+        for cursor in ('%%%', 'bm90LWpzb24', encode_cursor(row['date_created'], row['pk'])[:-4],
+                       'WyJkYXRlIiwgIngiXQ', 'eyJhIjogMSwgImIiOiAyfQ', 'WzEsIDJd'):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+        self.client.force_login(self.superviseur)
+        for query in ('cursor=pas-un-curseur', 'limit=abc', 'status=inconnu', 'categorie=123', 'date_debut=hier'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/reclamations/?{query}').status_code, 400)
+
+    def test_authentication_required(self):
+        self.assertEqual(self.client.get('/api/reclamations/').status_code, 401)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Recherche plein texte SQLite FTS5')
+class SearchTests(TestCase):
+    """Recherche plein texte des réclamations (/api/reclamations/search/)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Categories.objects.create(nom='Coupure')
+        cls.client_user = User.objects.create(
+            username='client-fts', email='client-fts@senelec.sn', telephone='221795000001',
+            nom='Diouf', prenom='Sokhna', role='client',
+        )
+        cls.other_client = User.objects.create(
+            username='autre-fts', email='autre-fts@senelec.sn', telephone='221795000002',
+            nom='Ndour', prenom='Pape', role='client',
+        )
+        cls.superviseur = User.objects.create(
+            username='sup-fts', email='sup-fts@senelec.sn', telephone='221795000003',
+            nom='Seck', prenom='Awa', role='superviseur',
+        )
+        cls.compteur = Reclamation.objects.create(
+            description='Le compteur électrique affiche une erreur', user=cls.client_user, categories=category,
+        )
+        cls.coupure = Reclamation.objects.create(
+            description='Coupure totale depuis hier soir à Médina', user=cls.client_user, categories=category,
+        )
+        cls.autre = Reclamation.objects.create(
+            description='Coupure de courant répétée', user=cls.other_client, categories=category,
+        )
+
+    def search(self, user, text):
+        return set(search_reclamation_ids(user, text))
+
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query('coupure Médina'), '"coupure"* "Médina"*')
+        # Opérateurs et guillemets FTS5 neutralisés
+        self.assertEqual(build_match_query('a" OR "b'), '"a"* "OR"* "b"*')
+        self.assertEqual(build_match_query('NEAR(compteur) -erreur *'), '"NEAR"* "compteur"* "erreur"*')
+        self.assertEqual(build_match_query('"" ()*:^'), '')
+
+    def test_accent_and_case_insensitive_prefix(self):
+        self.assertEqual(self.search(self.superviseur, 'ELECTRIQUE'), {self.compteur.pk})
+        self.assertEqual(self.search(self.superviseur, 'medina'), {self.coupure.pk})
+        self.assertEqual(self.search(self.superviseur, 'coup'), {self.coupure.pk, self.autre.pk})
+        self.assertEqual(self.search(self.superviseur, 'coupure hier'), {self.coupure.pk})
+        self.assertEqual(self.search(self.superviseur, 'a" OR "compteur'), set())
+        self.assertEqual(self.search(self.superviseur, '***'), set())
+
+    def test_scoped_to_visible_reclamations(self):
+        self.assertEqual(self.search(self.client_user, 'coupure'), {self.coupure.pk})
+        self.assertEqual(self.search(self.other_client, 'coupure'), {self.autre.pk})
+
+    def test_index_follows_updates_and_deletes(self):
+        self.compteur.description = 'Facture trop élevée'
+        self.compteur.save()
+        self.assertEqual(self.search(self.superviseur, 'compteur'), set())
+        self.assertEqual(self.search(self.superviseur, 'facture'), {self.compteur.pk})
+        self.coupure.delete()
+        self.assertEqual(self.search(self.superviseur, 'coupure'), {self.autre.pk})
+
+    def test_results_survive_rowid_renumbering(self):
+        # VACUUM, un dump/restauration ou la copie de la table par une migration
+        # peuvent renuméroter le rowid implicite de core_reclamation
+        self.coupure.delete()
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE core_reclamation SET rowid = rowid - 1')
+        self.assertEqual(self.search(self.superviseur, 'compteur'), {self.compteur.pk})
+        self.assertEqual(self.search(self.superviseur, 'repetee'), {self.autre.pk})
+
+    def test_api(self):
+        self.assertEqual(self.client.get('/api/reclamations/search/?q=coupure').status_code, 401)
+        self.client.force_login(self.client_user)
+        self.assertEqual(self.client.get('/api/reclamations/search/').status_code, 400)
+        body = self.client.get('/api/reclamations/search/?q=coupure').json()
+        self.assertEqual([row['id'] for row in body['reclamations']], [str(self.coupure.pk)])
+
+
+class ImagePipelineTests(TestCase):
+    """Photos des réclamations : métadonnées retirées, déduplication, variantes"""
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        settings = override_settings(MEDIA_ROOT=self.media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client_user = User.objects.create(
+            username='client-photo', email='client-photo@senelec.sn', telephone='221796000001',
+            nom='Sy', prenom='Mariama', role='client',
+        )
+        self.reclamation = Reclamation.objects.create(
+            description='Poteau penché', user=self.client_user, categories=Categories.objects.create(nom='Coupure'),
+        )
+        self.client.force_login(self.client_user)
+
+    @staticmethod
+    def photo(size=(640, 480), orientation=6, image_format='JPEG', **options):
+        from PIL import Image, ImageFilter
+
+        noise = Image.effect_noise(size, 40).filter(ImageFilter.GaussianBlur(1))
+        img = Image.merge('RGB', [noise, Image.linear_gradient('L').resize(size), Image.radial_gradient('L').resize(size)])
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        exif[0x010F] = 'Telephone'
+        exif[0x8825] = {1: 'N', 2: (14.0, 41.0, 0.0)}
+        buffer = io.BytesIO()
+        img.save(buffer, image_format, exif=exif.tobytes(), **options)
+        return buffer.getvalue()
+
+    def upload(self, content, filename='photo.jpg'):
+        return self.client.post(
+            f'/api/reclamations/{self.reclamation.pk}/image/',
+            {'image': SimpleUploadedFile(filename, content, content_type='image/jpeg')},
+        )
+
+    def stored_path(self, name):
+        return os.path.join(self.media.name, name)
+
+    def test_metadata_stripped_losslessly_and_content_addressed(self):
+        from PIL import Image
+
+        content = self.photo()
+        response = self.upload(content)
+        self.assertEqual(response.status_code, 200)
+        self.reclamation.refresh_from_db()
+        path = self.stored_path(self.reclamation.image.name)
+        self.assertEqual(file_hash(path), self.reclamation.image_hash)
+        self.assertIn(self.reclamation.image_hash, self.reclamation.image.name)
+
+        with Image.open(path) as stored, Image.open(io.BytesIO(content)) as original:
+            # Seule l'orientation est gardée, les pixels ne sont pas réencodés
+            self.assertEqual(dict(stored.getexif()), {0x0112: 6})
+            self.assertEqual(stored.tobytes(), original.tobytes())
+        self.assertTrue(response.json()['images']['thumbnail'].endswith('_thumbnail.jpg'))
+
+        # Les variantes ne modifient plus l'original
+        generate_variants(self.media.name, self.reclamation.image.name, self.reclamation.image_hash, DEFAULT_VARIANTS)
+        self.assertEqual(file_hash(path), self.reclamation.image_hash)
+
+    def test_duplicate_upload_reuses_file(self):
+        content = self.photo()
+        first = self.upload(content).json()['images']['original']
+        second = self.upload(content).json()['images']['original']
+        self.assertEqual(first, second)
+        originals = os.path.join(self.media.name, 'reclamations', 'originals')
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(originals)), 1)
+        self.assertEqual(os.listdir(os.path.join(self.media.name, 'reclamations', 'tmp')), [])
+
+    def test_png_and_webp_metadata(self):
+        from PIL import Image
+
+        for image_format, extension in (('PNG', 'png'), ('WEBP', 'webp')):
+            with self.subTest(image_format=image_format):
+                self.assertEqual(self.upload(self.photo(image_format=image_format), f'photo.{extension}').status_code, 200)
+                self.reclamation.refresh_from_db()
+                path = self.stored_path(self.reclamation.image.name)
+                self.assertTrue(path.endswith(extension))
+                with Image.open(path) as stored:
+                    stored.load()
+                    self.assertEqual(dict(stored.getexif()), {})
+
+    def test_invalid_upload(self):
+        response = self.upload(b'pas une image')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(os.listdir(os.path.join(self.media.name, 'reclamations', 'tmp')), [])
+
+    def test_variants_of_a_phone_photo(self):
+        from PIL import Image
+
+        content = self.photo(size=(4000, 3000), quality=95)
+        self.assertGreater(len(content), 3 * 1024 * 1024)
+        self.upload(content)
+        self.reclamation.refresh_from_db()
+        name, image_hash = self.reclamation.image.name, self.reclamation.image_hash
+
+        self.assertEqual(generate_variants(self.media.name, name, image_hash, DEFAULT_VARIANTS), ['preview', 'thumbnail'])
+        # Déjà générées : rien à refaire
+        self.assertEqual(generate_variants(self.media.name, name, image_hash, DEFAULT_VARIANTS), [])
+
+        sizes = {}
+        for variant, (size, _) in DEFAULT_VARIANTS.items():
+            path = self.stored_path(variant_name(image_hash, variant))
+            sizes[variant] = os.path.getsize(path)
+            with Image.open(path) as img:
+                # Orientation appliquée (portrait), aucune métadonnée
+                self.assertEqual(img.size, (size * 3 // 4, size))
+                self.assertEqual(dict(img.getexif()), {})
+        self.assertLess(sizes['preview'], 64 * 1024)
+        self.assertLess(sizes['thumbnail'], 16 * 1024)
+
+
+class AssignmentEngineTests(TestCase):
+    """Assignation équilibrée par charge : tas des techniciens tenu à jour par les signaux"""
+
+    def setUp(self):
+        assignment_engine.reset()
+        self.addCleanup(assignment_engine.reset)
+        self.category = Categories.objects.create(nom='Coupure')
+        self.client_user = User.objects.create(
+            username='client-assign', email='client-assign@senelec.sn', telephone='221797000001',
+            nom='Diagne', prenom='Khady', role='client',
+        )
+        self.techs = [
+            User.objects.create(
+                username=f'tech-assign{i}', email=f'tech-assign{i}@senelec.sn', telephone=f'22179700001{i}',
+                nom='Mane', prenom=f'Tech{i}', role='technicien',
+            )
+            for i in range(3)
+        ]
+
+    def reclamations(self, count, technicien=None, status='en_attente'):
+        return [
+            Reclamation.objects.create(
+                description='Coupure', user=self.client_user, categories=self.category,
+                technicien=technicien, status=status,
+            )
+            for _ in range(count)
+        ]
+
+    def database_loads(self):
+        fresh = AssignmentEngine()
+        fresh.seed()
+        return fresh.loads()
+
+    def test_least_loaded_first(self):
+        self.reclamations(4, technicien=self.techs[0])
+        self.reclamations(2, technicien=self.techs[1])
+        # Les réclamations fermées ne comptent pas dans la charge
+        self.reclamations(3, technicien=self.techs[2], status='resolu')
+        self.reclamations(6)
+
+        self.assertEqual(assignment_engine.assign(), 6)
+        loads = assignment_engine.loads()
+        self.assertEqual([loads[tech.pk] for tech in self.techs], [4, 4, 4])
+        self.assertEqual(loads, self.database_loads())
+        self.assertFalse(Reclamation.objects.filter(technicien__isnull=True, status='en_attente').exists())
+
+    def test_heap_follows_load_changes(self):
+        assignment_engine.seed()
+        busy = self.reclamations(3, technicien=self.techs[0])
+        self.reclamations(1, technicien=self.techs[1])
+        self.assertEqual(assignment_engine.loads()[self.techs[0].pk], 3)
+
+        # Tickets résolus et réassignés : les anciennes entrées du tas sont ignorées
+        for reclamation in busy[:2]:
+            reclamation.status = 'resolu'
+            reclamation.save()
+        busy[2].technicien = self.techs[2]
+        busy[2].save()
+        self.assertEqual(assignment_engine.loads(), self.database_loads())
+        self.assertEqual(assignment_engine.pick(1), [self.techs[0].pk])
+
+        Reclamation.objects.filter(technicien=self.techs[1]).delete()
+        self.assertEqual(assignment_engine.loads()[self.techs[1].pk], 0)
+
+    def test_inactive_technicien_is_dropped(self):
+        self.techs[1].is_active = False
+        self.techs[1].save()
+        self.reclamations(4)
+        assignment_engine.assign(reseed=False)
+        self.assertNotIn(self.techs[1].pk, assignment_engine.loads())
+        self.assertFalse(Reclamation.objects.filter(technicien=self.techs[1]).exists())
+
+    def test_concurrent_assignment_forces_reseed(self):
+        pending = self.reclamations(2)
+        assignment_engine.seed()
+        picks = assignment_engine.pick(2)
+        # Un autre processus assigne l'une des réclamations entre-temps
+        Reclamation.objects.filter(pk=pending[0].pk).update(technicien=self.techs[2])
+        self.assertEqual(assignment_engine._apply([r.pk for r in pending], picks), 1)
+        self.assertEqual(assignment_engine.loads(), self.database_loads())
+
+    def test_api_requires_supervisor(self):
+        self.reclamations(2)
+        url = '/api/reclamations/assign/'
+        self.assertEqual(self.client.post(url).status_code, 401)
+        self.client.force_login(self.client_user)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+        superviseur = User.objects.create(
+            username='sup-assign', email='sup-assign@senelec.sn', telephone='221797000099',
+            nom='Ba', prenom='Sup', role='superviseur',
+        )
+        self.client.force_login(superviseur)
+        response = self.client.post(url, {'reclamation_ids': 'pas-une-liste'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Reclamation.objects.filter(technicien__isnull=True).exists())
+
+
+class RollupTests(TestCase):
+    """Agrégats journaliers : actualisation incrémentale, recatégorisation, percentiles et API SLA"""
+
+    def setUp(self):
+        self.coupure = Categories.objects.create(nom='Coupure')
+        self.facture = Categories.objects.create(nom='Facturation')
+        self.client_user = User.objects.create(
+            username='client-rollup', email='client-rollup@senelec.sn', telephone='221797100001',
+            nom='Sarr', prenom='Awa', role='client',
+        )
+        self.superviseur = User.objects.create(
+            username='sup-rollup', email='sup-rollup@senelec.sn', telephone='221797100002',
+            nom='Gueye', prenom='Moussa', role='superviseur',
+        )
+        self.day = timezone.localdate() - timedelta(days=2)
+        self.start = timezone.make_aware(timezone.datetime.combine(self.day, timezone.datetime.min.time()))
+
+    def reclamation(self, category, hours_to_answer=None, status='en_attente', days_before=0):
+        reclamation = Reclamation.objects.create(
+            description='Test', user=self.client_user, categories=category, status=status,
+        )
+        created = self.start - timedelta(days=days_before) + timedelta(hours=1)
+        Reclamation.objects.filter(pk=reclamation.pk).update(
+            date_created=created,
+            dateReponse=created + timedelta(hours=hours_to_answer) if hours_to_answer is not None else None,
+        )
+        reclamation.refresh_from_db()
+        return reclamation
+
+    def counts(self, day=None):
+        return {
+            (rollup.categories_id, rollup.status): rollup.nombre
+            for rollup in ReclamationDailyRollup.objects.filter(jour=day or self.day)
+        }
+
+    def test_incremental_refresh_follows_status(self):
+        first = self.reclamation(self.coupure)
+        self.reclamation(self.coupure, hours_to_answer=2, status='resolu')
+        self.assertEqual(refresh_rollups(), 1)
+        self.assertEqual(self.counts(), {(self.coupure.pk, 'en_attente'): 1, (self.coupure.pk, 'resolu'): 1})
+
+        first.status = 'resolu'
+        first.save()
+        refresh_rollups()
+        self.assertEqual(self.counts(), {(self.coupure.pk, 'resolu'): 2})
+        self.assertEqual(
+            RollupWatermark.objects.get(nom=WATERMARK_NAME).valeur,
+            Reclamation.objects.get(pk=first.pk).date_updated,
+        )
+
+    def test_category_change_leaves_no_stale_rollup(self):
+        reclamation = self.reclamation(self.coupure)
+        refresh_rollups()
+        reclamation.categories = self.facture
+        reclamation.save()
+        refresh_rollups()
+        self.assertEqual(self.counts(), {(self.facture.pk, 'en_attente'): 1})
+
+    def test_late_commit_within_safety_lag(self):
+        self.reclamation(self.coupure)
+        refresh_rollups()
+        late = self.reclamation(self.facture, days_before=1)
+        previous_day = self.day - timedelta(days=1)
+        # Transaction validée après l'actualisation mais datée avant le watermark
+        watermark = RollupWatermark.objects.get(nom=WATERMARK_NAME).valeur
+        Reclamation.objects.filter(pk=late.pk).update(date_updated=watermark - timedelta(seconds=30))
+
+        with override_settings(ROLLUP_SAFETY_LAG=0):
+            refresh_rollups()
+        self.assertEqual(self.counts(previous_day), {})
+        refresh_rollups()
+        self.assertEqual(self.counts(previous_day), {(self.facture.pk, 'en_attente'): 1})
+        self.assertEqual(RollupWatermark.objects.get(nom=WATERMARK_NAME).valeur, watermark)
+
+    def test_full_refresh_is_atomic(self):
+        self.reclamation(self.coupure)
+        refresh_rollups()
+        with mock.patch('core.rollups.rebuild_day', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                refresh_rollups(full=True)
+        self.assertEqual(self.counts(), {(self.coupure.pk, 'en_attente'): 1})
+
+    def test_sketch_quantiles_within_accuracy(self):
+        import random
+        rng = random.Random(42)
+        values = [rng.lognormvariate(8, 1.5) for _ in range(5000)]
+        halves = DurationSketch(), DurationSketch()
+        for i, value in enumerate(values):
+            halves[i % 2].add(value)
+        sketch = DurationSketch.from_json(halves[0].to_json()).merge(halves[1])
+        self.assertEqual(sketch.count, len(values))
+
+        values.sort()
+        for q in (0.01, 0.5, 0.9, 0.95, 0.99, 1.0):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact) / exact, 0.01 + 1e-9, q)
+        self.assertIsNone(DurationSketch().quantile(0.5))
+        zeros = DurationSketch()
+        zeros.add(0)
+        self.assertEqual(zeros.quantile(0.9), 0.0)
+
+    def test_sla_api(self):
+        for hours in (1, 2, 3, 10):
+            self.reclamation(self.coupure, hours_to_answer=hours, status='resolu')
+        self.reclamation(self.coupure)
+        self.reclamation(self.facture)
+        refresh_rollups()
+
+        url = '/api/analytics/sla/'
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.client.force_login(self.client_user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.superviseur)
+        self.assertEqual(self.client.get(url, {'date_debut': 'hier'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'categorie': 'x'}).status_code, 400)
+
+        data = self.client.get(url, {'categorie': str(self.coupure.pk)}).json()
+        self.assertTrue(data['success'])
+        [summary] = data['categories']
+        self.assertEqual(summary['nom'], 'Coupure')
+        self.assertEqual(summary['total'], 5)
+        self.assertEqual(summary['par_statut'], {'resolu': 4, 'en_attente': 1})
+        self.assertEqual(summary['delai_moyen_heures'], 4.0)
+        self.assertAlmostEqual(summary['p50_heures'], 2, delta=0.05)
+        self.assertAlmostEqual(summary['p95_heures'], 3, delta=0.05)
+
+        day = self.day.isoformat()
+        self.assertEqual(len(self.client.get(url, {'date_debut': day, 'date_fin': day}).json()['categories']), 2)
+        following = (self.day + timedelta(days=1)).isoformat()
+        self.assertEqual(self.client.get(url, {'date_debut': following}).json()['categories'], [])
+
+
+class ExportTests(TestCase):
+    """Export en flux : contenu CSV/Parquet, filtres, choix du format, WSGI et ASGI"""
+
+    url = '/api/reclamations/export/'
+
+    def setUp(self):
+        self.category = Categories.objects.create(nom='Compteur')
+        self.client_user = User.objects.create(
+            username='client-export', email='client-export@senelec.sn', telephone='221797200001',
+            nom='Diouf', prenom='Aminata', role='client',
+        )
+        self.superviseur = User.objects.create(
+            username='sup-export', email='sup-export@senelec.sn', telephone='221797200002',
+            nom='Thiam', prenom='Ousmane', role='superviseur',
+        )
+        self.reclamations = [
+            Reclamation.objects.create(
+                description=f'Compteur bloqué, "index" {i}', user=self.client_user,
+                categories=self.category, status='resolu' if i % 3 == 0 else 'en_attente',
+            )
+            for i in range(7)
+        ]
+
+    def rows(self, content):
+        import csv
+        return list(csv.DictReader(io.StringIO(content.decode())))
+
+    def test_access(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.client.force_login(self.client_user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.superviseur)
+        self.assertEqual(self.client.get(self.url, {'format': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'categorie': 'x'}).status_code, 400)
+
+    def test_csv_stream_and_filters(self):
+        self.client.force_login(self.superviseur)
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(response['Content-Disposition'], r'attachment; filename="reclamations_\d+_\d+\.csv"')
+        rows = self.rows(b''.join(response.streaming_content))
+        self.assertEqual([row['id'] for row in rows], [str(r.pk) for r in self.reclamations])
+        self.assertEqual(rows[1]['description'], 'Compteur bloqué, "index" 1')
+        self.assertEqual(rows[0]['categorie'], 'Compteur')
+        self.assertEqual(rows[0]['client_telephone'], '221797200001')
+
+        response = self.client.get(self.url, {'status': 'resolu'})
+        rows = self.rows(b''.join(response.streaming_content))
+        self.assertEqual({row['status'] for row in rows}, {'resolu'})
+        self.assertEqual(len(rows), 3)
+
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+        self.client.force_login(self.superviseur)
+        response = self.client.get(self.url, {'format': 'parquet', 'status': 'en_attente'})
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.parquet')
+        self.assertIn('.parquet', response['Content-Disposition'])
+        table = pq.read_table(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 4)
+        self.assertEqual(set(table.column('status').to_pylist()), {'en_attente'})
+
+    async def test_asgi_streams_asynchronously(self):
+        client = AsyncClient()
+        await client.aforce_login(self.superviseur)
+        csv_rows = None
+        for format_ in ('csv', 'parquet'):
+            response = await client.get(self.url, {'format': format_})
+            self.assertEqual(response.status_code, 200)
+            # Itérateur asynchrone : pas de consommation complète avant l'envoi
+            self.assertTrue(response.is_async)
+            content = b''.join([part async for part in response.streaming_content])
+            if format_ == 'csv':
+                csv_rows = self.rows(content)
+            else:
+                import pyarrow.parquet as pq
+                self.assertEqual(pq.read_table(io.BytesIO(content)).num_rows, len(csv_rows))
+        self.assertEqual(len(csv_rows), 7)
+
+
+class EventStreamTests(TestCase):
+    """Flux SSE : authentification, filtrage par audience, reprise et déconnexion des clients lents"""
+
+    url = '/api/reclamations/events/'
+
+    def setUp(self):
+        self.category = Categories.objects.create(nom='Branchement')
+        self.client_user = User.objects.create(
+            username='client-sse', email='client-sse@senelec.sn', telephone='221797300001',
+            nom='Fall', prenom='Binta', role='client',
+        )
+        self.other_client = User.objects.create(
+            username='client-sse2', email='client-sse2@senelec.sn', telephone='221797300002',
+            nom='Sy', prenom='Modou', role='client',
+        )
+        self.technicien = User.objects.create(
+            username='tech-sse', email='tech-sse@senelec.sn', telephone='221797300003',
+            nom='Kane', prenom='Ibou', role='technicien',
+        )
+        self.superviseur = User.objects.create(
+            username='sup-sse', email='sup-sse@senelec.sn', telephone='221797300004',
+            nom='Ly', prenom='Coumba', role='superviseur',
+        )
+
+    def publish(self, user, technicien=None, event_type='statut_modifie', broker=event_broker):
+        return broker.publish(event_type, {'id': str(uuid.uuid4())}, user.pk, (technicien.pk if technicien else None,))
+
+    def test_audience_filter(self):
+        own = self.publish(self.client_user, self.technicien)
+        other = self.publish(self.other_client)
+        for user, visible in (
+            (self.client_user, [own]),
+            (self.other_client, [other]),
+            (self.technicien, [own]),
+            (self.superviseur, [own, other]),
+        ):
+            accepts = audience_filter(user)
+            self.assertEqual([event for event in (own, other) if accepts(event)], visible, user.role)
+
+    def test_signals_publish_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reclamation = Reclamation.objects.create(
+                description='Branchement', user=self.client_user, categories=self.category,
+            )
+        created = event_broker._history[-1]
+        self.assertEqual((created.type, created.user_id), ('reclamation_creee', str(self.client_user.pk)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reclamation.technicien = self.technicien
+            reclamation.save()
+        event = event_broker._history[-1]
+        self.assertEqual(event.type, 'technicien_modifie')
+        self.assertIn(str(self.technicien.pk), event.technicien_ids)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reclamation.description = 'Sans changement de statut'
+            reclamation.save()
+        self.assertIs(event_broker._history[-1], event)
+
+    async def test_view_requires_authentication(self):
+        client = AsyncClient()
+        self.assertEqual((await client.get(self.url)).status_code, 401)
+        self.assertEqual((await client.post(self.url)).status_code, 405)
+
+    def test_view_refused_under_wsgi(self):
+        self.client.force_login(self.client_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(response.streaming)
+
+    async def test_view_streams_visible_events(self):
+        client = AsyncClient()
+        await client.aforce_login(self.client_user)
+        response = await client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(stream)).startswith(b'retry: '))
+            self.publish(self.other_client)
+            own = self.publish(self.client_user)
+            part = await asyncio.wait_for(anext(stream), timeout=5)
+            self.assertEqual(part.decode(), own.format())
+        finally:
+            await stream.aclose()
+
+    async def test_replay_from_last_event_id(self):
+        broker = EventBroker(history_size=3)
+        first = self.publish(self.client_user, broker=broker)
+        self.publish(self.other_client, broker=broker)
+        second = self.publish(self.client_user, broker=broker)
+
+        with mock.patch('core.events.broker', broker):
+            stream = event_stream(self.client_user, last_event_id=first.id)
+            parts = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            self.assertEqual(parts[1], second.format())
+
+            # Identifiant d'un autre processus, ou évincé de l'historique : rechargement complet
+            for last_event_id in ('autre-1', first.id):
+                if last_event_id == first.id:
+                    for _ in range(3):
+                        self.publish(self.client_user, broker=broker)
+                stream = event_stream(self.client_user, last_event_id=last_event_id)
+                await anext(stream)
+                self.assertEqual(await anext(stream), 'event: reset\ndata: {}\n\n')
+                await stream.aclose()
+
+    async def test_slow_subscriber_is_disconnected(self):
+        broker = EventBroker(max_queue=2)
+        with mock.patch('core.events.broker', broker):
+            stream = event_stream(self.superviseur, heartbeat=5)
+            await anext(stream)
+            for _ in range(3):
+                self.publish(self.other_client, broker=broker)
+            await asyncio.sleep(0)
+            # File pleine : le flux se termine, le client se reconnectera
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(anext(stream), timeout=5)
+        self.assertEqual(broker.subscriber_count, 0)
+
+
+class AsyncViewTests(TestCase):
+    """Vues asynchrones (déploiement ASGI) : mêmes réponses que les vues synchrones"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.password = 'MotDePasse!2024'
+        self.client_user = User.objects.create(
+            username='client-async', email='client-async@senelec.sn', telephone='221797400001',
+            nom='Ndour', prenom='Adama', role='client', password=make_password(self.password),
+        )
+        self.superviseur = User.objects.create(
+            username='sup-async', email='sup-async@senelec.sn', telephone='221797400002',
+            nom='Seck', prenom='Fatou', role='superviseur', password=make_password(self.password),
+        )
+
+    def post(self, view, data):
+        from django.contrib.sessions.backends.db import SessionStore
+        body = data if isinstance(data, str) else json.dumps(data)
+        request = self.factory.post('/', body, content_type='application/json')
+        request.session = SessionStore()
+        return view(request)
+
+    async def test_login(self):
+        for identifier in ('client-async@senelec.sn', '221797400001'):
+            response = await self.post(async_views.login_api, {'email_or_phone': identifier, 'password': self.password})
+            self.assertEqual(response.status_code, 200, identifier)
+            data = json.loads(response.content)
+            self.assertEqual(data['user']['id'], str(self.client_user.pk))
+            self.assertEqual(data['dashboard_url'], '/dashboard/')
+
+        # Superviseur : session Django ouverte pour l'administration
+        response = await self.post(async_views.login_api, {'email_or_phone': '221797400002', 'password': self.password})
+        self.assertEqual(json.loads(response.content)['dashboard_url'], '/admin/')
+
+        for data, status in (
+            ({'email_or_phone': 'client-async@senelec.sn', 'password': 'faux'}, 401),
+            ({'email_or_phone': 'inconnu@senelec.sn', 'password': 'faux'}, 404),
+            ({'email_or_phone': 'client-async@senelec.sn'}, 400),
+            ('{pas du json', 400),
+        ):
+            response = await self.post(async_views.login_api, data)
+            self.assertEqual(response.status_code, status, data)
+            self.assertFalse(json.loads(response.content)['success'])
+
+    async def test_add_user_queues_credentials(self):
+        data = {
+            'nom': 'Cisse', 'prenom': 'Lamine', 'email': 'lamine-async@senelec.sn',
+            'telephone': '221797400003', 'role': 'client',
+        }
+        response = await self.post(async_views.add_user_api, data)
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        self.assertTrue(payload['email_queued'])
+
+        user = await User.objects.aget(email='lamine-async@senelec.sn')
+        self.assertTrue(user.check_password(payload['user']['temp_password']))
+        self.assertTrue(await EmailOutbox.objects.filter(user=user, status='en_attente').aexists())
+
+        response = await self.post(async_views.add_user_api, data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', json.loads(response.content)['message'])
+        response = await self.post(async_views.add_user_api, {**data, 'email': 'autre@senelec.sn'})
+        self.assertIn('téléphone', json.loads(response.content)['message'])
+        response = await self.post(async_views.add_user_api, {'nom': 'Cisse'})
+        self.assertIn('prenom, email, telephone, role', json.loads(response.content)['message'])
+
+    async def test_send_credentials(self):
+        response = await self.post(async_views.send_credentials_api, {'email': 'inconnu@senelec.sn'})
+        self.assertEqual(response.status_code, 404)
+        response = await self.post(async_views.send_credentials_api, {})
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.post(async_views.send_credentials_api, {'email': 'client-async@senelec.sn'})
+        self.assertEqual(response.status_code, 200)
+        user = await User.objects.aget(pk=self.client_user.pk)
+        self.assertTrue(user.temp_password)
+        self.assertTrue(user.is_first_login)
+        self.assertTrue(user.check_password(user.temp_password))
+        self.assertEqual(await EmailOutbox.objects.filter(user=user).acount(), 1)
+
+        # Mot de passe temporaire existant : renvoyé tel quel
+        await self.post(async_views.send_credentials_api, {'email': 'client-async@senelec.sn'})
+        self.assertEqual((await User.objects.aget(pk=user.pk)).temp_password, user.temp_password)
+        self.assertEqual(await EmailOutbox.objects.filter(user=user).acount(), 2)
+
+
+class LoginThrottleTests(TestCase):
+    """Limitation des connexions : 429 avec Retry-After, sans vérification du mot de passe"""
+
+    def setUp(self):
+        # Activé pour chaque test : le limiteur (et ses seaux) est reconstruit
+        settings = override_settings(
+            LOGIN_THROTTLE_ENABLED=True,
+            LOGIN_THROTTLE_BACKEND='core.throttle.LocalMemoryBackend',
+            LOGIN_THROTTLE_OPTIONS={},
+            LOGIN_THROTTLE_RATES={'ip': '4/min', 'identifiant': '2/min'},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.password = 'MotDePasse!2024'
+        self.user = User.objects.create(
+            username='client-throttle', email='client-throttle@senelec.sn', telephone='221797500001',
+            nom='Mbaye', prenom='Astou', role='client', password=make_password(self.password),
+        )
+
+    def login(self, identifier='client-throttle@senelec.sn', password='faux', **extra):
+        return self.client.post(
+            '/api/login/', {'email_or_phone': identifier, 'password': password},
+            content_type='application/json', **extra,
+        )
+
+    def assertThrottled(self, response, max_delay):
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.json()['success'])
+        self.assertTrue(response['Retry-After'].isdigit())
+        self.assertTrue(1 <= int(response['Retry-After']) <= max_delay, response['Retry-After'])
+
+    def test_identifier_limit(self):
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 401)
+        # Rejetée avant authenticate() : aucun hachage PBKDF2
+        with mock.patch('core.views.authenticate') as authenticate:
+            response = self.login(password=self.password)
+        authenticate.assert_not_called()
+        # Seau de 2 jetons rechargé à 2 par minute : un jeton dans 30 secondes
+        self.assertThrottled(response, 30)
+        # Même compte, autre casse : même seau
+        self.assertThrottled(self.login(identifier='CLIENT-throttle@senelec.sn'), 30)
+
+    def test_ip_limit_across_identifiers(self):
+        for i in range(4):
+            self.assertEqual(self.login(identifier=f'inconnu{i}@senelec.sn').status_code, 404)
+        self.assertThrottled(self.login(identifier='inconnu9@senelec.sn'), 15)
+        # Une autre adresse IP n'est pas concernée
+        self.assertEqual(self.login(identifier='inconnu9@senelec.sn', REMOTE_ADDR='10.0.0.2').status_code, 404)
+
+    def test_success_resets_identifier_bucket(self):
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login(password=self.password).status_code, 200)
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 429)
+
+    async def test_async_view(self):
+        factory = AsyncRequestFactory()
+        statuses = []
+        # Horloge figée : la durée des deux vérifications PBKDF2 n'entame pas le délai
+        with mock.patch('core.throttle.time.time', return_value=1_000_000.0):
+            for _ in range(3):
+                request = factory.post(
+                    '/', json.dumps({'email_or_phone': '221797500001', 'password': 'faux'}),
+                    content_type='application/json',
+                )
+                response = await async_views.login_api(request)
+                statuses.append(response.status_code)
+        self.assertEqual(statuses, [401, 401, 429])
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_backend_error_fails_open(self):
+        throttle = get_login_throttle()
+        with mock.patch.object(throttle.backend, 'consume', side_effect=OSError('disque plein')):
+            for _ in range(3):
+                self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(throttle.snapshot()['erreurs_backend'], 3)
+
+    def test_disabled(self):
+        with override_settings(LOGIN_THROTTLE_ENABLED=False):
+            for _ in range(5):
+                self.assertEqual(self.login().status_code, 401)
+
+    def test_backends_refill(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'throttle.sqlite3')
+            workers = (SQLiteBackend(path), SQLiteBackend(path))
+            for backend in (LocalMemoryBackend(), workers[0]):
+                with self.subTest(backend=type(backend).__name__):
+                    # Capacité 2, un jeton par seconde
+                    self.assertEqual(backend.consume('k', 2, 1.0, 100.0), 0)
+                    self.assertEqual(backend.consume('k', 2, 1.0, 100.0), 0)
+                    self.assertAlmostEqual(backend.consume('k', 2, 1.0, 100.25), 0.75)
+                    self.assertEqual(backend.consume('k', 2, 1.0, 101.5), 0)
+                    backend.reset('k')
+                    self.assertEqual(backend.consume('k', 2, 1.0, 101.5), 0)
+            # Seau partagé par les workers de la machine
+            workers[0].consume('partage', 1, 0.5, 200.0)
+            self.assertAlmostEqual(workers[1].consume('partage', 1, 0.5, 200.0), 2.0)
+
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after_header(0.01), '1')
+        self.assertEqual(retry_after_header(1.2), '2')
+        self.assertEqual(retry_after_header(30), '30')
+
+
+class RetryOnBusyTests(SimpleTestCase):
+    """
+    retry_on_busy face à un vrai verrou d'écriture : base SQLite temporaire
+    (alias créé pour le test), verrou tenu par une autre connexion
+    """
+
+    ALIAS = 'busy'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'busy.sqlite3')
+        connections.settings[self.ALIAS] = {
+            **connections.settings['default'],
+            'NAME': self.path,
+            'TEST': {},
+            # Échec rapide sur le verrou : c'est retry_on_busy qui attend
+            'OPTIONS': {'timeout': 0.01, 'transaction_mode': 'IMMEDIATE'},
+        }
+        self.addCleanup(self.remove_database)
+        # Alias créé à l'exécution : on l'autorise le temps du test
+        patcher = mock.patch.object(type(self), 'databases', {self.ALIAS})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with connections[self.ALIAS].cursor() as cursor:
+            cursor.execute('CREATE TABLE compteurs (valeur INTEGER)')
+        self.calls = 0
+
+    def remove_database(self):
+        connections[self.ALIAS].close()
+        del connections[self.ALIAS]
+        del connections.settings[self.ALIAS]
+        self.tmp_dir.cleanup()
+
+    def write(self, value=1):
+        self.calls += 1
+        with transaction.atomic(using=self.ALIAS):
+            with connections[self.ALIAS].cursor() as cursor:
+                cursor.execute('INSERT INTO compteurs (valeur) VALUES (%s)', [value])
+
+    def retrying(self, **kwargs):
+        return retry_on_busy(self.write, using=self.ALIAS, base_delay=0.01, **kwargs)
+
+    def hold_lock(self, seconds=None):
+        """Verrou d'écriture tenu par un autre processus (autre connexion)"""
+        holder = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        holder.execute('BEGIN IMMEDIATE')
+        if seconds is None:
+            self.addCleanup(holder.close)
+            self.addCleanup(holder.execute, 'ROLLBACK')
+        else:
+            timer = threading.Timer(seconds, lambda: (holder.execute('COMMIT'), holder.close()))
+            timer.start()
+            self.addCleanup(timer.join)
+
+    def count(self):
+        with connections[self.ALIAS].cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM compteurs')
+            return cursor.fetchone()[0]
+
+    def test_succeeds_once_lock_released(self):
+        self.hold_lock(seconds=0.1)
+        with self.assertLogs('core.db', 'WARNING') as logs:
+            self.retrying(attempts=8)()
+        self.assertGreater(self.calls, 1)
+        self.assertEqual(len(logs.records), self.calls - 1)
+        self.assertEqual(self.count(), 1)
+
+    def test_gives_up_after_attempts(self):
+        self.hold_lock()
+        with mock.patch('core.db.time.sleep') as sleep:
+            with self.assertRaisesRegex(OperationalError, 'locked'):
+                self.retrying(attempts=3)()
+        self.assertEqual(self.calls, 3)
+        # Attente exponentielle avec aléa (±50 %)
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0.005 <= delays[0] <= 0.015 and 0.01 <= delays[1] <= 0.03, delays)
+
+    def test_no_retry_inside_atomic_block(self):
+        # Transaction différée : le verrou est pris par un autre après son début
+        connections[self.ALIAS].close()
+        connections[self.ALIAS].settings_dict['OPTIONS'] = {'timeout': 0.01}
+        with self.assertRaisesRegex(OperationalError, 'locked'):
+            with transaction.atomic(using=self.ALIAS):
+                self.count()
+                self.hold_lock()
+                self.retrying(attempts=5)()
+        self.assertEqual(self.calls, 1)
+
+    def test_other_errors_not_retried(self):
+        @retry_on_busy(using=self.ALIAS)
+        def broken():
+            self.calls += 1
+            with connections[self.ALIAS].cursor() as cursor:
+                cursor.execute('INSERT INTO absente VALUES (1)')
+
+        with self.assertRaisesRegex(OperationalError, 'no such table'):
+            broken()
+        self.assertEqual(self.calls, 1)
+
+    def test_concurrent_writers(self):
+        write = self.retrying(attempts=50)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(10):
+                    write()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections[self.ALIAS].close()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        with self.assertLogs('core.db', 'WARNING'):
+            # Verrou tenu au démarrage : au moins une attente garantie
+            self.hold_lock(seconds=0.05)
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.count(), 40)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN est spécifique à SQLite')
+class QueryPlanTests(TestCase):
+    """
+    Vérifie que les requêtes principales de l'application utilisent un index
+    (régression de plan d'exécution)
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(clients=20, techniciens=3, reclamations=200)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.client_user = User.objects.filter(role='client').first()
+        cls.technicien = User.objects.filter(role='technicien').first()
+        cls.superviseur = User.objects.create(
+            username='superviseur', email='superviseur@senelec.sn',
+            telephone='221700000099', role='superviseur',
+        )
+
+    def assertNoFullScan(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        self.assertTrue(ctx.captured_queries)
+        for query in ctx.captured_queries:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plan = [row[-1] for row in cursor.fetchall()]
+            scans = [detail for detail in plan if FULL_SCAN.match(detail)]
+            self.assertEqual(scans, [], f"Parcours complet pour:\n{query['sql']}\n{plan}")
+
+    def list_page(self, user, params=None, pages=2):
+        queryset = filter_reclamations(visible_reclamations(user), params or {})
+        cursor = None
+        for _ in range(pages):
+            _, cursor = paginate_by_cursor(queryset.values(*RECLAMATION_LIST_FIELDS), cursor=cursor, limit=5)
+
+    def test_full_scan_pattern(self):
+        for detail in ('SCAN core_reclamation', 'SCAN TABLE core_reclamation'):
+            self.assertEqual(FULL_SCAN.match(detail).group(1), 'core_reclamation')
+        for detail in ('SCAN core_reclamation USING INDEX reclamation_status_idx',
+                       'SCAN TABLE core_reclamation USING COVERING INDEX reclamation_status_idx',
+                       'SEARCH core_reclamation USING INDEX reclamation_user_idx (user_id=?)'):
+            self.assertIsNone(FULL_SCAN.match(detail))
+
+    def test_dashboard_counts(self):
+        self.assertNoFullScan(compute_dashboard_stats)
+
+    def test_technicien_queue(self):
+        self.assertNoFullScan(lambda: self.list_page(self.technicien))
+        self.assertNoFullScan(lambda: self.list_page(self.technicien, {'status': 'en_attente,en_cours'}))
+        self.assertNoFullScan(lambda: list(
+            Reclamation.objects.filter(technicien=self.technicien, status__in=['en_attente', 'en_cours'])
+            .order_by('date_created').values_list('id', flat=True)
+        ))
+
+    def test_client_history(self):
+        self.assertNoFullScan(lambda: self.list_page(self.client_user))
+
+    def test_supervisor_listing(self):
+        self.assertNoFullScan(lambda: self.list_page(self.superviseur))
+        self.assertNoFullScan(lambda: self.list_page(self.superviseur, {'status': 'resolu'}))
+
+
+class ConditionalRequestTests(TestCase):
+    """
+    Les requêtes conditionnelles qui correspondent reçoivent un 304 sans
+    exécuter la vue : au plus une requête SQL (version des catégories)
+    """
+
+    READ_ENDPOINTS = (
+        '/',
+        '/api/dashboard/',
+        '/api/dashboard/statistiques-generales/',
+        '/api/categories/',
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        Categories.objects.create(nom='Coupure')
+        User.objects.create(
+            username='client@senelec.sn', email='client@senelec.sn',
+            telephone='221700000001', role='client',
+        )
+
+    def test_not_modified_with_at_most_one_query(self):
+        for path in self.READ_ENDPOINTS:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+                self.assertLessEqual(len(ctx.captured_queries), 1)
+
+    def test_not_modified_logged_in_without_loading_user(self):
+        self.client.force_login(User.objects.get(role='client'))
+        for path in self.READ_ENDPOINTS:
+            with self.subTest(path=path):
+                etag = self.client.get(path)['ETag']
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertLessEqual(len(ctx.captured_queries), 1)
+                if path != '/api/categories/':
+                    self.assertIn('private', response['Cache-Control'])
+                    self.assertIn('Cookie', response['Vary'])
+
+    def test_max_age_read_per_request(self):
+        with override_settings(READ_CACHE_MAX_AGE=5):
+            response = self.client.get('/api/dashboard/')
+        self.assertIn('max-age=5', response['Cache-Control'])
+
+    def test_if_modified_since(self):
+        path = '/api/dashboard/statistiques-generales/'
+        last_modified = self.client.get(path)['Last-Modified']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertLessEqual(len(ctx.captured_queries), 1)
+
+    def test_change_invalidates_etag(self):
+        path = '/api/dashboard/statistiques-generales/'
+        etag = self.client.get(path)['ETag']
+        User.objects.create(
+            username='tech@senelec.sn', email='tech@senelec.sn',
+            telephone='221700000002', role='technicien',
+        )
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['statistics']['total_techniciens'], 1)
+
+    def test_fresh_skips_validation(self):
+        path = '/api/dashboard/statistiques-generales/'
+        etag = self.client.get(path)['ETag']
+        response = self.client.get(path + '?fresh=1', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cache_headers_by_role(self):
+        response = self.client.get('/api/dashboard/')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+
+        client_user = User.objects.get(role='client')
+        self.client.force_login(client_user)
+        response = self.client.get('/api/dashboard/')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('no-cache', response['Cache-Control'])
+
+        client_user.role = 'superviseur'
+        client_user.save()
+        response = self.client.get('/api/dashboard/')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    async def test_async_view_not_modified(self):
+        factory = AsyncRequestFactory()
+        request = factory.get('/api/dashboard/statistiques-generales/')
+        request.auser = self.anonymous_user
+        etag = (await async_views.dashboard_stats_view(request))['ETag']
+
+        request = factory.get('/api/dashboard/statistiques-generales/', headers={'If-None-Match': etag})
+        request.auser = self.anonymous_user
+        # Validateurs asynchrones : pas de passage par le thread partagé de sync_to_async
+        with mock.patch('core.http.sync_to_async', side_effect=AssertionError('sync_to_async')):
+            response = await async_views.dashboard_stats_view(request)
+        self.assertEqual(response.status_code, 304)
+
+    @staticmethod
+    async def anonymous_user():
+        return AnonymousUser()
+
+
+class CategoriesETagTests(TestCase):
+    """Catégories : aller-retour ETag / 304 et invalidation par la version du jeu de données"""
+
+    url = '/api/categories/'
+
+    def setUp(self):
+        from .views import categories_payload
+        # Le cache du processus survit au rollback des tests : version rejouée
+        self.payload = categories_payload
+        self.payload._entry = None
+        self.addCleanup(setattr, categories_payload, '_entry', None)
+        self.coupure = Categories.objects.create(nom='Coupure', description='Plus de courant')
+
+    def test_round_trip(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]{32}"$')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', response)
+        self.assertEqual([c['nom'] for c in response.json()['categories']], ['Coupure'])
+
+        for if_none_match in (etag, f'W/{etag}', f'"autre", {etag}', '*'):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.client.get(self.url, HTTP_IF_NONE_MATCH=if_none_match)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"perime"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_body_built_once_per_version(self):
+        with mock.patch.object(self.payload, 'build', wraps=self.payload.build) as build:
+            etag = self.client.get(self.url)['ETag']
+            for _ in range(3):
+                self.client.get(self.url)
+                self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(build.call_count, 1)
+
+    def test_changes_invalidate_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        changes = (
+            lambda: Categories.objects.create(nom='Facturation'),
+            lambda: setattr(self.coupure, 'description', 'Délestage') or self.coupure.save(),
+            lambda: setattr(self.coupure, 'is_active', False) or self.coupure.save(),
+        )
+        seen = {etag}
+        for change in changes:
+            change()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertNotIn(etag, seen)
+            seen.add(etag)
+        self.assertEqual([c['nom'] for c in response.json()['categories']], ['Facturation'])
+
+    def test_version_bumped_by_other_process(self):
+        from .models import DataVersion
+        from .versioning import CATEGORIES
+        etag = self.client.get(self.url)['ETag']
+        # Modification directe en base (autre worker) : seule la version change ici
+        Categories.objects.filter(pk=self.coupure.pk).update(nom='Coupure générale')
+        DataVersion.objects.filter(nom=CATEGORIES).update(version=F('version') + 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['categories'][0]['nom'], 'Coupure générale')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'La réplique est copiée avec l\'API de sauvegarde SQLite')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Routage vers une réplique SQLite (fichier temporaire) alimentée par
+    refresh_replica à partir de la base principale de test
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        connections.settings[REPLICA] = {
+            **connections.settings['default'],
+            'NAME': os.path.join(self.tmp_dir.name, 'replica.sqlite3'),
+        }
+        self.addCleanup(self.remove_replica)
+        # Alias créé à l'exécution : on l'autorise le temps du test
+        patcher = mock.patch.object(type(self), 'databases', {'default', REPLICA})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Hors requête, l'épinglage d'un test ne doit pas fuir vers le suivant
+        scope = pin_scope()
+        scope.__enter__()
+        self.addCleanup(scope.__exit__, None, None, None)
+
+    def remove_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        self.tmp_dir.cleanup()
+
+    def refresh(self):
+        call_command('refresh_replica', stdout=io.StringIO())
+
+    def stats(self, **kwargs):
+        return self.client.get('/api/dashboard/statistiques-generales/?fresh=1', **kwargs).json()['statistics']
+
+    def test_fallback_without_replica_file(self):
+        with replica_reads():
+            self.assertEqual(read_alias(), 'default')
+            self.assertEqual(Categories.objects.count(), 0)
+
+    def test_designated_reads_use_replica_until_refresh(self):
+        self.refresh()
+        Categories.objects.create(nom='Coupure')
+        self.assertEqual(Categories.objects.count(), 1)
+
+        # Requête suivante, sans écriture : la réplique n'est pas encore à jour
+        with pin_scope(), replica_reads():
+            self.assertEqual(read_alias(), REPLICA)
+            self.assertEqual(Categories.objects.count(), 0)
+
+        self.refresh()
+        with pin_scope(), replica_reads():
+            self.assertEqual(Categories.objects.count(), 1)
+
+    def test_write_pins_to_primary(self):
+        self.refresh()
+        with replica_reads():
+            Categories.objects.create(nom='Coupure')
+            self.assertTrue(is_pinned())
+            self.assertEqual(read_alias(), 'default')
+            self.assertEqual(Categories.objects.count(), 1)
+
+    def test_dashboard_reads_replica_and_pin_cookie(self):
+        self.refresh()
+        Categories.objects.create(nom='Coupure')
+
+        # Réplique en retard : la catégorie n'y est pas encore
+        response_stats = self.stats()
+        self.assertEqual(response_stats['total_categories'], 0)
+        self.assertNotIn(PIN_COOKIE, self.client.cookies)
+
+        # Un client qui vient d'écrire lit la base principale
+        self.client.cookies[PIN_COOKIE] = '1'
+        response = self.client.get('/api/dashboard/statistiques-generales/?fresh=1')
+        self.assertEqual(response.json()['statistics']['total_categories'], 1)
+        # Une simple lecture ne prolonge pas l'épinglage
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writing_request_sets_pin_cookie(self):
+        self.refresh()
+        response = self.client.post(
+            '/api/add-user/',
+            data='{"nom": "Diop", "prenom": "Awa", "email": "awa@senelec.sn", '
+                 '"telephone": "221700000010", "role": "client"}',
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 60)
+
+        # Déjà épinglé : seule une nouvelle écriture repose le cookie
+        response = self.client.get('/api/categories/')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        response = self.client.post(
+            '/api/send-credentials/', data='{"email": "awa@senelec.sn"}', content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+@override_settings(
+    LOGIN_THROTTLE_ENABLED=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class WorkloadTests(TransactionTestCase):
+    """Le harnais de `manage.py bench` rejoue le mélange sans erreur"""
+
+    def test_mixed_workload(self):
+        seed_dataset(clients=10, techniciens=2, reclamations=100)
+        users = list(User.objects.filter(role='client'))
+
+        # Une base SQLite en mémoire partagée verrouille ses tables : un seul thread
+        results = run_workload(users, requests=60, concurrency=1, seed=1)
+
+        self.assertEqual(results['requests'], 60)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(set(results['operations']), set(WORKLOAD_MIX))
+        self.assertEqual(sum(op['requests'] for op in results['operations'].values()), 60)
+        self.assertLessEqual(results['ms_p50'], results['ms_p99'])
+        self.assertGreater(results['queries_per_request'], 0)
+        self.assertEqual(User.objects.filter(email__startswith='bench-new-').count(),
+                         results['operations']['create_user']['requests'])
+
+
+class SyntheticDataTests(TestCase):
+    """Générateur de create_default_data --scale : reproductible et cohérent"""
+
+    def generate(self, now=None):
+        return generate_dataset(clients=50, techniciens=5, reclamations=500, seed=7, chunk_size=200, now=now)
+
+    def test_deterministic_with_seed(self):
+        now = timezone.now()
+        client_ids, _, _ = self.generate(now)
+        first = list(Reclamation.objects.order_by('pk').values_list('pk', 'status', 'user_id', 'technicien_id'))
+        Reclamation.objects.all().delete()
+        User.objects.filter(pk__in=client_ids).delete()
+        User.objects.filter(role='technicien').delete()
+        Categories.objects.all().delete()
+
+        self.generate(now)
+        second = list(Reclamation.objects.order_by('pk').values_list('pk', 'status', 'user_id', 'technicien_id'))
+        self.assertEqual(first, second)
+
+    def test_command_reference_date(self):
+        command = 'core.management.commands.create_default_data.generate_dataset'
+        with mock.patch(command) as generate, \
+                override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            call_command('create_default_data', '--scale', '--now', '2026-01-01', stdout=io.StringIO())
+        self.assertEqual(generate.call_args.kwargs['now'], datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        with self.assertRaises(CommandError):
+            call_command('create_default_data', '--scale', '--now', 'hier', stdout=io.StringIO())
+
+    def test_realistic_rows(self):
+        self.generate()
+        self.assertEqual(User.objects.filter(role='client').count(), 50)
+        self.assertEqual(User.objects.values('telephone').distinct().count(), 55)
+        self.assertEqual(Reclamation.objects.count(), 500)
+        self.assertLessEqual(set(Reclamation.objects.values_list('status', flat=True)), set(STATUS_WEIGHTS))
+        self.assertFalse(Reclamation.objects.filter(status='en_attente', technicien__isnull=False).exists())
+        self.assertFalse(Reclamation.objects.filter(status='resolu', dateReponse__isnull=True).exists())
+        self.assertGreater(Reclamation.objects.dates('date_created', 'day').count(), 30)
+
+        # Identifiants UUID version 7 horodatés à la date de création
+        reclamation = Reclamation.objects.first()
+        self.assertEqual(reclamation.pk.version, 7)
+        self.assertAlmostEqual(
+            uuid7_timestamp_ms(reclamation.pk), reclamation.date_created.timestamp() * 1000, delta=1,
+        )
+
+        # Les comptes générés se connectent avec le mot de passe partagé
+        user = User.objects.filter(role='client').first()
+        self.assertTrue(user.check_password('benchmark'))
+
+
+class MetricsTests(TestCase):
+    """Instrumentation par vue et export Prometheus de /api/metrics"""
+
+    def setUp(self):
+        metrics_registry.reset()
+        self.addCleanup(metrics_registry.reset)
+
+    def test_records_latency_sql_and_size_per_view(self):
+        Categories.objects.create(nom='Coupure')
+        self.client.get('/api/categories/')
+        self.client.get('/api/categories/')
+        self.client.get('/introuvable/')
+
+        with override_settings(DEBUG=True):
+            response = self.client.get('/api/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+
+        view = 'view="core:categories",method="GET"'
+        self.assertIn(f'senelec_http_request_duration_seconds_count{{{view}}} 2', body)
+        self.assertIn(f'senelec_http_request_duration_seconds_bucket{{{view},le="+Inf"}} 2', body)
+        self.assertIn(f'senelec_http_response_size_bytes_count{{{view}}} 2', body)
+        self.assertIn(f'senelec_http_responses_total{{{view},status="200"}} 2', body)
+        self.assertIn('senelec_http_responses_total{view="non_resolue",method="GET",status="404"} 1', body)
+        self.assertIn('senelec_login_throttle_decisions_total{decision="autorisees"}', body)
+
+        queries = re.search(rf'senelec_db_queries_total{{{view}}} (\d+)', body)
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_unknown_methods_share_one_series(self):
+        for method in ('FOO', 'XYZ123', 'PURGE'):
+            self.client.generic(method, '/introuvable/')
+        body = metrics_registry.render()
+        self.assertIn('senelec_http_responses_total{view="non_resolue",method="other",status="404"} 3', body)
+        self.assertNotIn('FOO', body)
+
+    def test_sql_outside_requests_is_not_counted(self):
+        Categories.objects.count()
+        self.assertNotIn('senelec_db_queries_total{', metrics_registry.render())
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_required_when_configured(self):
+        self.assertEqual(self.client.get('/api/metrics').status_code, 403)
+        response = self.client.get('/api/metrics', headers={'Authorization': 'Bearer s3cret'})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=True)
+    def test_remote_access_denied_without_token(self):
+        response = self.client.get('/api/metrics', REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None, DEBUG=False)
+    def test_local_access_denied_without_token_in_production(self):
+        # Derrière un proxy local, 127.0.0.1 est l'adresse de tout le monde
+        for remote_addr in ('127.0.0.1', '::1'):
+            response = self.client.get('/api/metrics', REMOTE_ADDR=remote_addr)
+            self.assertEqual(response.status_code, 403)
+
+
+class ProfilingTests(TestCase):
+    """Profilage à la demande (en-tête privilégié) et commande profile_summary"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings = override_settings(
+            PROFILING_ENABLED=True, PROFILING_TOKEN='s3cret', PROFILING_SAMPLE_RATE=0,
+            PROFILING_DIR=self.directory.name, PROFILING_MAX_FILES=2,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        Categories.objects.create(nom='Coupure')
+
+    def profile(self, token='s3cret'):
+        return self.client.get('/api/categories/', headers={PROFILE_HEADER: token})
+
+    def test_disabled_middleware_is_removed(self):
+        with override_settings(PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: None)
+
+    def test_header_writes_profile_and_sql_trace(self):
+        self.assertNotIn(PROFILE_ID_HEADER, self.client.get('/api/categories/'))
+        self.assertNotIn(PROFILE_ID_HEADER, self.profile(token='mauvais'))
+
+        response = self.profile()
+        profile_id = response[PROFILE_ID_HEADER]
+        directory = os.path.join(self.directory.name, profile_id)
+        self.assertTrue(os.path.exists(f'{directory}.prof'))
+        with open(f'{directory}.sql.json') as f:
+            trace = json.load(f)
+        self.assertEqual((trace['view'], trace['status'], trace['trigger']), ('core:categories', 200, 'header'))
+        self.assertGreater(trace['sql_count'], 0)
+        self.assertTrue(all(query['sql'].startswith('SELECT') for query in trace['queries']))
+
+    def test_rotation_and_summary(self):
+        for _ in range(3):
+            self.profile()
+        self.assertEqual(len([name for name in os.listdir(self.directory.name) if name.endswith('.prof')]), 2)
+
+        out = io.StringIO()
+        call_command('profile_summary', limit=5, stdout=out)
+        output = out.getvalue()
+        self.assertIn('2 profils', output)
+        self.assertIn('core:categories', output)
+        self.assertIn('Requêtes SQL', output)
+        self.assertNotIn('ASGI', output)
+
+    async def test_asgi_profiles_are_flagged(self):
+        response = await AsyncClient().get('/api/categories/', headers={PROFILE_HEADER: 's3cret'})
+        with open(os.path.join(self.directory.name, f'{response[PROFILE_ID_HEADER]}.sql.json')) as f:
+            self.assertEqual(json.load(f)['serveur'], 'asgi')
+
+        out = io.StringIO()
+        await sync_to_async(call_command)('profile_summary', stdout=out)
+        self.assertIn('1 profil(s) ASGI', out.getvalue())
+        await sync_to_async(self.profile)()
+        out = io.StringIO()
+        await sync_to_async(call_command)('profile_summary', wsgi_only=True, stdout=out)
+        self.assertIn('1 profils', out.getvalue())
+        self.assertNotIn('ASGI', out.getvalue())
+
+
+@override_settings(
+    LOGIN_THROTTLE_ENABLED=False,
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+)
+class TokenAuthenticationTests(TestCase):
+    """Jetons d'accès signés : émission, cache des utilisateurs, révocation, rafraîchissement"""
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.client_user = User.objects.create(
+            username='client-jeton', email='client-jeton@senelec.sn', telephone='221770000001',
+            nom='Ndiaye', prenom='Awa', role='client', password=make_password('secret'),
+        )
+
+    def login(self, email='client-jeton@senelec.sn'):
+        response = self.client.post(
+            '/api/login/', {'email_or_phone': email, 'password': 'secret'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get_list(self, token):
+        return self.client.get('/api/reclamations/', headers={'Authorization': f'Bearer {token}'})
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh_token': token}, content_type='application/json')
+
+    def test_client_login_issues_tokens_without_session(self):
+        tokens = self.login()
+        self.assertEqual(tokens['token_type'], 'Bearer')
+        self.assertFalse(Session.objects.exists())
+        self.client_user.refresh_from_db()
+        self.assertIsNotNone(self.client_user.last_login)
+
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 200)
+        # Utilisateur en cache : seule la requête de la liste reste
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_list(tokens['access_token']).status_code, 200)
+
+    def test_staff_login_keeps_session(self):
+        User.objects.create(
+            username='admin-jeton', email='admin-jeton@senelec.sn', telephone='221770000002',
+            nom='Fall', prenom='Moussa', role='admin', password=make_password('secret'),
+        )
+        self.assertIn('access_token', self.login('admin-jeton@senelec.sn'))
+        self.assertTrue(Session.objects.exists())
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        tokens = self.login()
+        response = self.client.post('/api/logout/', headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 401)
+        self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+
+    def test_refresh_and_token_types(self):
+        tokens = self.login()
+        response = self.refresh(tokens['refresh_token'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_list(response.json()['access_token']).status_code, 200)
+
+        # Un jeton ne vaut que pour son usage
+        self.assertEqual(self.refresh(tokens['access_token']).status_code, 401)
+        self.assertEqual(self.get_list(tokens['refresh_token']).status_code, 401)
+
+        with override_settings(ACCESS_TOKEN_LIFETIME=-1):
+            self.assertEqual(self.get_list(tokens['access_token']).status_code, 401)
+
+    def test_refresh_token_is_single_use(self):
+        tokens = self.login()
+        rotated = self.refresh(tokens['refresh_token']).json()
+        # Le jeton échangé est consommé, même rejoué plus tard
+        self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+        # Le nouveau jeton sert une fois, et les jetons d'accès restent valides
+        self.assertEqual(self.refresh(rotated['refresh_token']).status_code, 200)
+        self.assertEqual(self.refresh(rotated['refresh_token']).status_code, 401)
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 200)
+        self.client_user.refresh_from_db()
+        self.assertEqual(self.client_user.refresh_counter, 2)
+
+    def test_credential_reset_revokes_tokens(self):
+        tokens = self.login()
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 200)
+        response = self.client.post(
+            '/api/send-credentials/', {'email': 'client-jeton@senelec.sn'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 401)
+
+    def test_password_change_revokes_tokens(self):
+        tokens = self.login()
+        user = User.objects.get(pk=self.client_user.pk)
+        user.set_password('nouveau')
+        user.save(update_fields=['password'])
+        self.assertEqual(self.refresh(tokens['refresh_token']).status_code, 401)
+        # Sans changement de mot de passe, la version ne bouge pas
+        user.nom = 'Ndiaye-Sy'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).token_version, user.token_version)
+
+    def test_deactivated_user_is_rejected(self):
+        tokens = self.login()
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 200)
+        self.client_user.is_active = False
+        self.client_user.save()
+        self.assertEqual(self.get_list(tokens['access_token']).status_code, 401)
+
+
+class UUID7Tests(TestCase):
+    """Clés primaires UUID version 7"""
+
+    def test_uuid7_is_time_ordered(self):
+        before = int(time.time() * 1000)
+        ids = [uuid7() for _ in range(5000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual({(value.version, value.variant) for value in ids}, {(7, uuid.RFC_4122)})
+        self.assertLessEqual(before, uuid7_timestamp_ms(ids[0]))
+
+    def test_new_rows_ordered_by_creation(self):
+        category = Categories.objects.create(nom='Coupure')
+        client = User.objects.create(
+            username='client-uuid7', email='client-uuid7@senelec.sn', telephone='221770000010',
+            nom='Sow', prenom='Fatou', role='client',
+        )
+        # Une ligne uuid4 existante reste lisible à côté des nouvelles
+        legacy = Reclamation.objects.create(id=uuid.uuid4(), description='Ancienne', user=client, categories=category)
+        created = [
+            Reclamation.objects.create(description=f'Coupure {i}', user=client, categories=category).pk
+            for i in range(5)
+        ]
+        self.assertEqual(client.pk.version, 7)
+        self.assertEqual(
+            list(Reclamation.objects.exclude(pk=legacy.pk).order_by('pk').values_list('pk', flat=True)),
+            created,
+        )
+        self.assertEqual(Reclamation.objects.get(pk=legacy.pk).description, 'Ancienne')
+
+
+@override_settings(OUTAGE_THRESHOLD=3, OUTAGE_WINDOW=600)
+class OutageDetectionTests(TestCase):
+    """Regroupement des pannes de zone en incidents et traitement en bloc"""
+
+    def setUp(self):
+        self.panne = Categories.objects.create(nom='Panne Électrique')
+        self.facture = Categories.objects.create(nom='Facturation')
+        outage_detector.reset()
+        self.addCleanup(outage_detector.reset)
+        self.medina = [self.make_user(f'medina{i}', 'Villa 12, Médina, Dakar') for i in range(5)]
+        self.pikine = self.make_user('pikine', 'Pikine')
+        self.technicien = self.make_user('tech', 'Dakar', role='technicien')
+        self.superviseur = self.make_user('sup', 'Dakar', role='superviseur')
+
+    phones = itertools.count(1)
+
+    def make_user(self, name, adresse, role='client'):
+        return User.objects.create(
+            username=name, email=f'{name}@senelec.sn', telephone=f'2217798{next(self.phones):05d}',
+            nom='Diop', prenom=name, role=role, adresse=adresse,
+        )
+
+    def report(self, user, categorie=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            reclamation = Reclamation.objects.create(
+                description='Coupure de courant', user=user, categories=categorie or self.panne,
+            )
+        reclamation.refresh_from_db()
+        return reclamation
+
+    def test_normalize_zone(self):
+        self.assertEqual(self.medina[0].zone, 'medina-dakar')
+        self.assertEqual(normalize_zone('Parcelles Assainies, Dakar'), 'parcelles-assainies-dakar')
+        self.assertEqual(normalize_zone('Pikine'), 'pikine')
+        self.assertIsNone(normalize_zone('12 rue 10'))
+
+    def test_threshold_raises_incident_grouping_tickets(self):
+        first = [self.report(user) for user in self.medina[:2]]
+        self.report(self.pikine)
+        self.report(self.medina[2], categorie=self.facture)
+        self.assertFalse(Incident.objects.exists())
+
+        third = self.report(self.medina[3])
+        incident = Incident.objects.get()
+        self.assertEqual((incident.zone, incident.status), ('medina-dakar', 'ouvert'))
+        self.assertEqual(third.incident_id, incident.pk)
+        self.assertEqual(
+            set(incident.reclamations.values_list('pk', flat=True)), {first[0].pk, first[1].pk, third.pk},
+        )
+
+        # Incident ouvert : les réclamations suivantes de la zone y sont rattachées
+        self.assertEqual(self.report(self.medina[4]).incident_id, incident.pk)
+
+    def test_window_slides(self):
+        start = timezone.now()
+        for i, pk in enumerate([uuid7() for _ in range(4)]):
+            # 6 minutes entre deux réclamations : jamais 3 dans la fenêtre de 10 minutes
+            outage_detector.observe(pk, 'medina-dakar', start + timedelta(minutes=6 * i))
+        self.assertFalse(Incident.objects.exists())
+
+    def test_rebuild_from_database(self):
+        self.report(self.medina[0])
+        self.report(self.medina[1])
+        outage_detector.reset()
+        with self.assertNumQueries(3):
+            outage_detector.seed()
+        self.assertEqual(outage_detector.snapshot()[0], {'medina-dakar': 2})
+
+        self.report(self.medina[2])
+        incident = Incident.objects.get()
+        outage_detector.reset()
+        self.assertEqual(outage_detector.snapshot(), ({}, {'medina-dakar': incident.pk}))
+
+    def test_bulk_handling(self):
+        for user in self.medina[:3]:
+            self.report(user)
+        incident = Incident.objects.get()
+        url = f'/api/incidents/{incident.pk}/traiter/'
+
+        self.client.force_login(self.medina[0])
+        self.assertEqual(self.client.post(url, {'action': 'resoudre'}, content_type='application/json').status_code, 403)
+
+        self.client.force_login(self.technicien)
+        response = self.client.get('/api/incidents/')
+        self.assertEqual(response.json()['incidents'][0]['reclamations_ouvertes'], 3)
+        response = self.client.post(url, {'action': 'prendre_en_charge'}, content_type='application/json')
+        self.assertEqual(response.json()['updated'], 3)
+        self.assertEqual(
+            set(incident.reclamations.values_list('status', 'technicien_id')), {('en_cours', self.technicien.pk)},
+        )
+
+        self.client.force_login(self.superviseur)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'action': 'resoudre'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(incident.reclamations.exclude(status='resolu').exists())
+        self.assertFalse(incident.reclamations.filter(dateReponse__isnull=True).exists())
+        incident.refresh_from_db()
+        self.assertEqual(incident.status, 'resolu')
+
+        # Zone libérée : une nouvelle panne repart d'une fenêtre vide
+        self.assertIsNone(self.report(self.medina[3]).incident_id)
+
+    def raise_incident(self):
+        for user in self.medina[:3]:
+            self.report(user)
+        return Incident.objects.get()
+
+    def test_incident_resolved_by_other_process_is_released(self):
+        incident = self.raise_incident()
+        # Résolu par un autre worker : ce détecteur n'en sait rien
+        Incident.objects.filter(pk=incident.pk).update(status='resolu')
+
+        self.assertIsNone(self.report(self.medina[3]).incident_id)
+        self.assertEqual(outage_detector.snapshot(), ({'medina-dakar': 1}, {}))
+
+    def test_reclamation_attached_elsewhere_is_not_reported(self):
+        incident = self.raise_incident()
+        other = Incident.objects.create(zone='pikine', categories=self.panne, date_debut=timezone.now())
+        reclamation = Reclamation.objects.create(
+            description='Coupure de courant', user=self.medina[3], categories=self.panne, incident=other,
+        )
+        self.assertIsNone(outage_detector.observe(reclamation.pk, 'medina-dakar', reclamation.date_created))
+        self.assertEqual(Reclamation.objects.get(pk=reclamation.pk).incident_id, other.pk)
+        # L'incident de la zone reste suivi, sans fenêtre
+        self.assertEqual(outage_detector.snapshot(), ({}, {'medina-dakar': incident.pk}))
+
+    def test_incident_resolved_from_admin_is_released(self):
+        incident = self.raise_incident()
+        with self.captureOnCommitCallbacks(execute=True):
+            incident.status = 'resolu'
+            incident.save()
+        self.assertEqual(outage_detector.snapshot()[1], {})
+        self.assertIsNone(self.report(self.medina[3]).incident_id)
+
+    def test_database_writes_outside_lock(self):
+        from . import outages
+        held = []
+
+        def lock_is_free():
+            # Depuis un autre thread : le verrou réentrant ne masque rien
+            def probe():
+                if outage_detector._lock.acquire(blocking=False):
+                    outage_detector._lock.release()
+                    held.append(False)
+                else:
+                    held.append(True)
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+
+        def spy(function):
+            def wrapper(*args, **kwargs):
+                lock_is_free()
+                return function(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(outages, 'open_incident', spy(outages.open_incident)), \
+                mock.patch.object(outages, 'attach', spy(outages.attach)), \
+                mock.patch.object(outage_detector, 'seed', spy(outage_detector.seed)):
+            self.raise_incident()
+            self.report(self.medina[3])
+        # Reconstruction, création de l'incident, rattachement de la réclamation suivante
+        self.assertGreaterEqual(len(held), 3)
+        self.assertFalse(any(held))
+
+    def test_zone_follows_address(self):
+        user = User.objects.get(pk=self.pikine.pk)
+        user.adresse = 'Rue 5, Guédiawaye, Dakar'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).zone, 'guediawaye-dakar')
+
+        user = User.objects.get(pk=user.pk)
+        user.adresse = 'Thiaroye, Pikine'
+        user.save(update_fields=['adresse'])
+        self.assertEqual(User.objects.get(pk=user.pk).zone, 'thiaroye-pikine')
+
+        # Zone saisie à la main : conservée tant que l'adresse ne change pas
+        user.zone = 'pikine-est'
+        user.save()
+        user = User.objects.get(pk=user.pk)
+        user.nom = 'Ndiaye'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).zone, 'pikine-est')
+        # ... ou si elle est modifiée avec l'adresse
+        user.adresse = 'Yeumbeul, Pikine'
+        user.zone = 'yeumbeul'
+        user.save()
+        self.assertEqual(User.objects.get(pk=user.pk).zone, 'yeumbeul')
+
+    def test_concurrent_take_over_conflicts(self):
+        incident = self.raise_incident()
+        other = self.make_user('tech2', 'Dakar', role='technicien')
+        # Deux requêtes lisent l'incident libre avant que l'une ne le prenne
+        first, second = Incident.objects.get(pk=incident.pk), Incident.objects.get(pk=incident.pk)
+        self.assertEqual(handle_incident(first, 'prendre_en_charge', technicien_id=self.technicien.pk), 3)
+        with self.assertRaises(IncidentConflict):
+            handle_incident(second, 'prendre_en_charge', technicien_id=other.pk)
+        incident.refresh_from_db()
+        self.assertEqual((incident.status, incident.technicien_id), ('en_cours', self.technicien.pk))
+        self.assertEqual(set(incident.reclamations.values_list('technicien_id', flat=True)), {self.technicien.pk})
+
+        # Même course via l'API : 409, rien n'est modifié
+        stale = Incident.objects.get(pk=incident.pk)
+        stale.technicien_id, stale.status = None, 'ouvert'
+        self.client.force_login(other)
+        with mock.patch.object(Incident.objects, 'get', return_value=stale):
+            response = self.client.post(
+                f'/api/incidents/{incident.pk}/traiter/', {'action': 'prendre_en_charge'},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(response.json()['success'])
+        incident.refresh_from_db()
+        self.assertEqual(incident.technicien_id, self.technicien.pk)
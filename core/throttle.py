@@ -0,0 +1,226 @@
+"""
+Limitation des tentatives de connexion (seau à jetons) par adresse IP et par
+identifiant (email ou téléphone), vérifiée avant authenticate() : une rafale
+de tentatives est rejetée sans payer la vérification PBKDF2.
+
+Le stockage des seaux est interchangeable (LOGIN_THROTTLE_BACKEND) :
+- LocalMemoryBackend : mémoire du processus (par défaut), quelques microsecondes
+- SQLiteBackend : fichier SQLite local partagé par tous les workers de la machine
+"""
+from collections import OrderedDict
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+import logging
+import math
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATES = {
+    'ip': '30/min',
+    'identifiant': '5/min',
+}
+
+PERIODS = {'s': 1, 'sec': 1, 'min': 60, 'h': 3600, 'hour': 3600}
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacité, jetons par seconde)"""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class LocalMemoryBackend:
+    """Seaux en mémoire du processus, bornés en nombre (les plus anciens sont évincés)"""
+
+    blocking = False
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        """Retire un jeton ; retourne 0 si autorisé, sinon le délai d'attente (secondes)"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+                if len(self._buckets) >= self.max_entries:
+                    self._buckets.popitem(last=False)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                self._buckets.move_to_end(key)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SQLiteBackend:
+    """
+    Seaux dans un fichier SQLite (WAL, sans fsync : l'état est jetable) partagé
+    par les processus d'une même machine. Une seule instruction UPSERT ... RETURNING
+    met à jour le seau de façon atomique.
+    """
+
+    blocking = True
+
+    CONSUME_SQL = """
+        INSERT INTO buckets (key, tokens, updated) VALUES (:key, :capacity - 1, :now)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = MIN(:capacity, tokens + (:now - updated) * :rate) - 1,
+            updated = :now
+        WHERE MIN(:capacity, tokens + (:now - updated) * :rate) >= 1
+        RETURNING tokens
+    """
+
+    def __init__(self, path, timeout=1.0, purge_every=10_000, max_idle=3600):
+        self.path = str(path)
+        self.timeout = timeout
+        self.purge_every = purge_every
+        self.max_idle = max_idle
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.conn = conn
+            self._local.calls = 0
+        return conn
+
+    def consume(self, key, capacity, rate, now):
+        conn = self._connection()
+        self._local.calls += 1
+        if self._local.calls % self.purge_every == 0:
+            # Un seau inactif depuis max_idle est plein : inutile de le garder
+            conn.execute('DELETE FROM buckets WHERE updated < ?', (now - self.max_idle,))
+
+        params = {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+        if conn.execute(self.CONSUME_SQL, params).fetchone() is not None:
+            return 0
+        tokens, updated = conn.execute(
+            'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+        ).fetchone()
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        return (1 - tokens) / rate
+
+    def reset(self, key):
+        self._connection().execute('DELETE FROM buckets WHERE key = ?', (key,))
+
+
+class LoginThrottle:
+    """Applique les limites par IP et par identifiant, et compte les décisions"""
+
+    def __init__(self, backend, rates=None, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.rates = {scope: parse_rate(rate) for scope, rate in (rates or DEFAULT_RATES).items()}
+        self._metrics_lock = threading.Lock()
+        self.metrics = {'autorisees': 0, 'erreurs_backend': 0, **{f'bloquees_{scope}': 0 for scope in self.rates}}
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self.metrics[name] += 1
+
+    def keys(self, request, identifier):
+        return {
+            'ip': f'ip:{client_ip(request)}',
+            'identifiant': f'id:{identifier.strip().lower()}',
+        }
+
+    def check(self, request, identifier):
+        """
+        Consomme un jeton par portée. Retourne 0 si la tentative est autorisée,
+        sinon le délai (secondes) avant la prochaine tentative possible.
+        En cas d'erreur du stockage, la tentative est autorisée (fail-open).
+        """
+        if not self.enabled:
+            return 0
+        now = time.time()
+        for scope, key in self.keys(request, identifier).items():
+            capacity, rate = self.rates[scope]
+            try:
+                retry_after = self.backend.consume(key, capacity, rate, now)
+            except Exception as e:
+                logger.error("Limiteur de connexion indisponible: %s", e)
+                self._count('erreurs_backend')
+                return 0
+            if retry_after:
+                self._count(f'bloquees_{scope}')
+                logger.warning("Connexion limitée (%s) pour %s", scope, key)
+                return retry_after
+        self._count('autorisees')
+        return 0
+
+    def succeeded(self, request, identifier):
+        """Une connexion réussie remet à plein le seau de l'identifiant"""
+        if not self.enabled:
+            return
+        try:
+            self.backend.reset(self.keys(request, identifier)['identifiant'])
+        except Exception as e:
+            logger.error("Limiteur de connexion indisponible: %s", e)
+            self._count('erreurs_backend')
+
+    def snapshot(self):
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+
+def client_ip(request):
+    if getattr(settings, 'LOGIN_THROTTLE_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def retry_after_header(retry_after):
+    return str(max(1, math.ceil(retry_after)))
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                backend_class = import_string(
+                    getattr(settings, 'LOGIN_THROTTLE_BACKEND', 'core.throttle.LocalMemoryBackend')
+                )
+                _throttle = LoginThrottle(
+                    backend_class(**getattr(settings, 'LOGIN_THROTTLE_OPTIONS', {})),
+                    getattr(settings, 'LOGIN_THROTTLE_RATES', None),
+                    getattr(settings, 'LOGIN_THROTTLE_ENABLED', True),
+                )
+    return _throttle
+
+
+@receiver(setting_changed)
+def reset_login_throttle(setting, **kwargs):
+    """Reconstruit le limiteur quand sa configuration change (tests, benchmarks)"""
+    global _throttle
+    if setting.startswith('LOGIN_THROTTLE'):
+        _throttle = None
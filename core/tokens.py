@@ -0,0 +1,239 @@
+"""
+Authentification sans état par jetons signés, pour les clients de l'API.
+
+Avec une session, chaque requête authentifiée coûte une lecture de
+django_session puis une de core_user, et la table des sessions grossit sans
+fin. login_api émet à la place :
+- un jeton d'accès (ACCESS_TOKEN_LIFETIME), envoyé en
+  "Authorization: Bearer <jeton>"
+- un jeton de rafraîchissement (REFRESH_TOKEN_LIFETIME), échangé contre une
+  nouvelle paire sur /api/token/refresh/. Il est à usage unique : il porte
+  aussi refresh_counter, incrémenté à chaque échange, si bien qu'un jeton
+  déjà échangé (ou volé puis rejoué) est refusé. Un utilisateur n'a donc
+  qu'une chaîne de rafraîchissement valide à la fois
+
+Les jetons sont signés par HMAC (django.core.signing, SECRET_KEY) avec un sel
+différent par type ; ils portent l'identifiant de l'utilisateur et sa
+token_version. logout_api et tout changement de mot de passe (User.save)
+incrémentent token_version : tous les jetons émis deviennent invalides.
+
+TokenAuthenticationMiddleware vérifie la signature et charge l'utilisateur
+depuis un cache LRU du processus, indexé par (identifiant, version) : aucune
+requête SQL tant que l'utilisateur reste en cache. Une entrée expire après
+TOKEN_USER_CACHE_TTL secondes, ce qui borne le délai avant qu'une révocation
+ou une désactivation faite par un autre processus soit vue (immédiat dans le
+processus qui l'a faite).
+
+Les sessions restent utilisées pour l'administration Django (admins et
+superviseurs) et par les clients existants.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from collections import OrderedDict
+from django.conf import settings
+from django.core import signing
+from django.db.models import F
+import threading
+import time
+
+from .models import User
+from .permissions import STAFF_ROLES
+
+
+ACCESS_SALT = 'core.tokens.access'
+REFRESH_SALT = 'core.tokens.refresh'
+
+DEFAULT_ACCESS_LIFETIME = 15 * 60
+DEFAULT_REFRESH_LIFETIME = 2 * 3600
+
+
+def access_lifetime():
+    return getattr(settings, 'ACCESS_TOKEN_LIFETIME', DEFAULT_ACCESS_LIFETIME)
+
+
+def refresh_lifetime():
+    return getattr(settings, 'REFRESH_TOKEN_LIFETIME', DEFAULT_REFRESH_LIFETIME)
+
+
+def issue_tokens(user):
+    """Paire de jetons pour la réponse de connexion ou de rafraîchissement"""
+    payload = {'u': user.pk.hex, 'v': user.token_version}
+    return {
+        'access_token': signing.dumps(payload, salt=ACCESS_SALT),
+        'refresh_token': signing.dumps({**payload, 'r': user.refresh_counter}, salt=REFRESH_SALT),
+        'token_type': 'Bearer',
+        'expires_in': access_lifetime(),
+    }
+
+
+def read_token(token, refresh=False):
+    """
+    Retourne (identifiant, version) si le jeton est valide et non expiré, sinon
+    None ; (identifiant, version, compteur) pour un jeton de rafraîchissement
+    """
+    try:
+        payload = signing.loads(
+            token,
+            salt=REFRESH_SALT if refresh else ACCESS_SALT,
+            max_age=refresh_lifetime() if refresh else access_lifetime(),
+        )
+        if refresh:
+            return payload['u'], payload['v'], payload['r']
+        return payload['u'], payload['v']
+    except (signing.BadSignature, KeyError, TypeError):
+        # SignatureExpired hérite de BadSignature
+        return None
+
+
+def bearer_token(request):
+    header = request.headers.get('Authorization', '')
+    return header[7:] if header.startswith('Bearer ') else None
+
+
+def needs_session(user):
+    """Les admins et superviseurs utilisent l'administration Django, qui repose sur la session"""
+    return user.role in STAFF_ROLES or user.is_staff or user.is_superuser
+
+
+class UserCache:
+    """
+    Cache LRU borné (TOKEN_USER_CACHE_SIZE) des utilisateurs authentifiés par
+    jeton, indexé par (identifiant, token_version), entrées valables
+    TOKEN_USER_CACHE_TTL secondes. Les objets User sont partagés entre les
+    requêtes : les vues ne doivent pas les modifier
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id, version):
+        key = (user_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, user):
+        key = (user.pk.hex, user.token_version)
+        ttl = getattr(settings, 'TOKEN_USER_CACHE_TTL', 60)
+        size = getattr(settings, 'TOKEN_USER_CACHE_SIZE', 1024)
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        """Retire toutes les versions d'un utilisateur (modification, révocation)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def active_users(user_id, version):
+    return User.objects.filter(pk=user_id, token_version=version, is_active=True)
+
+
+def user_for_token(token):
+    """Utilisateur d'un jeton d'accès valide (cache, sinon une requête SQL), ou None"""
+    claims = read_token(token)
+    if claims is None:
+        return None
+    user = user_cache.get(*claims)
+    if user is None:
+        user = active_users(*claims).first()
+        if user is not None:
+            user_cache.set(user)
+    return user
+
+
+async def auser_for_token(token):
+    """Version asynchrone de user_for_token"""
+    claims = read_token(token)
+    if claims is None:
+        return None
+    user = user_cache.get(*claims)
+    if user is None:
+        user = await active_users(*claims).afirst()
+        if user is not None:
+            user_cache.set(user)
+    return user
+
+
+def rotate_refresh_token(token):
+    """
+    Consomme un jeton de rafraîchissement : incrémente refresh_counter s'il vaut
+    encore celui du jeton (UPDATE conditionnel, un seul gagnant en cas
+    d'échanges concurrents) et retourne l'utilisateur à jour, sinon None
+    """
+    claims = read_token(token, refresh=True)
+    if claims is None:
+        return None
+    user_id, version, counter = claims
+    users = active_users(user_id, version)
+    if not users.filter(refresh_counter=counter).update(refresh_counter=F('refresh_counter') + 1):
+        return None
+    return users.first()
+
+
+def revoke_tokens(user):
+    """Invalide tous les jetons de l'utilisateur (déconnexion)"""
+    User.objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user_cache.evict(user.pk.hex)
+
+
+async def arevoke_tokens(user):
+    await User.objects.filter(pk=user.pk).aupdate(token_version=F('token_version') + 1)
+    user_cache.evict(user.pk.hex)
+
+
+def authenticate_request(request, user):
+    # Remplace l'utilisateur paresseux (session) posé par AuthenticationMiddleware
+    request.user = request._cached_user = request._acached_user = user
+
+
+class TokenAuthenticationMiddleware:
+    """
+    Authentifie les requêtes portant "Authorization: Bearer <jeton d'accès>".
+    À placer après AuthenticationMiddleware. Un jeton invalide ou expiré est
+    ignoré : la requête reste anonyme (ou authentifiée par sa session)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = bearer_token(request)
+        if token:
+            user = user_for_token(token)
+            if user is not None:
+                authenticate_request(request, user)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        token = bearer_token(request)
+        if token:
+            user = await auser_for_token(token)
+            if user is not None:
+                authenticate_request(request, user)
+        return await self.get_response(request)
@@ -1,20 +1,49 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as api_views
+else:
+    api_views = views
+
 app_name = 'core'
 
 urlpatterns = [
     # API d'authentification
-    path('api/login/', views.login_api, name='login_api'),
+    path('api/login/', api_views.login_api, name='login_api'),
     path('api/logout/', views.logout_api, name='logout_api'),
+    path('api/token/refresh/', views.token_refresh_api, name='token_refresh'),
     
     # API de gestion des utilisateurs
-    path('api/add-user/', views.add_user_api, name='add_user_api'),
-    path('api/send-credentials/', views.send_credentials_api, name='send_credentials_api'),
+    path('api/add-user/', api_views.add_user_api, name='add_user_api'),
+    path('api/add-users/bulk/', views.add_users_bulk_api, name='add_users_bulk_api'),
+    path('api/send-credentials/', api_views.send_credentials_api, name='send_credentials_api'),
     
     # Dashboard
     path('api/dashboard/', views.dashboard_view, name='dashboard'),
-    path('api/dashboard/statistiques-generales/', views.dashboard_stats_view, name='dashboard_stats'),
+    path('api/dashboard/statistiques-generales/', api_views.dashboard_stats_view, name='dashboard_stats'),
+    
+    # Catégories
+    path('api/categories/', views.categories_api, name='categories'),
+    
+    # Réclamations
+    path('api/reclamations/', views.reclamations_list_api, name='reclamations_list'),
+    path('api/reclamations/export/', views.reclamations_export_api, name='reclamations_export'),
+    path('api/reclamations/search/', views.reclamations_search_api, name='reclamations_search'),
+    path('api/reclamations/events/', views.reclamation_events_view, name='reclamation_events'),
+    path('api/reclamations/assign/', views.assign_reclamations_api, name='assign_reclamations'),
+    path('api/reclamations/<uuid:pk>/image/', views.reclamation_image_api, name='reclamation_image'),
+    
+    # Pannes de zone
+    path('api/incidents/', views.incidents_api, name='incidents'),
+    path('api/incidents/<uuid:pk>/traiter/', views.incident_handle_api, name='incident_handle'),
+    
+    # Analytique
+    path('api/analytics/sla/', views.sla_analytics_api, name='analytics_sla'),
+    
+    # Supervision
+    path('api/metrics', views.metrics_view, name='metrics'),
     
     # Page d'accueil
     path('', views.home_view, name='home'),
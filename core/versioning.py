@@ -0,0 +1,67 @@
+"""
+Versions des données partagées entre processus et caches locaux associés.
+
+Chaque jeu de données (ex. les catégories) a un compteur dans core_data_version,
+incrémenté par les signaux dans la transaction de la modification. Un processus
+vérifie la version (une requête sur un index unique) et ne reconstruit son
+cache local que si elle a changé.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+import hashlib
+import threading
+
+from .db import retry_on_busy
+from .models import DataVersion
+
+
+CATEGORIES = 'categories'
+
+
+@retry_on_busy
+def bump_version(nom):
+    """Incrémente la version d'un jeu de données (crée le compteur au besoin)"""
+    values = {'version': F('version') + 1, 'date_updated': timezone.now()}
+    if DataVersion.objects.filter(nom=nom).update(**values):
+        return
+    try:
+        with transaction.atomic():
+            DataVersion.objects.create(nom=nom, version=1)
+    except IntegrityError:
+        # Créé entre-temps par un autre processus
+        DataVersion.objects.filter(nom=nom).update(**values)
+
+
+def get_version(nom):
+    """Retourne (version, date de modification) ; (0, None) si jamais modifié"""
+    row = DataVersion.objects.filter(nom=nom).values_list('version', 'date_updated').first()
+    return row or (0, None)
+
+
+class VersionedPayload:
+    """
+    Cache local (par processus) d'un corps de réponse pré-sérialisé, reconstruit
+    quand la version du jeu de données change. L'ETag est l'empreinte du corps.
+    """
+
+    def __init__(self, nom, build):
+        self.nom = nom
+        self.build = build
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def get(self):
+        """Retourne (corps, etag, date de modification)"""
+        version, date_updated = get_version(self.nom)
+        entry = self._entry
+        if entry is not None and entry[0] == version:
+            return entry[1:]
+
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != version:
+                body = self.build()
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+                entry = self._entry = (version, body, etag, date_updated)
+        return entry[1:]
@@ -1,55 +1,138 @@
 from django.shortcuts import render
 from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.signals import user_logged_in
 from django.contrib.auth.hashers import make_password
-from django.core.mail import send_mail
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
 from django.utils.decorators import method_decorator
 from django.views import View
 import json
-import random
-import string
-from .models import User, Categories, Reclamation
+import logging
+import tempfile
+from .assignment import engine as assignment_engine
+from .backends import lookup_field
+from .db import retry_on_busy
+from .events import event_stream
+from .export import EXPORT_FORMATS, aiter_blocks, export_queryset, iter_csv, write_parquet
+from .filters import filter_reclamations, parse_uuid, InvalidFilter
+from .http import conditional, static_validators
+from .images import store_upload, schedule_variants, variant_urls, InvalidImage
+from .metrics import PROMETHEUS_CONTENT_TYPE, metrics_allowed, registry as metrics_registry
+from .models import User, Categories, Reclamation, ReclamationDailyRollup, Incident
+from .onboarding import BulkUserImporter, iter_csv_rows, iter_jsonl_rows
+from .outages import INCIDENT_ACTIONS, IncidentConflict, detector as outage_detector, handle_incident
+from .outbox import queue_email, build_credentials_email
+from .pagination import paginate_by_cursor, InvalidCursor
+from .passwords import generate_temp_password
+from .permissions import visible_reclamations, STAFF_ROLES
+from .rollups import sla_summary
+from .routers import replica_alias, use_replica
+from .search import search_available, search_reclamation_ids
+from .serializers import RECLAMATION_LIST_FIELDS, serialize_active_categories, serialize_reclamation_row
+from .stats import dashboard_stats_validators, get_dashboard_stats, request_stats_version
+from .throttle import get_login_throttle, retry_after_header
+from .tokens import issue_tokens, needs_session, revoke_tokens, rotate_refresh_token
+from .versioning import CATEGORIES, VersionedPayload
 
 
-def generate_temp_password(length=8):
-    """Génère un mot de passe temporaire aléatoire"""
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
+logger = logging.getLogger(__name__)
 
+# Catégories actives pré-sérialisées, reconstruites quand leur version change
+categories_payload = VersionedPayload(CATEGORIES, serialize_active_categories)
 
-def send_credentials_email(user, temp_password):
-    """Envoie les informations de connexion par email"""
-    subject = 'Vos informations de connexion - Système SENELEC'
-    message = f"""
-    Bonjour {user.get_full_name()},
 
-    Voici vos informations de connexion au système SENELEC :
+def queue_credentials_email(user, temp_password):
+    """Place les informations de connexion dans l'outbox des emails"""
+    subject, message = build_credentials_email(user, temp_password)
+    
+    # L'envoi SMTP est fait par la commande process_email_outbox
+    return queue_email(user.email, subject, message, user=user)
 
-    📧 Email : {user.email}
-    🔑 Mot de passe temporaire : {temp_password}
-    👤 Rôle : {user.get_role_display()}
 
-    Veuillez vous connecter et modifier votre mot de passe lors de votre première connexion.
+def login_payload(user):
+    """Réponse de connexion réussie (redirection selon le rôle, jetons d'accès)"""
+    if user.role in ['admin', 'superviseur']:
+        redirect_message = "Redirection vers le dashboard administrateur..."
+        dashboard_url = "/admin/"
+    else:
+        redirect_message = f"Bienvenue {user.get_full_name()}! Connexion réussie."
+        dashboard_url = "/dashboard/"
 
-    Cordialement,
-    L'équipe SENELEC
-    """
-    
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
+    return {
+        'success': True,
+        'message': redirect_message,
+        'user': {
+            'id': str(user.id),
+            'nom': user.nom,
+            'prenom': user.prenom,
+            'email': user.email,
+            'role': user.role,
+            'is_first_login': user.is_first_login
+        },
+        'dashboard_url': dashboard_url,
+        **issue_tokens(user),
+    }
+
+
+def throttled_response(retry_after):
+    """Réponse 429 d'une tentative de connexion limitée"""
+    response = JsonResponse({
+        'success': False,
+        'message': 'Trop de tentatives de connexion, veuillez réessayer plus tard'
+    }, status=429)
+    response['Retry-After'] = retry_after_header(retry_after)
+    return response
+
+
+@retry_on_busy
+def create_user_with_credentials(data, temp_password, password_hash):
+    """Crée l'utilisateur et son email d'identifiants dans la même transaction"""
+    with transaction.atomic():
+        user = User.objects.create(
+            username=data['email'],
+            email=data['email'],
+            nom=data['nom'],
+            prenom=data['prenom'],
+            telephone=data['telephone'],
+            role=data['role'],
+            adresse=data.get('adresse', ''),
+            numero_compteur=data.get('numero_compteur', ''),
+            password=password_hash,
+            temp_password=temp_password,
+            is_active=True
         )
-        return True
-    except Exception as e:
-        print(f"Erreur envoi email: {e}")
-        return False
+        queue_credentials_email(user, temp_password)
+    return user
+
+
+@retry_on_busy
+def resend_credentials(user, temp_password, password_hash=None):
+    """
+    Enregistre le nouveau mot de passe temporaire (si `password_hash` est
+    fourni) et met l'email d'identifiants en file, dans la même transaction
+    """
+    with transaction.atomic():
+        if password_hash:
+            user.temp_password = temp_password
+            user.password = password_hash
+            user.is_first_login = True
+            user.save()
+        queue_credentials_email(user, temp_password)
+
+
+def missing_user_fields(data):
+    """Champs obligatoires absents de la requête de création"""
+    required_fields = ['nom', 'prenom', 'email', 'telephone', 'role']
+    return [field for field in required_fields if not data.get(field)]
 
 
 @csrf_exempt
@@ -67,57 +150,41 @@ def login_api(request):
                 'message': 'Email/téléphone et mot de passe requis'
             }, status=400)
         
-        # Chercher l'utilisateur par email ou téléphone
-        user = None
-        try:
-            if '@' in email_or_phone:
-                user = User.objects.get(email=email_or_phone)
-            else:
-                user = User.objects.get(telephone=email_or_phone)
-        except User.DoesNotExist:
-            return JsonResponse({
-                'success': False,
-                'message': 'Utilisateur non trouvé'
-            }, status=404)
+        # Limitation avant authenticate() : une rafale ne coûte aucun hachage PBKDF2
+        throttle = get_login_throttle()
+        retry_after = throttle.check(request, email_or_phone)
+        if retry_after:
+            return throttled_response(retry_after)
         
-        # Vérifier le mot de passe
-        user_auth = authenticate(request, username=user.email, password=password)
-        if user_auth:
-            login(request, user_auth)
-            
-            # Déterminer la redirection selon le rôle
-            if user.role in ['admin', 'superviseur']:
-                redirect_message = "Redirection vers le dashboard administrateur..."
-                dashboard_url = "/admin/"
-            else:
-                redirect_message = f"Bienvenue {user.get_full_name()}! Connexion réussie."
-                dashboard_url = "/dashboard/"
-            
-            return JsonResponse({
-                'success': True,
-                'message': redirect_message,
-                'user': {
-                    'id': str(user.id),
-                    'nom': user.nom,
-                    'prenom': user.prenom,
-                    'email': user.email,
-                    'role': user.role,
-                    'is_first_login': user.is_first_login
-                },
-                'dashboard_url': dashboard_url
-            })
-        else:
+        # Une seule requête : le backend charge l'utilisateur et vérifie le mot de passe
+        user = authenticate(request, email_or_phone=email_or_phone, password=password)
+        if user is None:
+            # Requête supplémentaire uniquement sur le chemin d'échec
+            if not User.objects.filter(**{lookup_field(email_or_phone): email_or_phone}).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Utilisateur non trouvé'
+                }, status=404)
             return JsonResponse({
                 'success': False,
                 'message': 'Email/téléphone ou mot de passe incorrect'
             }, status=401)
-            
+        
+        throttle.succeeded(request, email_or_phone)
+        if needs_session(user):
+            login(request, user)
+        else:
+            # Jetons seulement : pas de ligne django_session, last_login reste à jour
+            user_logged_in.send(sender=user.__class__, request=request, user=user)
+        return JsonResponse(login_payload(user))
+
     except json.JSONDecodeError:
         return JsonResponse({
             'success': False,
             'message': 'Format JSON invalide'
         }, status=400)
     except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
         return JsonResponse({
             'success': False,
             'message': f'Erreur interne: {str(e)}'
@@ -127,7 +194,9 @@ def login_api(request):
 @csrf_exempt
 @require_http_methods(["POST"])
 def logout_api(request):
-    """API de déconnexion"""
+    """API de déconnexion (révoque aussi les jetons de l'utilisateur)"""
+    if request.user.is_authenticated:
+        revoke_tokens(request.user)
     logout(request)
     return JsonResponse({
         'success': True,
@@ -135,6 +204,42 @@ def logout_api(request):
     })
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def token_refresh_api(request):
+    """
+    Échange un jeton de rafraîchissement valide contre une nouvelle paire de
+    jetons ; le jeton échangé ne peut plus resservir
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+
+    refresh_token = data.get('refresh_token')
+    if not refresh_token:
+        return JsonResponse({
+            'success': False,
+            'message': 'refresh_token requis'
+        }, status=400)
+
+    user = rotate_refresh_token(refresh_token)
+    if user is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Jeton de rafraîchissement invalide ou expiré'
+        }, status=401)
+
+    return JsonResponse({
+        'success': True,
+        'message': 'Jetons renouvelés',
+        **issue_tokens(user),
+    })
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def add_user_api(request):
@@ -143,8 +248,7 @@ def add_user_api(request):
         data = json.loads(request.body)
         
         # Vérifier les champs requis
-        required_fields = ['nom', 'prenom', 'email', 'telephone', 'role']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        missing_fields = missing_user_fields(data)
         
         if missing_fields:
             return JsonResponse({
@@ -167,24 +271,10 @@ def add_user_api(request):
         
         # Générer un mot de passe temporaire
         temp_password = generate_temp_password()
+        password_hash = make_password(temp_password)
         
-        # Créer l'utilisateur
-        user = User.objects.create(
-            username=data['email'],
-            email=data['email'],
-            nom=data['nom'],
-            prenom=data['prenom'],
-            telephone=data['telephone'],
-            role=data['role'],
-            adresse=data.get('adresse', ''),
-            numero_compteur=data.get('numero_compteur', ''),
-            password=make_password(temp_password),
-            temp_password=temp_password,
-            is_active=True
-        )
-        
-        # Envoyer les informations par email
-        email_sent = send_credentials_email(user, temp_password)
+        # Créer l'utilisateur et son email dans la même transaction
+        user = create_user_with_credentials(data, temp_password, password_hash)
         
         return JsonResponse({
             'success': True,
@@ -197,7 +287,7 @@ def add_user_api(request):
                 'role': user.role,
                 'temp_password': temp_password
             },
-            'email_sent': email_sent
+            'email_queued': True
         })
         
     except json.JSONDecodeError:
@@ -206,10 +296,57 @@ def add_user_api(request):
             'message': 'Format JSON invalide'
         }, status=400)
     except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
+        return JsonResponse({
+            'success': False,
+            'message': f'Erreur interne: {str(e)}'
+        }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def add_users_bulk_api(request):
+    """
+    API d'import en masse d'utilisateurs (admin uniquement).
+    Le corps est lu en flux : CSV avec en-tête ou un objet JSON par ligne.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    if request.user.role not in STAFF_ROLES and not request.user.is_superuser:
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux administrateurs et superviseurs'
+        }, status=403)
+    
+    content_type = request.content_type or ''
+    format_ = request.GET.get('format') or ('csv' if 'csv' in content_type else 'jsonl')
+    if format_ not in ('csv', 'jsonl'):
+        return JsonResponse({
+            'success': False,
+            'message': 'Format non supporté (csv ou jsonl)'
+        }, status=400)
+    
+    try:
+        # Itérer sur la requête lit le corps ligne par ligne sans le charger en mémoire
+        rows = iter_csv_rows(request) if format_ == 'csv' else iter_jsonl_rows(request)
+        report = BulkUserImporter().run(rows)
+    except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
         return JsonResponse({
             'success': False,
             'message': f'Erreur interne: {str(e)}'
         }, status=500)
+    
+    return JsonResponse({
+        'success': report['erreurs'] == 0,
+        'message': f"{report['crees']} utilisateur(s) créé(s), {report['erreurs']} ligne(s) en erreur",
+        'report': report,
+        'email_queued': report['crees'] > 0
+    })
 
 
 @csrf_exempt
@@ -237,20 +374,18 @@ def send_credentials_api(request):
         # Générer un nouveau mot de passe temporaire si nécessaire
         if not user.temp_password:
             temp_password = generate_temp_password()
-            user.temp_password = temp_password
-            user.password = make_password(temp_password)
-            user.is_first_login = True
-            user.save()
+            password_hash = make_password(temp_password)
         else:
             temp_password = user.temp_password
+            password_hash = None
         
-        # Envoyer l'email
-        email_sent = send_credentials_email(user, temp_password)
+        # Mettre l'email en file d'attente
+        resend_credentials(user, temp_password, password_hash)
         
         return JsonResponse({
             'success': True,
-            'message': f'Informations de connexion envoyées à {email}',
-            'email_sent': email_sent
+            'message': f'Informations de connexion en cours d\'envoi à {email}',
+            'email_queued': True
         })
         
     except json.JSONDecodeError:
@@ -259,41 +394,42 @@ def send_credentials_api(request):
             'message': 'Format JSON invalide'
         }, status=400)
     except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
         return JsonResponse({
             'success': False,
             'message': f'Erreur interne: {str(e)}'
         }, status=500)
 
 
+DASHBOARD_PAYLOAD = {
+    'success': True,
+    'message': 'Bienvenue sur le dashboard!',
+    'user': {
+        'nom': 'Test',
+        'prenom': 'User',
+        'role': 'client',
+        'email': 'test@example.com'
+    }
+}
+
+
 @require_http_methods(["GET"])
+@conditional(static_validators(DASHBOARD_PAYLOAD))
 def dashboard_view(request):
     """Vue simple du dashboard"""
-    return JsonResponse({
-        'success': True,
-        'message': 'Bienvenue sur le dashboard!',
-        'user': {
-            'nom': 'Test',
-            'prenom': 'User',
-            'role': 'client',
-            'email': 'test@example.com'
-        }
-    })
+    return JsonResponse(DASHBOARD_PAYLOAD)
 
 
 @require_http_methods(["GET"])
+@use_replica
+@conditional(dashboard_stats_validators)
 def dashboard_stats_view(request):
     """Vue des statistiques générales du dashboard"""
     # Statistiques générales sans vérification de rôle
-    stats = {
-        'total_users': User.objects.count(),
-        'total_clients': User.objects.filter(role='client').count(),
-        'total_techniciens': User.objects.filter(role='technicien').count(),
-        'total_categories': Categories.objects.count(),
-        'total_reclamations': Reclamation.objects.count(),
-        'reclamations_en_attente': Reclamation.objects.filter(status='en_attente').count(),
-        'reclamations_en_cours': Reclamation.objects.filter(status='en_cours').count(),
-        'reclamations_resolues': Reclamation.objects.filter(status='resolu').count(),
-    }
+    # ?fresh=1 force le recalcul en contournant le cache
+    fresh = request.GET.get('fresh') in ('1', 'true')
+    version = request_stats_version(request)[0]
+    stats = get_dashboard_stats(fresh=fresh, version=version)
     
     return JsonResponse({
         'success': True,
@@ -302,16 +438,548 @@ def dashboard_stats_view(request):
     })
 
 
-def home_view(request):
-    """Vue d'accueil simple"""
+@require_http_methods(["GET"])
+def categories_api(request):
+    """
+    Liste des catégories actives, servie depuis le cache du processus.
+    ETag fort : If-None-Match renvoie 304 sans corps si rien n'a changé.
+    """
+    body, etag, last_modified = categories_payload.get()
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    # Le client peut garder sa copie mais doit la revalider à chaque usage
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@require_http_methods(["GET"])
+def reclamations_list_api(request):
+    """
+    Liste paginée des réclamations visibles par l'utilisateur connecté.
+    Filtres: status, categorie, technicien, date_debut, date_fin.
+    Pagination: ?cursor=<next_cursor de la page précédente>&limit=20
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        queryset = filter_reclamations(visible_reclamations(request.user), request.GET)
+        rows, next_cursor = paginate_by_cursor(
+            queryset.values(*RECLAMATION_LIST_FIELDS),
+            cursor=request.GET.get('cursor'),
+            limit=limit,
+        )
+    except InvalidCursor:
+        return JsonResponse({
+            'success': False,
+            'message': 'Curseur invalide'
+        }, status=400)
+    except (InvalidFilter, ValueError) as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e) if isinstance(e, InvalidFilter) else 'Paramètre limit invalide'
+        }, status=400)
+    
     return JsonResponse({
-        'message': 'Bienvenue sur l\'API SENELEC',
-        'endpoints': {
-            'login': '/api/login/',
-            'logout': '/api/logout/',
-            'add_user': '/api/add-user/',
-            'send_credentials': '/api/send-credentials/',
-            'dashboard': '/api/dashboard/',
-            'dashboard_stats': '/api/dashboard/statistiques-generales/'
-        }
+        'success': True,
+        'count': len(rows),
+        'next_cursor': next_cursor,
+        'reclamations': [serialize_reclamation_row(row) for row in rows]
     })
+
+
+@require_http_methods(["GET"])
+def reclamations_search_api(request):
+    """
+    Recherche plein texte dans les descriptions des réclamations visibles
+    par l'utilisateur connecté, triée par pertinence. ?q=coupure&limit=20&offset=0
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({
+            'success': False,
+            'message': 'Paramètre q requis'
+        }, status=400)
+    
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+        offset = max(int(request.GET.get('offset', 0)), 0)
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Paramètres limit/offset invalides'
+        }, status=400)
+    
+    queryset = visible_reclamations(request.user).values(*RECLAMATION_LIST_FIELDS)
+    if search_available():
+        ids = search_reclamation_ids(request.user, query, limit=limit, offset=offset)
+        rows_by_id = {row['id']: row for row in queryset.filter(id__in=ids)}
+        rows = [rows_by_id[pk] for pk in ids if pk in rows_by_id]
+    else:
+        # Repli sans FTS5 : LIKE sur chaque mot
+        for term in query.split():
+            queryset = queryset.filter(description__icontains=term)
+        rows = list(queryset[offset:offset + limit])
+    
+    return JsonResponse({
+        'success': True,
+        'count': len(rows),
+        'reclamations': [serialize_reclamation_row(row) for row in rows]
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def reclamation_image_api(request, pk):
+    """
+    API d'envoi de la photo d'une réclamation (champ multipart "image").
+    Les variantes (miniature, aperçu) sont générées en arrière-plan.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    try:
+        reclamation = visible_reclamations(request.user).get(pk=pk)
+    except Reclamation.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Réclamation non trouvée'
+        }, status=404)
+    
+    uploaded_file = request.FILES.get('image')
+    if uploaded_file is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Fichier image requis'
+        }, status=400)
+    
+    try:
+        name, image_hash = store_upload(uploaded_file)
+    except InvalidImage as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    
+    with transaction.atomic():
+        reclamation.image = name
+        reclamation.image_hash = image_hash
+        reclamation.save(update_fields=['image', 'image_hash', 'date_updated'])
+        transaction.on_commit(lambda: schedule_variants(name, image_hash))
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Image enregistrée',
+        'images': variant_urls(name, image_hash)
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def assign_reclamations_api(request):
+    """
+    API d'assignation automatique des réclamations ouvertes sans technicien
+    (superviseur/admin). Corps optionnel: {"reclamation_ids": [...]}
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    if request.user.role not in STAFF_ROLES and not request.user.is_superuser:
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux superviseurs'
+        }, status=403)
+    
+    try:
+        data = json.loads(request.body) if request.body else {}
+        reclamation_ids = data.get('reclamation_ids')
+        if reclamation_ids is not None and not isinstance(reclamation_ids, list):
+            raise ValidationError('reclamation_ids')
+        assigned = assignment_engine.assign(reclamation_ids=reclamation_ids)
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+    except ValidationError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Identifiant de réclamation invalide'
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{assigned} réclamation(s) assignée(s)',
+        'assigned': assigned,
+        'charges': {str(tech_id): load for tech_id, load in assignment_engine.loads().items()}
+    })
+
+
+def serialize_incident(incident):
+    return {
+        'id': str(incident.id),
+        'zone': incident.zone,
+        'status': incident.status,
+        'technicien_id': str(incident.technicien_id) if incident.technicien_id else None,
+        'date_debut': incident.date_debut.isoformat(),
+        'date_resolution': incident.date_resolution.isoformat() if incident.date_resolution else None,
+        'nombre_reclamations': incident.nombre_reclamations,
+        'reclamations_ouvertes': incident.reclamations_ouvertes,
+    }
+
+
+@require_http_methods(["GET"])
+def incidents_api(request):
+    """
+    Incidents (pannes de zone) détectés. Superviseur/admin : tous, filtre
+    ?status=ouvert|en_cours|resolu ; technicien : ouverts et ceux qui lui sont assignés
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    user = request.user
+    incidents = Incident.objects.all()
+    if user.role in STAFF_ROLES or user.is_superuser:
+        if request.GET.get('status'):
+            incidents = incidents.filter(status=request.GET['status'])
+    elif user.role == 'technicien':
+        incidents = incidents.filter(Q(status='ouvert') | Q(technicien=user))
+    else:
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux superviseurs et techniciens'
+        }, status=403)
+    
+    incidents = incidents.annotate(
+        nombre_reclamations=Count('reclamations'),
+        reclamations_ouvertes=Count('reclamations', filter=Q(reclamations__status__in=Reclamation.OPEN_STATUSES)),
+    ).order_by('-date_debut')[:200]
+    fenetres, _ = outage_detector.snapshot()
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Incidents',
+        'incidents': [serialize_incident(incident) for incident in incidents],
+        # Réclamations en attente de regroupement par zone (fenêtre glissante du processus)
+        'fenetres': fenetres,
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def incident_handle_api(request, pk):
+    """
+    Traitement en bloc des réclamations ouvertes d'un incident.
+    Corps: {"action": "prendre_en_charge" | "resoudre", "technicien_id": "..." (superviseur)}
+    Un technicien prend en charge pour lui-même et ne résout que ses incidents
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    user = request.user
+    is_staff = user.role in STAFF_ROLES or user.is_superuser
+    if not is_staff and user.role != 'technicien':
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux superviseurs et techniciens'
+        }, status=403)
+    
+    try:
+        data = json.loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format JSON invalide'
+        }, status=400)
+    action = data.get('action')
+    if action not in INCIDENT_ACTIONS:
+        return JsonResponse({
+            'success': False,
+            'message': f'Action invalide ({", ".join(INCIDENT_ACTIONS)})'
+        }, status=400)
+    
+    try:
+        incident = Incident.objects.get(pk=pk)
+    except Incident.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Incident non trouvé'
+        }, status=404)
+    if incident.status == 'resolu':
+        return JsonResponse({
+            'success': False,
+            'message': 'Incident déjà résolu'
+        }, status=400)
+    
+    technicien_id = None
+    if action == 'prendre_en_charge':
+        if is_staff:
+            try:
+                technicien_id = parse_uuid(str(data.get('technicien_id') or ''), 'technicien_id')
+            except InvalidFilter:
+                technicien_id = None
+            if technicien_id is None or not User.objects.filter(
+                pk=technicien_id, role='technicien', is_active=True
+            ).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'technicien_id requis (technicien actif)'
+                }, status=400)
+        else:
+            technicien_id = user.pk
+    if not is_staff and incident.technicien_id not in (None, user.pk):
+        return JsonResponse({
+            'success': False,
+            'message': 'Incident assigné à un autre technicien'
+        }, status=403)
+    if not is_staff and action == 'resoudre' and incident.technicien_id != user.pk:
+        return JsonResponse({
+            'success': False,
+            'message': 'Prenez l\'incident en charge avant de le résoudre'
+        }, status=403)
+    
+    try:
+        updated = handle_incident(incident, action, technicien_id=technicien_id)
+    except IncidentConflict:
+        return JsonResponse({
+            'success': False,
+            'message': 'Incident modifié entre-temps (pris en charge ou résolu), veuillez recharger'
+        }, status=409)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{updated} réclamation(s) traitée(s)',
+        'updated': updated,
+        'incident': {
+            'id': str(incident.id),
+            'status': incident.status,
+            'technicien_id': str(incident.technicien_id) if incident.technicien_id else None,
+        },
+    })
+
+
+@require_http_methods(["GET"])
+@use_replica
+def reclamations_export_api(request):
+    """
+    Export complet des réclamations (superviseur/admin), en flux.
+    ?format=csv|parquet, filtres: status, categorie, technicien, date_debut, date_fin
+    Sous ASGI le contenu est fourni par un itérateur asynchrone (aiter_blocks)
+    pour être envoyé bloc par bloc.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    if request.user.role not in STAFF_ROLES and not request.user.is_superuser:
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux superviseurs'
+        }, status=403)
+    
+    format_ = request.GET.get('format', 'csv')
+    if format_ not in EXPORT_FORMATS:
+        return JsonResponse({
+            'success': False,
+            'message': 'Format non supporté (csv ou parquet)'
+        }, status=400)
+    
+    try:
+        # Base choisie maintenant : le flux est lu après la sortie de la vue
+        queryset = export_queryset(
+            filter_reclamations(Reclamation.objects.using(replica_alias()), request.GET)
+        )
+    except InvalidFilter as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    
+    asgi = isinstance(request, ASGIRequest)
+    filename = f"reclamations_{timezone.now():%Y%m%d_%H%M%S}.{format_}"
+    if format_ == 'csv':
+        lines = iter_csv(queryset)
+        response = StreamingHttpResponse(
+            aiter_blocks(lines) if asgi else lines, content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    # Le pied de page Parquet est écrit en dernier : le fichier est construit
+    # sur disque groupe par groupe puis envoyé par blocs
+    output = tempfile.TemporaryFile()
+    try:
+        write_parquet(queryset, output)
+    except Exception as e:
+        logger.exception('Erreur interne sur %s', request.path)
+        output.close()
+        return JsonResponse({
+            'success': False,
+            'message': f'Erreur interne: {str(e)}'
+        }, status=500)
+    output.seek(0)
+    response = FileResponse(output, as_attachment=True, filename=filename, content_type='application/vnd.apache.parquet')
+    if asgi:
+        response.streaming_content = aiter_blocks(response.streaming_content, size=64)
+    return response
+
+
+@require_http_methods(["GET"])
+@use_replica
+def sla_analytics_api(request):
+    """
+    Indicateurs de délai de réponse par catégorie, calculés uniquement à partir
+    des agrégats journaliers (superviseur/admin).
+    Filtres: date_debut, date_fin (AAAA-MM-JJ, inclus), categorie
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    if request.user.role not in STAFF_ROLES and not request.user.is_superuser:
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès réservé aux superviseurs'
+        }, status=403)
+    
+    rollups = ReclamationDailyRollup.objects.all()
+    for param, lookup in (('date_debut', 'jour__gte'), ('date_fin', 'jour__lte')):
+        if request.GET.get(param):
+            day = parse_date(request.GET[param])
+            if day is None:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'Date invalide pour {param}'
+                }, status=400)
+            rollups = rollups.filter(**{lookup: day})
+    if request.GET.get('categorie'):
+        try:
+            rollups = rollups.filter(categories_id=parse_uuid(request.GET['categorie'], 'categorie'))
+        except InvalidFilter as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+    
+    summaries = sla_summary(rollups.only(
+        'categories_id', 'status', 'nombre', 'nombre_repondues', 'duree_totale', 'sketch'
+    ))
+    names = dict(Categories.objects.filter(pk__in=summaries).values_list('pk', 'nom'))
+    
+    return JsonResponse({
+        'success': True,
+        'message': 'Délais de réponse par catégorie',
+        'categories': [
+            {'id': str(category_id), 'nom': names.get(category_id), **summary}
+            for category_id, summary in summaries.items()
+        ]
+    })
+
+
+async def reclamation_events_view(request):
+    """
+    Flux en direct (Server-Sent Events) des créations, changements de statut
+    et d'assignation des réclamations visibles par l'utilisateur.
+    Reprise après coupure via l'en-tête Last-Event-ID (ou ?last_event_id=).
+    Nécessite un serveur ASGI : sous WSGI, StreamingHttpResponse met un
+    itérateur asynchrone entièrement en tampon avant d'envoyer le premier
+    octet, ce qui bloquerait le worker indéfiniment sur ce flux sans fin.
+    """
+    if request.method != 'GET':
+        return JsonResponse({
+            'success': False,
+            'message': 'Méthode non autorisée'
+        }, status=405)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'success': False,
+            'message': 'Flux en direct disponible uniquement sous ASGI'
+        }, status=501)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentification requise'
+        }, status=401)
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(
+        event_stream(user, last_event_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Désactive la mise en tampon des proxys (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Métriques du processus au format Prometheus (jeton METRICS_TOKEN, ou accès local en DEBUG)"""
+    if not metrics_allowed(request):
+        return JsonResponse({
+            'success': False,
+            'message': 'Accès non autorisé'
+        }, status=403)
+
+    throttle = get_login_throttle().snapshot()
+    extra = [(
+        'senelec_login_throttle_decisions_total', 'counter', 'Décisions du limiteur de connexion',
+        [({'decision': decision}, count) for decision, count in sorted(throttle.items())],
+    )]
+    return HttpResponse(metrics_registry.render(extra), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+HOME_PAYLOAD = {
+    'message': 'Bienvenue sur l\'API SENELEC',
+    'endpoints': {
+        'login': '/api/login/',
+        'logout': '/api/logout/',
+        'token_refresh': '/api/token/refresh/',
+        'add_user': '/api/add-user/',
+        'add_users_bulk': '/api/add-users/bulk/',
+        'send_credentials': '/api/send-credentials/',
+        'dashboard': '/api/dashboard/',
+        'dashboard_stats': '/api/dashboard/statistiques-generales/',
+        'categories': '/api/categories/',
+        'reclamations': '/api/reclamations/',
+        'reclamations_search': '/api/reclamations/search/',
+        'reclamations_events': '/api/reclamations/events/',
+        'analytics_sla': '/api/analytics/sla/',
+        'incidents': '/api/incidents/',
+        'metrics': '/api/metrics'
+    }
+}
+
+
+@conditional(static_validators(HOME_PAYLOAD))
+def home_view(request):
+    """Vue d'accueil simple"""
+    return JsonResponse(HOME_PAYLOAD)
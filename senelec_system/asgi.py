@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'senelec_system.settings')
+# Sous ASGI, les vues principales utilisent leur version asynchrone
+# (SENELEC_ASYNC_VIEWS=0 pour revenir aux vues synchrones)
+os.environ.setdefault('SENELEC_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -43,12 +43,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # En premier : la durée mesurée inclut les autres middlewares
+    'core.metrics.MetricsMiddleware',
+    # Retiré automatiquement si PROFILING_ENABLED est faux
+    'core.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.tokens.TokenAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,10 +87,44 @@ WSGI_APPLICATION = 'senelec_system.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'senelec_db.sqlite3',
+        # SENELEC_DB_NAME permet de pointer un serveur vers une autre base (benchmarks)
+        'NAME': os.environ.get('SENELEC_DB_NAME', BASE_DIR / 'senelec_db.sqlite3'),
     }
 }
 
+# Réplique en lecture (core/routers.py) : statistiques, analytique et exports y sont lus,
+# les écritures restent sur la base principale. Rafraîchie par `manage.py refresh_replica`
+REPLICA_DB_NAME = os.environ.get('SENELEC_REPLICA_DB_NAME')
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPLICA_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Durée (secondes) pendant laquelle un client qui vient d'écrire lit la base principale,
+# à aligner sur l'intervalle de rafraîchissement de la réplique
+REPLICA_PIN_SECONDS = 60
+
+# Profil SQLite de production (core/db.py) : WAL, synchronous=NORMAL, busy_timeout,
+# mmap, cache, transactions IMMEDIATE et connexions persistantes
+SQLITE_PRODUCTION = os.environ.get('SENELEC_SQLITE_PRODUCTION', '0') == '1'
+SQLITE_PRAGMAS = {}  # surcharge de core.db.PRODUCTION_PRAGMAS
+
+if SQLITE_PRODUCTION:
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Le verrou d'écriture est pris dès BEGIN : pas d'échec immédiat
+            # lors du passage lecture -> écriture au milieu d'une transaction
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
+    })
+
 # Configuration MySQL (à activer plus tard)
 # DATABASES = {
 #     'default': {
@@ -142,6 +182,19 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Les fichiers envoyés sont toujours écrits sur disque par blocs, jamais gardés en mémoire
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+
+# Images des réclamations (core.images)
+RECLAMATION_IMAGE_MAX_SIZE = 15 * 1024 * 1024
+RECLAMATION_IMAGE_WORKERS = 2
+
+# Flux SSE des réclamations (/api/reclamations/events/)
+EVENTS_HISTORY_SIZE = 1000  # événements conservés pour la reprise (Last-Event-ID)
+EVENTS_MAX_QUEUE = 100  # événements en attente par connexion avant déconnexion
+EVENTS_HEARTBEAT = 15  # secondes entre deux commentaires de maintien
+EVENTS_RETRY_MS = 5000  # délai de reconnexion suggéré aux clients
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -162,3 +215,93 @@ DEFAULT_FROM_EMAIL = 'Système SENELEC <votre_email@gmail.com>'
 
 # Custom user model
 AUTH_USER_MODEL = 'core.User'
+
+# Vues asynchrones (core/async_views.py) : activées par senelec_system/asgi.py
+ASYNC_VIEWS = os.environ.get('SENELEC_ASYNC_VIEWS', '0') == '1'
+
+# Authentification par email ou téléphone en une seule requête
+AUTHENTICATION_BACKENDS = ['core.backends.EmailOrPhoneBackend']
+
+# Limitation des tentatives de connexion (seau à jetons par IP et par identifiant).
+# Partage entre workers : 'core.throttle.SQLiteBackend' avec {'path': BASE_DIR / 'throttle.sqlite3'}
+LOGIN_THROTTLE_ENABLED = os.environ.get('SENELEC_LOGIN_THROTTLE', '1') == '1'
+LOGIN_THROTTLE_BACKEND = 'core.throttle.LocalMemoryBackend'
+LOGIN_THROTTLE_OPTIONS = {}
+LOGIN_THROTTLE_RATES = {
+    'ip': '30/min',  # capacité 30, recharge de 30 jetons par minute
+    'identifiant': '5/min',
+}
+LOGIN_THROTTLE_TRUST_X_FORWARDED_FOR = False  # True derrière un proxy de confiance
+
+# Intervalle minimal (minutes) entre deux écritures de last_login, None pour toujours écrire
+LAST_LOGIN_UPDATE_INTERVAL = 15
+
+# Marge (secondes) relue avant le watermark des agrégats journaliers : couvre les
+# transactions validées après l'actualisation précédente (core/rollups.py)
+ROLLUP_SAFETY_LAG = 5 * 60
+
+# Durée de vie (secondes) des statistiques du dashboard en cache. Aucun CACHES
+# n'est configuré : le cache par défaut est LocMem, propre à chaque processus.
+# Les signaux n'invalident que le cache du worker qui a fait la modification ;
+# avec plusieurs workers, les autres servent des statistiques (et un ETag)
+# périmées au plus DASHBOARD_STATS_CACHE_TIMEOUT secondes. Configurer un cache
+# partagé (Redis, Memcached) dans CACHES rend l'invalidation immédiate
+DASHBOARD_STATS_CACHE_TIMEOUT = 30
+
+# max-age (secondes) des vues de lecture pour les anonymes et clients/techniciens
+# (superviseurs et admins revalident toujours)
+READ_CACHE_MAX_AGE = 60
+
+# Outbox des emails (commande process_email_outbox)
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # secondes, doublé à chaque échec
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+# Durée (secondes) de la réservation d'un lot par un worker : au-delà, un email
+# resté 'en_cours' (worker arrêté pendant l'envoi) est repris par un autre
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+
+# Détection des pannes de zone (core/outages.py) : OUTAGE_THRESHOLD réclamations de la
+# catégorie OUTAGE_CATEGORY dans une même zone en OUTAGE_WINDOW secondes ouvrent un incident
+OUTAGE_CATEGORY = 'Panne Électrique'
+OUTAGE_WINDOW = 15 * 60
+OUTAGE_THRESHOLD = 10
+
+# Jetons d'accès signés de l'API (core/tokens.py), durées en secondes. Le jeton de
+# rafraîchissement est à usage unique : sa durée borne l'inactivité tolérée
+ACCESS_TOKEN_LIFETIME = 15 * 60
+REFRESH_TOKEN_LIFETIME = 2 * 3600
+# Cache des utilisateurs authentifiés par jeton : une révocation faite par un
+# autre worker est prise en compte au plus tard après TOKEN_USER_CACHE_TTL
+TOKEN_USER_CACHE_TTL = 60
+TOKEN_USER_CACHE_SIZE = 1024
+
+# Métriques Prometheus (/api/metrics) : jeton à envoyer en "Authorization: Bearer <jeton>".
+# Obligatoire hors DEBUG ; sans jeton en DEBUG, seules les requêtes locales (127.0.0.1) y ont accès
+METRICS_TOKEN = os.environ.get('SENELEC_METRICS_TOKEN')
+
+# Profilage cProfile à la demande (core/profiling.py, commande profile_summary).
+# Une requête est profilée si elle envoie "X-Senelec-Profile: <PROFILING_TOKEN>"
+# ou, si PROFILING_SAMPLE_RATE vaut N > 0, une requête sur N en moyenne
+PROFILING_ENABLED = os.environ.get('SENELEC_PROFILING', '0') == '1'
+PROFILING_TOKEN = os.environ.get('SENELEC_PROFILING_TOKEN')
+PROFILING_SAMPLE_RATE = int(os.environ.get('SENELEC_PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = Path(os.environ.get('SENELEC_PROFILING_DIR', BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = 200  # profils conservés, les plus anciens sont supprimés
+
+# Journalisation sur la console (erreurs internes des API, limiteur, verrous SQLite...)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': os.environ.get('SENELEC_LOG_LEVEL', 'INFO'),
+        },
+    },
+}